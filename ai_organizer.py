@@ -5,35 +5,145 @@ Provides AI-powered email processing using OpenAI's GPT models:
 - Email summarization
 - Action item extraction
 - Confidence scoring
+- Fused analysis (all of the above in a single request)
 
 Includes automatic content truncation to prevent context length errors.
+Async variants of each operation and process_many() allow many emails to be
+processed concurrently.
 """
 
 
-from openai import OpenAI
-from typing import Dict, List, Optional
-from config import Config
-from google_gemini_helper import GeminiEmailOrganizer
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+import httpx
+from openai import OpenAI, AsyncOpenAI, RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import get_config
+from llm_parsing import parse_action_items, parse_confidence
+from rate_limiter import AsyncRateLimiter
+from semantic_cache import SemanticCache
+from sqlite_cache import SQLiteCache
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Operation name -> organizer method name, used by process_many
+OPERATIONS = {
+    'categorize': 'categorize_email',
+    'summarize': 'summarize_email',
+    'action_items': 'extract_action_items',
+    'confidence': 'confidence_scoring',
+    'analyze': 'analyze_email',
+}
+DEFAULT_OPS = ('categorize', 'summarize')
+
+HTTP_TIMEOUT = 60.0
+HTTP_MAX_CONNECTIONS = 64
+
+# Retries for 429s that slip past the client-side rate limiter
+RATE_LIMIT_RETRIES = 6
+RATE_LIMIT_MAX_BACKOFF = 60.0
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+BATCH_TERMINAL_STATES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+# Returns diminish beyond ~10 emails per marshaled prompt
+MAX_BATCH_ROWS = 20
+
+# Embeddings used by the semantic cache to find near-duplicate emails
+EMBEDDING_MODEL = 'text-embedding-3-small'
+
+# Distinct action item strings kept for interning (least recently seen evicted)
+ACTION_ITEM_POOL_SIZE = 4096
+
+# Bump to invalidate every stored exact-match analysis
+ANALYSIS_CACHE_VERSION = 1
+# Per-recipient noise that doesn't change what an email means
+_QP_SOFT_BREAK_RE = re.compile(r'=\r?\n')
+_TRACKING_PIXEL_RE = re.compile(r'<img\b[^>]*\b(?:width|height)=["\']?[01](?=["\'\s/>])[^>]*>', re.I)
+_UNSUBSCRIBE_URL_RE = re.compile(r'https?://\S*(?:unsubscribe|optout|opt-out)\S*', re.I)
+
+TRUNCATION_NOTICE = "\n\n[Email content truncated due to length...]"
+
+# Output budget for a bare category name when no tokenizer is available
+CATEGORY_MAX_TOKENS = 16
+# OpenAI accepts at most this many logit_bias entries
+MAX_LOGIT_BIAS_ENTRIES = 300
+
+# Static instructions live in the system message and the email body goes last,
+# so every request for an operation shares the same cacheable prompt prefix
+_ROLE_CATEGORIZE = 'You are an email categorization assistant.'
+_ROLE_SUMMARIZE = 'You are a helpful email summarization assistant.'
+_ROLE_ACTION_ITEMS = 'You are an assistant that extracts action items from emails.'
+_ROLE_ANALYSIS = 'You are an email analysis assistant.'
+_EMAIL_PREFIX = 'Email:\n'
+
+def _normalize_for_cache(email_content: str) -> str:
+    """Strip soft line breaks, tracking pixels and unsubscribe links from email content."""
+    email_content = _QP_SOFT_BREAK_RE.sub('', email_content)
+    email_content = _TRACKING_PIXEL_RE.sub('', email_content)
+    return _UNSUBSCRIBE_URL_RE.sub('<unsubscribe>', email_content)
+
+def _length_bucketed(emails: List[str], size: int) -> Iterator[List[int]]:
+    """Yield groups of up to size indices into emails, grouped by similar length (shortest first)."""
+    order = sorted(range(len(emails)), key=lambda i: len(emails[i]))
+    for start in range(0, len(order), size):
+        yield order[start:start + size]
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the (process-wide shared) tiktoken encoding for model, or None.
+    
+    None is returned when tiktoken is not installed, the model is unknown,
+    or the encoding files can't be downloaded.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        return None
+
 
 class EmailOrganizer:
     """AI-powered email organizer using OpenAI or Google Gemini."""
     def __init__(self, config=None, api_key=None):
-        self.config = config or Config()
-        provider = getattr(self.config, 'LLM_PROVIDER', 'openai')
-        self.provider = provider
-        if provider == 'gemini':
-            self.llm = GeminiEmailOrganizer(config=self.config)
-        else:
-            # Default to OpenAI
-            if self.config.OPENAI_API_KEY:
-                self.llm = _OpenAIEmailOrganizer(config=self.config)
-            elif api_key:
-                self.llm = _OpenAIEmailOrganizer(api_key=api_key)
-            else:
-                raise ValueError(
-                    "No API key provided. Either pass a Config object with OPENAI_API_KEY "
-                    "or provide api_key parameter directly."
-                )
+        self.config = config or get_config()
+        self.provider = getattr(self.config, 'LLM_PROVIDER', 'openai')
+        # Unknown providers default to OpenAI
+        provider_cls = _PROVIDERS.get(self.provider, _OpenAIEmailOrganizer)
+        self.llm = provider_cls(config=self.config, api_key=api_key)
+        # Action items repeat heavily across emails (standup reminders, "review
+        # PR"); equal items share one string object
+        self._action_item_pool = OrderedDict()
+        self._action_item_lock = threading.Lock()
+
+    def _intern_action_items(self, items: List[str]) -> List[str]:
+        pool = self._action_item_pool
+        interned = []
+        with self._action_item_lock:
+            for item in items:
+                item = pool.setdefault(item, item)
+                pool.move_to_end(item)
+                if len(pool) > ACTION_ITEM_POOL_SIZE:
+                    pool.popitem(last=False)
+                interned.append(item)
+        return interned
 
     def categorize_email(self, email_content: str) -> Dict[str, str]:
         return self.llm.categorize_email(email_content)
@@ -42,146 +152,536 @@ class EmailOrganizer:
         return self.llm.summarize_email(email_content)
 
     def extract_action_items(self, email_content: str) -> List[str]:
-        return self.llm.extract_action_items(email_content)
+        return self._intern_action_items(self.llm.extract_action_items(email_content))
 
     def confidence_scoring(self, email_content: str) -> Dict[str, float]:
         return self.llm.confidence_scoring(email_content)
 
+    def summarize_with_action_items(self, email_content: str) -> Dict[str, Any]:
+        """Return summary and action_items for an email, in one request when supported."""
+        if hasattr(self.llm, 'summarize_with_action_items'):
+            result = self.llm.summarize_with_action_items(email_content)
+        else:
+            result = {
+                'summary': self.llm.summarize_email(email_content),
+                'action_items': self.llm.extract_action_items(email_content)
+            }
+        result['action_items'] = self._intern_action_items(result['action_items'])
+        return result
+
+    async def aclose(self):
+        """Release provider resources such as pooled HTTP connections."""
+        if hasattr(self.llm, 'aclose'):
+            await self.llm.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def analyze_email(self, email_content: str) -> Dict[str, Any]:
+        """Return category, summary, action_items and confidence for an email.
+        
+        Uses a single fused request when the provider supports it.
+        """
+        if hasattr(self.llm, 'analyze_email'):
+            result = self.llm.analyze_email(email_content)
+        else:
+            result = {
+                'category': self.llm.categorize_email(email_content)['category'],
+                'summary': self.llm.summarize_email(email_content),
+                'action_items': self.llm.extract_action_items(email_content),
+                'confidence': self.llm.confidence_scoring(email_content)
+            }
+        result['action_items'] = self._intern_action_items(result['action_items'])
+        return result
+
+    def cached_analysis(self, email_content: str) -> Optional[Dict[str, Any]]:
+        """Return a stored analysis for the email, or None (always None without caching support)."""
+        if hasattr(self.llm, 'cached_analysis'):
+            return self.llm.cached_analysis(email_content)
+        return None
+
+    def remember_analysis(self, email_content: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis so cached_analysis() can serve the same or a similar email."""
+        if hasattr(self.llm, 'remember_analysis'):
+            self.llm.remember_analysis(email_content, analysis)
+
+    async def process_many(self, emails: List[str], ops=DEFAULT_OPS) -> List[Dict[str, Any]]:
+        """Run the requested operations for many emails concurrently.
+        
+        Providers without native async support are run in worker threads.
+        """
+        if hasattr(self.llm, 'process_many'):
+            return await self.llm.process_many(emails, ops)
+        
+        semaphore = asyncio.Semaphore(getattr(self.config, 'MAX_CONCURRENCY', 8))
+        
+        async def bounded(op, email_content):
+            async with semaphore:
+                method = getattr(self, OPERATIONS[op]) if op == 'analyze' else getattr(self.llm, OPERATIONS[op])
+                return await asyncio.to_thread(method, email_content)
+        
+        coros = [bounded(op, email) for email in emails for op in ops]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        
+        n_ops = len(ops)
+        return [
+            dict(zip(ops, results[i * n_ops:(i + 1) * n_ops]))
+            for i in range(len(emails))
+        ]
+
+    def categorize_emails_marshaled(self, emails: List[str], batch_rows: Optional[int] = None) -> List[Dict[str, str]]:
+        """Categorize several emails per API call (providers without marshaling go one by one)."""
+        if hasattr(self.llm, 'categorize_emails_marshaled'):
+            return self.llm.categorize_emails_marshaled(emails, batch_rows)
+        return [self.llm.categorize_email(email) for email in emails]
+
+    @property
+    def supports_batch(self) -> bool:
+        """Whether the provider can categorize through a batch job (OpenAI only)."""
+        return hasattr(self.llm, 'batch_categorize')
+
+    def batch_categorize(self, emails: List[str]) -> str:
+        """Submit a bulk categorization job (OpenAI Batch API only). Returns the batch ID."""
+        if not hasattr(self.llm, 'batch_categorize'):
+            raise NotImplementedError(f"Batch categorization is not supported for provider '{self.provider}'")
+        return self.llm.batch_categorize(emails)
+
+    def poll_batch(self, batch_id: str, **kwargs) -> Dict[str, Dict[str, str]]:
+        """Wait for a batch job and return {custom_id: categorization}."""
+        if not hasattr(self.llm, 'poll_batch'):
+            raise NotImplementedError(f"Batch categorization is not supported for provider '{self.provider}'")
+        return self.llm.poll_batch(batch_id, **kwargs)
+
 
-# Internal OpenAI implementation (unchanged, just renamed)
+# Internal OpenAI implementation
 class _OpenAIEmailOrganizer:
     def __init__(self, config=None, api_key=None):
+        # Pooled (and, when h2 is installed, HTTP/2 multiplexed) transports shared by
+        # every client, so each call reuses a warm TLS connection
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS
+        )
+        self._http = httpx.AsyncClient(http2=_HTTP2_AVAILABLE, timeout=HTTP_TIMEOUT, limits=limits)
+        self._sync_http = httpx.Client(http2=_HTTP2_AVAILABLE, timeout=HTTP_TIMEOUT, limits=limits)
         if config and config.OPENAI_API_KEY:
             self.config = config
-            self.client = OpenAI(api_key=config.OPENAI_API_KEY)
-            self.model = config.OPENAI_MODEL
+            self.client = OpenAI(api_key=config.OPENAI_API_KEY, http_client=self._sync_http)
+            self.aclient = AsyncOpenAI(api_key=config.OPENAI_API_KEY, http_client=self._http)
+            self.model = getattr(config, 'OPENAI_SUMMARY_MODEL', config.OPENAI_MODEL)
+            self.classify_model = getattr(config, 'OPENAI_CLASSIFY_MODEL', config.OPENAI_MODEL)
+            ollama_base_url = getattr(config, 'OLLAMA_BASE_URL', '')
             self.max_tokens = config.OPENAI_MAX_TOKENS
             self.categories = config.EMAIL_CATEGORIES
             self.max_email_length = config.MAX_EMAIL_CONTENT_LENGTH
+            self.max_email_tokens = getattr(config, 'MAX_EMAIL_TOKENS', 3000)
+            self.max_concurrency = getattr(config, 'MAX_CONCURRENCY', 8)
+            self.batch_rows = getattr(config, 'BATCH_ROWS', 10)
+            rpm_limit = getattr(config, 'RPM_LIMIT', 0)
+            tpm_limit = getattr(config, 'TPM_LIMIT', 0)
         elif api_key:
-            self.config = Config()
-            self.client = OpenAI(api_key=api_key)
+            self.config = get_config()
+            self.client = OpenAI(api_key=api_key, http_client=self._sync_http)
+            self.aclient = AsyncOpenAI(api_key=api_key, http_client=self._http)
             self.model = 'gpt-3.5-turbo'
+            self.classify_model = self.model
+            ollama_base_url = ''
             self.max_tokens = 500
             self.categories = self.config.EMAIL_CATEGORIES
             self.max_email_length = self.config.MAX_EMAIL_CONTENT_LENGTH
+            self.max_email_tokens = self.config.MAX_EMAIL_TOKENS
+            self.max_concurrency = self.config.MAX_CONCURRENCY
+            self.batch_rows = self.config.BATCH_ROWS
+            rpm_limit = self.config.RPM_LIMIT
+            tpm_limit = self.config.TPM_LIMIT
         else:
             raise ValueError(
                 "No API key provided. Either pass a Config object with OPENAI_API_KEY "
                 "or provide api_key parameter directly."
             )
+        
+        # Categorization can run on a local OpenAI-compatible server (e.g. Ollama)
+        if ollama_base_url:
+            self.classify_client = OpenAI(base_url=ollama_base_url, api_key='ollama',
+                                        http_client=self._sync_http)
+            self.classify_aclient = AsyncOpenAI(base_url=ollama_base_url, api_key='ollama',
+                                                http_client=self._http)
+        else:
+            self.classify_client = self.client
+            self.classify_aclient = self.aclient
+        
+        self._last_truncation = (None, None, None)  # (source, (max_length, max_tokens), result)
+        
+        # Joined once; used by every prompt that lists the categories
+        self._categories_str = ', '.join(self.categories)
+        # Replies are matched back to the configured spelling of a category
+        self._category_lookup = {category.lower(): category for category in self.categories}
+        self._build_system_messages()
+        self._categorize_options = self._build_category_constraints()
+        
+        # Shared by every async call so concurrent requests stay under the quota
+        self._limiter = AsyncRateLimiter(rpm=rpm_limit, tpm=tpm_limit)
+        
+        # Exact-match response cache (skips repeated identical requests)
+        if getattr(self.config, 'LLM_CACHE_ENABLED', False):
+            self.cache = SQLiteCache(self.config.LLM_CACHE_PATH)
+        else:
+            self.cache = None
+        
+        # Similarity cache: near-duplicate emails reuse an earlier analysis
+        if getattr(self.config, 'SEMANTIC_CACHE_ENABLED', False):
+            self.semantic_cache = SemanticCache(
+                self.config.SEMANTIC_CACHE_PATH,
+                self._embed,
+                threshold=self.config.SEMANTIC_CACHE_THRESHOLD
+            )
+        else:
+            self.semantic_cache = None
 
-    def _truncate_email_content(self, email_content: str) -> str:
-        if len(email_content) <= self.max_email_length:
-            return email_content
-        truncated = email_content[:self.max_email_length]
-        last_space = truncated.rfind(' ')
-        if last_space > self.max_email_length * 0.9:
-            truncated = truncated[:last_space]
-        return truncated + "\n\n[Email content truncated due to length...]"
+    async def aclose(self):
+        """Close the pooled HTTP transports."""
+        self._sync_http.close()
+        await self._http.aclose()
 
-    def categorize_email(self, email_content: str) -> Dict[str, str]:
-        email_content = self._truncate_email_content(email_content)
-        categories_str = ', '.join(self.categories)
-        prompt = (
-            f"Categorize this email into one of these categories: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def _truncate_email_content(self, email_content: str, max_length: Optional[int] = None,
+                                max_tokens: Optional[int] = None) -> str:
+        """Truncate email content to avoid exceeding token limits.
+        
+        The content is cut at max_email_length characters and, when a
+        tokenizer is available, also at max_email_tokens tokens.
+        
+        Args:
+            email_content: Full email content
+            max_length: Character limit to use instead of max_email_length
+            max_tokens: Token limit to use instead of max_email_tokens
+            
+        The last result is memoized, so the per-operation prompts built for
+        one email only scan it once.
+        
+        Returns:
+            Truncated email content if needed, with truncation notice
+        """
+        # Holding the source keeps its id from being reused, so identity is a safe key
+        key = (max_length, max_tokens)
+        source, last_key, result = self._last_truncation
+        if source is email_content and last_key == key:
+            return result
+        result = self._truncate_uncached(email_content, max_length, max_tokens)
+        self._last_truncation = (email_content, key, result)
+        return result
+
+    def _truncate_uncached(self, email_content: str, max_length: Optional[int],
+                           max_tokens: Optional[int]) -> str:
+        # The character limit always applies and also bounds the encoding work
+        max_length = max_length or self.max_email_length
+        truncated = len(email_content) > max_length
+        if truncated:
+            # Cut at the last word boundary within the final 10% of the limit,
+            # searching the original string so only one slice is made
+            cut = email_content.rfind(' ', int(max_length * 0.9) + 1, max_length)
+            if cut < 0:
+                cut = max_length
+            email_content = email_content[:cut]
+        
+        enc = _get_encoding(self.model)
+        if enc is not None:
+            max_tokens = max_tokens or self.max_email_tokens
+            # Every token covers at least one byte, so short content can skip encoding
+            if len(email_content.encode('utf-8')) > max_tokens:
+                tokens = enc.encode(email_content, disallowed_special=())
+                if len(tokens) > max_tokens:
+                    return enc.decode(tokens[:max_tokens]) + TRUNCATION_NOTICE
+        
+        return email_content + TRUNCATION_NOTICE if truncated else email_content
+
+    def _build_system_messages(self):
+        """Precompute the system messages; the user message is just the email body."""
+        categories_str = self._categories_str
+        self._categorize_system = self._system_message(
+            f"{_ROLE_CATEGORIZE} Categorize the email into one of these categories: {categories_str}. "
             f"Respond with just the category name."
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an email categorization assistant.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
+        self._marshaled_system = self._system_message(
+            f"{_ROLE_CATEGORIZE} Categorize each of the numbered emails into one of these categories: "
+            f"{categories_str}. "
+            f'Respond with a JSON object of the form {{"results": [{{"id": 1, "category": "..."}}, ...]}} '
+            f"containing one entry per email."
         )
-        category = response.choices[0].message.content.strip()
-        return {'category': category, 'confidence': 'high'}
-
-    def summarize_email(self, email_content: str) -> str:
-        email_content = self._truncate_email_content(email_content)
-        prompt = f"Summarize this email in 2-3 sentences:\n\n{email_content}"
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are a helpful email summarization assistant.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
+        self._summarize_system = self._system_message(
+            f"{_ROLE_SUMMARIZE} Summarize the email in 2-3 sentences."
         )
-        return response.choices[0].message.content.strip()
-
-    def extract_action_items(self, email_content: str) -> List[str]:
-        email_content = self._truncate_email_content(email_content)
-        prompt = (
-            f"Extract any action items or tasks from this email. "
-            f"List them as bullet points. If there are no action items, respond with 'None'.\n\n"
-            f"Email: {email_content}"
+        self._action_items_system = self._system_message(
+            f"{_ROLE_ACTION_ITEMS} Extract any action items or tasks from the email. "
+            f"List them as bullet points. If there are no action items, respond with 'None'."
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an assistant that extracts action items from emails.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
+        self._confidence_system = self._system_message(
+            f"{_ROLE_ANALYSIS} Rate the confidence (0-100%) that the email belongs to each category: "
+            f"{categories_str}. Respond in format: CategoryName: XX%"
         )
-        result = response.choices[0].message.content.strip()
-        if result.lower() == 'none' or not result:
-            return []
-        action_items = [item.strip('- •*').strip() for item in result.split('\n') if item.strip()]
-        return action_items
-
-    def confidence_scoring(self, email_content: str) -> Dict[str, float]:
-        email_content = self._truncate_email_content(email_content)
-        categories_str = ', '.join(self.categories)
-        prompt = (
-            f"Rate the confidence (0-100%) that this email belongs to each category: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
-            f"Respond in format: CategoryName: XX%"
+        self._digest_system = self._system_message(
+            f"{_ROLE_SUMMARIZE} Return a JSON object with these keys:\n"
+            f"- 'summary': a 2-3 sentence summary of the email\n"
+            f"- 'action_items': list of action items or tasks (empty list if none)"
+        )
+        self._analyze_system = self._system_message(
+            f"{_ROLE_ANALYSIS} Analyze the email and return a JSON object with these keys:\n"
+            f"- 'category': one of {categories_str}\n"
+            f"- 'summary': a 2-3 sentence summary\n"
+            f"- 'action_items': list of action items or tasks (empty list if none)\n"
+            f"- 'confidence': object mapping each category to a confidence between 0 and 1"
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an email analysis assistant.'},
+
+    @staticmethod
+    def _system_message(content: str) -> Dict[str, str]:
+        return {'role': 'system', 'content': content}
+
+    def _build_category_constraints(self) -> Dict[str, Any]:
+        """Request options for categorize calls: the classify model plus output limits.
+        
+        With a tokenizer, max_tokens is set to the longest category's length.
+        logit_bias is only used when every category is a single token: the
+        bias applies at every decoding step, so with multi-token categories
+        it would keep the model from finishing the longer names. Without a
+        tokenizer the output budget is simply capped.
+        """
+        enc = _get_encoding(self.classify_model)
+        options = {'model': self.classify_model}
+        if enc is None:
+            options['max_tokens'] = min(self.max_tokens, CATEGORY_MAX_TOKENS)
+            return options
+        
+        encoded = [enc.encode(category) for category in self.categories]
+        encoded = [tokens for tokens in encoded if tokens]
+        if not encoded:
+            options['max_tokens'] = min(self.max_tokens, CATEGORY_MAX_TOKENS)
+            return options
+        options['max_tokens'] = max(len(tokens) for tokens in encoded)
+        if options['max_tokens'] == 1 and len(encoded) <= MAX_LOGIT_BIAS_ENTRIES:
+            options['logit_bias'] = {str(tokens[0]): 100 for tokens in encoded}
+        return options
+
+    def _chat_request(self, system: Dict[str, str], prompt: str, **extra) -> Dict[str, Any]:
+        """Build the chat completion request body for a system message and user prompt."""
+        return {
+            'model': self.model,
+            'messages': [
+                system,
                 {'role': 'user', 'content': prompt}
             ],
-            max_tokens=self.max_tokens
-        )
+            'max_tokens': self.max_tokens,
+            **extra
+        }
+
+    def _estimate_tokens(self, request: Dict[str, Any]) -> int:
+        """Estimate the quota a request consumes: prompt tokens plus the output budget."""
+        enc = _get_encoding(request['model'])
+        prompt_tokens = 0
+        for message in request['messages']:
+            if enc is not None:
+                prompt_tokens += len(enc.encode(message['content'], disallowed_special=()))
+            else:
+                prompt_tokens += len(message['content']) // 4
+        return prompt_tokens + request.get('max_tokens', self.max_tokens)
+
+    def _cache_key(self, request: Dict[str, Any]) -> str:
+        """Hash a chat request into a cache key (model, prompts, limits and options)."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _complete(self, system: Dict[str, str], prompt: str, **extra) -> str:
+        """Run a single chat completion and return the stripped reply text.
+        
+        Identical requests are served from the response cache when enabled.
+        """
+        request = self._chat_request(system, prompt, **extra)
+        key = self._cache_key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = self.client.chat.completions.create(**request)
         result = response.choices[0].message.content.strip()
-        scores = {}
-        for line in result.split('\n'):
-            if ':' in line:
-                category, score = line.split(':', 1)
-                category = category.strip()
-                score = score.strip().rstrip('%')
-                try:
-                    scores[category] = float(score) / 100.0
-                except ValueError:
-                    pass
-        return scores
-    
-    def _truncate_email_content(self, email_content: str) -> str:
-        """Truncate email content to avoid exceeding token limits.
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    def _complete_first_line(self, system: Dict[str, str], prompt: str, **extra) -> str:
+        """Stream a chat completion and return its first non-empty line.
         
-        Args:
-            email_content: Full email content
-            
-        Returns:
-            Truncated email content if needed, with truncation notice
+        The stream is closed as soon as that line is complete, so a one-word
+        reply returns without waiting for the rest of the generation.
+        """
+        request = self._chat_request(system, prompt, stream=True, **extra)
+        key = self._cache_key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        stream = self.classify_client.chat.completions.create(**request)
+        parts = []
+        try:
+            for chunk in stream:
+                if self._append_delta(parts, chunk):
+                    break
+        finally:
+            stream.close()
+        result = self._first_line(parts)
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    async def _acreate(self, request: Dict[str, Any], client: Optional[AsyncOpenAI] = None):
+        """Send a request through the rate limiter, retrying 429s with backoff."""
+        client = client or self.aclient
+        await self._limiter.acquire(self._estimate_tokens(request))
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(RateLimitError),
+            wait=wait_random_exponential(max=RATE_LIMIT_MAX_BACKOFF),
+            stop=stop_after_attempt(RATE_LIMIT_RETRIES),
+            reraise=True
+        ):
+            with attempt:
+                return await client.chat.completions.create(**request)
+
+    async def _complete_async(self, system: Dict[str, str], prompt: str, **extra) -> str:
+        """Async counterpart of _complete using the AsyncOpenAI client."""
+        request = self._chat_request(system, prompt, **extra)
+        key = self._cache_key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = await self._acreate(request)
+        result = response.choices[0].message.content.strip()
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    async def _complete_first_line_async(self, system: Dict[str, str], prompt: str, **extra) -> str:
+        """Async counterpart of _complete_first_line."""
+        request = self._chat_request(system, prompt, stream=True, **extra)
+        key = self._cache_key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        stream = await self._acreate(request, self.classify_aclient)
+        parts = []
+        try:
+            async for chunk in stream:
+                if self._append_delta(parts, chunk):
+                    break
+        finally:
+            await stream.close()
+        result = self._first_line(parts)
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    @staticmethod
+    def _append_delta(parts: List[str], chunk) -> bool:
+        """Collect a streamed delta; True once the first non-empty line is complete."""
+        if not chunk.choices:
+            return False
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return False
+        parts.append(delta)
+        return '\n' in ''.join(parts).lstrip()
+
+    @staticmethod
+    def _first_line(parts: List[str]) -> str:
+        return ''.join(parts).lstrip().split('\n', 1)[0].strip()
+
+    def _categorize_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._categorize_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    def _summarize_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._summarize_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    def _action_items_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._action_items_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    def _confidence_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._confidence_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    def _digest_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._digest_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    def _analyze_messages(self, email_content: str) -> Tuple[Dict[str, str], str]:
+        return self._analyze_system, _EMAIL_PREFIX + self._truncate_email_content(email_content)
+
+    @staticmethod
+    def _parse_analysis(result: str) -> Dict[str, Any]:
+        """Parse and normalize the JSON reply of an analyze request.
+        
+        Raises:
+            ValueError: If the reply is not a JSON object with a category
         """
-        if len(email_content) <= self.max_email_length:
-            return email_content
+        data = json.loads(result)
+        if not isinstance(data, dict) or not data.get('category'):
+            raise ValueError(f"Invalid analysis response: {result[:200]}")
         
-        # Truncate and add notice
-        truncated = email_content[:self.max_email_length]
-        # Try to truncate at a word boundary
-        last_space = truncated.rfind(' ')
-        if last_space > self.max_email_length * 0.9:  # Only if we're still using most of the limit
-            truncated = truncated[:last_space]
+        action_items = data.get('action_items') or []
+        if isinstance(action_items, str):
+            action_items = [action_items]
+        confidence = {}
+        for category, score in (data.get('confidence') or {}).items():
+            try:
+                confidence[str(category)] = float(score)
+            except (TypeError, ValueError):
+                pass
         
-        return truncated + "\n\n[Email content truncated due to length...]"
+        return {
+            'category': str(data['category']).strip(),
+            'summary': str(data.get('summary') or '').strip(),
+            'action_items': [str(item).strip() for item in action_items if str(item).strip()],
+            'confidence': confidence
+        }
+
+    @staticmethod
+    def _parse_digest(result: str) -> Dict[str, Any]:
+        """Parse the JSON reply of a summarize_with_action_items request.
+        
+        Raises:
+            ValueError: If the reply is not a JSON object with a summary
+        """
+        data = json.loads(result)
+        if not isinstance(data, dict) or 'summary' not in data:
+            raise ValueError(f"Invalid digest response: {result[:200]}")
+        action_items = data.get('action_items') or []
+        if isinstance(action_items, str):
+            action_items = [action_items]
+        return {
+            'summary': str(data['summary'] or '').strip(),
+            'action_items': [str(item).strip() for item in action_items if str(item).strip()]
+        }
+
+    def _parse_category(self, result: str) -> Dict[str, str]:
+        """Map a reply to its configured category; unknown replies are kept with low confidence."""
+        category = self._category_lookup.get(result.strip(' \t"\'.*').lower())
+        if category is None:
+            return {'category': result, 'confidence': 'low'}
+        return {
+            'category': category,
+            'confidence': 'high'
+        }
+
+    _parse_action_items = staticmethod(parse_action_items)
+    _parse_confidence = staticmethod(parse_confidence)
 
     def categorize_email(self, email_content: str) -> Dict[str, str]:
         """Categorize an email into predefined categories.
@@ -192,115 +692,331 @@ class _OpenAIEmailOrganizer:
         Returns:
             Dict with 'category' and 'confidence' keys
         """
-        # Truncate email content if needed
-        email_content = self._truncate_email_content(email_content)
+        result = self._complete_first_line(*self._categorize_messages(email_content),
+                                           **self._categorize_options)
+        return self._parse_category(result)
+
+    def summarize_email(self, email_content: str) -> str:
+        """Summarize an email in a concise way."""
+        return self._complete(*self._summarize_messages(email_content))
+
+    def extract_action_items(self, email_content: str) -> List[str]:
+        """Extract action items from an email."""
+        return self._parse_action_items(self._complete(*self._action_items_messages(email_content)))
+
+    def summarize_with_action_items(self, email_content: str) -> Dict[str, Any]:
+        """Summarize an email and extract its action items in one call.
         
-        categories_str = ', '.join(self.categories)
-        prompt = (
-            f"Categorize this email into one of these categories: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
-            f"Respond with just the category name."
-        )
+        Falls back to summarize_email and extract_action_items if the reply
+        can't be parsed.
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an email categorization assistant.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
-        )
+        Returns:
+            Dict with 'summary' and 'action_items' keys
+        """
+        result = self._complete(*self._digest_messages(email_content),
+                                response_format={'type': 'json_object'})
+        try:
+            return self._parse_digest(result)
+        except ValueError:
+            return {
+                'summary': self.summarize_email(email_content),
+                'action_items': self.extract_action_items(email_content)
+            }
+
+    def confidence_scoring(self, email_content: str) -> Dict[str, float]:
+        """Provide confidence scoring for the categorization of an email."""
+        return self._parse_confidence(self._complete(*self._confidence_messages(email_content)))
+
+    def analyze_email(self, email_content: str) -> Dict[str, Any]:
+        """Categorize, summarize, extract action items and score an email in one call.
         
-        category = response.choices[0].message.content.strip()
+        Sends the email body once instead of four times. If the reply can't
+        be parsed, falls back to the individual methods.
         
-        return {
-            'category': category,
-            'confidence': 'high'
-        }
-
-    def summarize_email(self, email_content: str) -> str:
-        """Summarize an email in a concise way."""
-        # Truncate email content if needed
-        email_content = self._truncate_email_content(email_content)
+        With the response cache enabled, an email identical to one already
+        analyzed (ignoring tracking pixels and unsubscribe links) is served
+        without any API call. When the semantic cache is enabled, an email
+        closely matching one from the same sender domain reuses that result.
         
-        prompt = f"Summarize this email in 2-3 sentences:\n\n{email_content}"
+        Args:
+            email_content: The email content to analyze
+            
+        Returns:
+            Dict with 'category', 'summary', 'action_items' and 'confidence' keys
+        """
+        key = self._analysis_cache_key(email_content) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are a helpful email summarization assistant.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
+        if self.semantic_cache is not None:
+            result = self.semantic_cache.get_or_compute(
+                email_content, lambda: self._analyze_uncached(email_content)
+            )
+        else:
+            result = self._analyze_uncached(email_content)
+        if key:
+            self.cache.set(key, result)
+        return result
+
+    def cached_analysis(self, email_content: str) -> Optional[Dict[str, Any]]:
+        """Return the stored analysis of this (or, with the semantic cache, a similar) email, or None."""
+        if self.cache:
+            cached = self.cache.get(self._analysis_cache_key(email_content))
+            if cached is not None:
+                return cached
+        if self.semantic_cache is not None:
+            return self.semantic_cache.get(email_content)
+        return None
+
+    def remember_analysis(self, email_content: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis for cached_analysis() (no-op with both caches disabled)."""
+        if self.cache:
+            self.cache.set(self._analysis_cache_key(email_content), analysis)
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(email_content, analysis)
+
+    def _analysis_cache_key(self, email_content: str) -> str:
+        """Exact-match key over the normalized email (sender, subject and body), model and categories."""
+        digest = hashlib.sha256()
+        for part in (self.model, '\n'.join(self.categories), _normalize_for_cache(email_content)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return f'analysis:v{ANALYSIS_CACHE_VERSION}:{digest.hexdigest()}'
+
+    def _analyze_uncached(self, email_content: str) -> Dict[str, Any]:
+        result = self._complete(*self._analyze_messages(email_content),
+                                response_format={'type': 'json_object'})
+        try:
+            return self._parse_analysis(result)
+        except ValueError:
+            return {
+                'category': self.categorize_email(email_content)['category'],
+                'summary': self.summarize_email(email_content),
+                'action_items': self.extract_action_items(email_content),
+                'confidence': self.confidence_scoring(email_content)
+            }
+
+    def _embed(self, email_content: str) -> List[float]:
+        response = self.client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=self._truncate_email_content(email_content)
         )
+        return response.data[0].embedding
+
+    def categorize_emails_marshaled(self, emails: List[str],
+                                    batch_rows: Optional[int] = None) -> List[Dict[str, str]]:
+        """Categorize several emails per API call by packing them into one prompt.
+        
+        Under a requests-per-minute limit this raises throughput roughly
+        batch_rows times. Emails are grouped by length and each gets an
+        equal share of the truncation limit.
+        Emails whose label can't be recovered from the JSON reply fall back
+        to a single categorize_email call.
         
-        return response.choices[0].message.content.strip()
+        Args:
+            emails: List of email contents
+            batch_rows: Emails per prompt (defaults to BATCH_ROWS, capped at MAX_BATCH_ROWS)
+            
+        Returns:
+            List of categorization dicts in input order
+        """
+        rows = min(max(1, batch_rows or self.batch_rows), MAX_BATCH_ROWS)
+        results = [None] * len(emails)
+        # Similar-length emails share a prompt so none is starved by the per-email budget
+        for indices in _length_bucketed(emails, rows):
+            chunk = [emails[i] for i in indices]
+            categories = self._categorize_chunk(chunk)
+            for i, email_content, category in zip(indices, chunk, categories):
+                results[i] = (self._parse_category(category) if category
+                              else self.categorize_email(email_content))
+        return results
 
-    def extract_action_items(self, email_content: str) -> List[str]:
-        """Extract action items from an email."""
-        # Truncate email content if needed
-        email_content = self._truncate_email_content(email_content)
+    def _categorize_chunk(self, chunk: List[str]) -> List[Optional[str]]:
+        """Categorize a chunk of emails in one JSON-mode call; None marks a missing row."""
+        if len(chunk) == 1:
+            return [None]
         
-        prompt = (
-            f"Extract any action items or tasks from this email. "
-            f"List them as bullet points. If there are no action items, respond with 'None'.\n\n"
-            f"Email: {email_content}"
+        per_email_length = self.max_email_length // len(chunk)
+        per_email_tokens = self.max_email_tokens // len(chunk)
+        body = '\n\n'.join(
+            f"Email {i}:\n"
+            f"{self._truncate_email_content(email_content, per_email_length, per_email_tokens)}"
+            for i, email_content in enumerate(chunk, 1)
         )
+        try:
+            result = self._complete(
+                self._marshaled_system,
+                body,
+                response_format={'type': 'json_object'}
+            )
+            rows = json.loads(result)['results']
+            by_id = {int(row['id']): str(row['category']).strip() for row in rows}
+        except (ValueError, KeyError, TypeError):
+            return [None] * len(chunk)
+        return [by_id.get(i) for i in range(1, len(chunk) + 1)]
+
+    async def categorize_email_async(self, email_content: str) -> Dict[str, str]:
+        """Async variant of categorize_email."""
+        result = await self._complete_first_line_async(*self._categorize_messages(email_content),
+                                                       **self._categorize_options)
+        return self._parse_category(result)
+
+    async def summarize_email_async(self, email_content: str) -> str:
+        """Async variant of summarize_email."""
+        return await self._complete_async(*self._summarize_messages(email_content))
+
+    async def extract_action_items_async(self, email_content: str) -> List[str]:
+        """Async variant of extract_action_items."""
+        result = await self._complete_async(*self._action_items_messages(email_content))
+        return self._parse_action_items(result)
+
+    async def confidence_scoring_async(self, email_content: str) -> Dict[str, float]:
+        """Async variant of confidence_scoring."""
+        result = await self._complete_async(*self._confidence_messages(email_content))
+        return self._parse_confidence(result)
+
+    async def analyze_email_async(self, email_content: str) -> Dict[str, Any]:
+        """Async variant of analyze_email."""
+        result = await self._complete_async(*self._analyze_messages(email_content),
+                                            response_format={'type': 'json_object'})
+        try:
+            return self._parse_analysis(result)
+        except ValueError:
+            category, summary, action_items, confidence = await asyncio.gather(
+                self.categorize_email_async(email_content),
+                self.summarize_email_async(email_content),
+                self.extract_action_items_async(email_content),
+                self.confidence_scoring_async(email_content)
+            )
+            return {
+                'category': category['category'],
+                'summary': summary,
+                'action_items': action_items,
+                'confidence': confidence
+            }
+
+    async def process_many(self, emails: List[str], ops=DEFAULT_OPS) -> List[Dict[str, Any]]:
+        """Run the requested operations for many emails concurrently.
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an assistant that extracts action items from emails.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
-        )
+        All requests are fanned out with asyncio.gather, bounded by a
+        semaphore of MAX_CONCURRENCY in-flight API calls. Emails are
+        dispatched in waves of similar length, so requests in flight
+        together have comparable prompt sizes.
         
-        result = response.choices[0].message.content.strip()
+        Args:
+            emails: List of email contents
+            ops: Operation names to run per email (see OPERATIONS)
+            
+        Returns:
+            One dict per email (in input order) mapping op name to its result,
+            or to the raised exception if that call failed
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        if result.lower() == 'none' or not result:
-            return []
+        async def bounded(op, email_content):
+            async with semaphore:
+                return await getattr(self, OPERATIONS[op] + '_async')(email_content)
         
-        action_items = [
-            item.strip('- •*').strip() 
-            for item in result.split('\n') 
-            if item.strip()
-        ]
+        order = [i for indices in _length_bucketed(emails, self.max_concurrency) for i in indices]
+        coros = [bounded(op, emails[i]) for i in order for op in ops]
+        results = await asyncio.gather(*coros, return_exceptions=True)
         
-        return action_items
+        n_ops = len(ops)
+        by_index = {
+            i: dict(zip(ops, results[k * n_ops:(k + 1) * n_ops]))
+            for k, i in enumerate(order)
+        }
+        return [by_index[i] for i in range(len(emails))]
 
-    def confidence_scoring(self, email_content: str) -> Dict[str, float]:
-        """Provide confidence scoring for the categorization of an email."""
-        # Truncate email content if needed
-        email_content = self._truncate_email_content(email_content)
-        
-        categories_str = ', '.join(self.categories)
-        prompt = (
-            f"Rate the confidence (0-100%) that this email belongs to each category: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
-            f"Respond in format: CategoryName: XX%"
-        )
+    def batch_categorize(self, emails: List[str]) -> str:
+        """Submit a categorization job for many emails to the OpenAI Batch API.
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {'role': 'system', 'content': 'You are an email analysis assistant.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            max_tokens=self.max_tokens
+        Batch jobs cost 50% less than individual requests and use a separate
+        rate-limit pool, but complete asynchronously (within 24h).
+        
+        Args:
+            emails: List of email contents
+            
+        Returns:
+            The batch ID, to be passed to poll_batch(). Results are keyed by
+            custom_id 'email-<index>'.
+        """
+        lines = []
+        for i, email_content in enumerate(emails):
+            lines.append(json.dumps({
+                'custom_id': f'email-{i}',
+                'method': 'POST',
+                'url': BATCH_ENDPOINT,
+                'body': self._chat_request(*self._categorize_messages(email_content),
+                                           **self._categorize_options)
+            }))
+        
+        batch_file = self.client.files.create(
+            file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+            purpose='batch'
         )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window='24h'
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str, initial_delay: float = 5.0,
+                   max_delay: float = 300.0) -> Dict[str, Dict[str, str]]:
+        """Wait for a batch submitted by batch_categorize() and collect its results.
         
-        result = response.choices[0].message.content.strip()
+        Polls with exponential backoff until the batch reaches a terminal state.
+        
+        Args:
+            batch_id: ID returned by batch_categorize()
+            initial_delay: Seconds to wait before the first re-check
+            max_delay: Upper bound for the delay between checks
+            
+        Returns:
+            Dict mapping custom_id to the categorization result. Requests that
+            failed inside the batch are omitted.
+            
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        delay = initial_delay
+        batch = self.client.batches.retrieve(batch_id)
+        while batch.status not in BATCH_TERMINAL_STATES:
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+            batch = self.client.batches.retrieve(batch_id)
         
-        scores = {}
-        for line in result.split('\n'):
-            if ':' in line:
-                category, score = line.split(':', 1)
-                category = category.strip()
-                score = score.strip().rstrip('%')
-                try:
-                    scores[category] = float(score) / 100.0
-                except ValueError:
-                    pass
-        
-        return scores
\ No newline at end of file
+        if batch.status != 'completed':
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+        if not batch.output_file_id:
+            return {}
+        
+        output = self.client.files.content(batch.output_file_id).text
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get('response') or {}
+            if record.get('error') or response.get('status_code') != 200:
+                continue
+            content = response['body']['choices'][0]['message']['content'].strip()
+            results[record['custom_id']] = self._parse_category(content)
+        return results
+
+
+def _gemini_organizer(config=None, api_key=None):
+    # Imported on first use: google.genai pulls in gRPC and protobuf, which
+    # OpenAI users shouldn't pay for at import time
+    from google_gemini_helper import GeminiEmailOrganizer
+    return GeminiEmailOrganizer(config=config)
+
+
+# LLM_PROVIDER -> organizer factory
+_PROVIDERS = {
+    'gemini': _gemini_organizer,
+    'openai': _OpenAIEmailOrganizer,
+}
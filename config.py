@@ -10,76 +10,148 @@ Configuration includes:
 """
 
 import os
-from typing import List, Optional
+from functools import cached_property
+from typing import Dict, FrozenSet, Optional, Tuple
+from env_loader import load_env_file
+from rules import Rule, parse_rules
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Accepted spellings of a true boolean setting (compared lowercased)
+_TRUTHY = frozenset({'true', '1', 'yes', 'on'})
 
 
 class Config:
-    """Configuration management for Email Organizer AI."""
+    """Configuration management for Email Organizer AI.
+
+    The environment is snapshotted on the first setting read and each
+    value is parsed once and cached on the instance; call reload() (or
+    create a new Config) to pick up environment changes.
+    """
+
+    def reload(self) -> None:
+        """Drop all cached values so the next access re-reads the environment."""
+        self.__dict__.clear()
+
+    @cached_property
+    def _env(self) -> Dict[str, str]:
+        """Snapshot of the environment (including .env), taken on first setting read."""
+        Config.load_env()
+        return dict(os.environ)
+
+    def _get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._env.get(name, default)
+
+    def _int(self, name: str, default: int) -> int:
+        value = self._env.get(name)
+        return default if value is None else int(value)
+
+    def _float(self, name: str, default: float) -> float:
+        value = self._env.get(name)
+        return default if value is None else float(value)
+
+    def _bool(self, name: str, default: bool) -> bool:
+        value = self._env.get(name)
+        return default if value is None else value.strip().lower() in _TRUTHY
+
+    def _csv(self, name: str, default: str) -> Tuple[str, ...]:
+        """Parse a comma-separated variable into an immutable tuple, skipping empty entries."""
+        return tuple(item.strip() for item in self._env.get(name, default).split(',') if item.strip())
 
     # -----------------------------------------------------------------------------
     # LLM Provider Selection
     # -----------------------------------------------------------------------------
-    @property
+    @cached_property
     def LLM_PROVIDER(self) -> str:
         """Which LLM provider to use: 'openai' or 'gemini'"""
-        return os.getenv('LLM_PROVIDER', 'openai').lower()
+        return self._get('LLM_PROVIDER', 'openai').lower()
 
     # -----------------------------------------------------------------------------
     # Google Gemini API Configuration
     # -----------------------------------------------------------------------------
-    @property
+    @cached_property
     def GOOGLE_API_KEY(self) -> Optional[str]:
         """Google Gemini API key for AI-powered email categorization."""
-        return os.getenv('GOOGLE_API_KEY')
+        return self._get('GOOGLE_API_KEY')
 
-    @property
+    @cached_property
     def GEMINI_MODEL(self) -> str:
         """Google Gemini model to use."""
-        return os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+        return self._get('GEMINI_MODEL', 'gemini-2.0-flash')
+
+    # Set once .env has been loaded so repeated load_env() calls are free
+    _env_loaded = False
 
     @staticmethod
     def load_env():
-        """Load environment variables from .env file if it exists."""
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-        except ImportError:
-            # python-dotenv not installed, skip loading .env file
-            # Environment variables from system/Codespaces will still work
-            pass
+        """Load environment variables from .env file if it exists (once per process).
+
+        Skipped entirely when SKIP_DOTENV is set, e.g. in CI or production
+        where the environment is already complete.
+        """
+        if Config._env_loaded:
+            return
+        Config._env_loaded = True
+        if os.environ.get('SKIP_DOTENV'):
+            return
+        # Project directory first, then the working directory.
+        # Environment variables from system/Codespaces always take precedence.
+        if not load_env_file(os.path.join(_PROJECT_DIR, '.env')):
+            load_env_file('.env')
 
     # -----------------------------------------------------------------------------
     # Gmail API Configuration
     # -----------------------------------------------------------------------------
-    @property
+    @cached_property
     def GMAIL_CREDENTIALS_JSON(self) -> Optional[str]:
         """Gmail API credentials as JSON string."""
-        return os.getenv('GMAIL_CREDENTIALS_JSON')
+        return self._get('GMAIL_CREDENTIALS_JSON')
     
-    @property
+    @cached_property
     def GMAIL_CREDENTIALS_PATH(self) -> Optional[str]:
         """Path to Gmail credentials file (legacy support)."""
-        return os.getenv('GMAIL_CREDENTIALS_PATH')
+        return self._get('GMAIL_CREDENTIALS_PATH')
 
     # -----------------------------------------------------------------------------
     # OpenAI API Configuration
     # -----------------------------------------------------------------------------
-    @property
+    @cached_property
     def OPENAI_API_KEY(self) -> Optional[str]:
         """OpenAI API key for AI-powered email categorization."""
-        return os.getenv('OPENAI_API_KEY')
+        return self._get('OPENAI_API_KEY')
     
-    @property
+    @cached_property
     def OPENAI_MODEL(self) -> str:
         """OpenAI model to use."""
-        return os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        return self._get('OPENAI_MODEL', 'gpt-4o-mini')
     
-    @property
+    @cached_property
+    def OPENAI_CLASSIFY_MODEL(self) -> str:
+        """Model used for categorization (defaults to OPENAI_MODEL).
+
+        Short-label classification works well on small, cheap models, so this
+        can point at a smaller model than the one used for summaries.
+        """
+        return self._get('OPENAI_CLASSIFY_MODEL', self.OPENAI_MODEL)
+    
+    @cached_property
+    def OPENAI_SUMMARY_MODEL(self) -> str:
+        """Model used for summaries, action items and analysis (defaults to OPENAI_MODEL)."""
+        return self._get('OPENAI_SUMMARY_MODEL', self.OPENAI_MODEL)
+    
+    @cached_property
+    def OLLAMA_BASE_URL(self) -> str:
+        """OpenAI-compatible endpoint for categorization (e.g. http://localhost:11434/v1).
+
+        When set, categorize calls go to this server using OPENAI_CLASSIFY_MODEL.
+        """
+        return self._get('OLLAMA_BASE_URL', '')
+    
+    @cached_property
     def OPENAI_MAX_TOKENS(self) -> int:
         """Maximum tokens for OpenAI API calls."""
-        return int(os.getenv('OPENAI_MAX_TOKENS', '500'))
+        return self._int('OPENAI_MAX_TOKENS', 500)
     
-    @property
+    @cached_property
     def MAX_EMAIL_CONTENT_LENGTH(self) -> int:
         """Maximum character length for email content sent to AI model.
 
@@ -87,36 +159,152 @@ class Config:
         Default is 8,000 – suitable for OpenAI's base models.
         Adjust via environment variable MAX_EMAIL_CONTENT_LENGTH.
         """
-        return int(os.getenv('MAX_EMAIL_CONTENT_LENGTH', '8000'))
+        return self._int('MAX_EMAIL_CONTENT_LENGTH', 8000)
+    
+    @cached_property
+    def MAX_EMAIL_TOKENS(self) -> int:
+        """Maximum number of tokens of email content sent to the AI model.
+
+        Applied on top of MAX_EMAIL_CONTENT_LENGTH whenever a tokenizer is
+        available, so the limit holds regardless of language.
+        """
+        return self._int('MAX_EMAIL_TOKENS', 3000)
     
-    @property
+    @cached_property
     def RATE_LIMIT_DELAY(self) -> float:
-        """Delay between email processing operations (seconds)."""
-        return float(os.getenv('RATE_LIMIT_DELAY', '0.5'))
+        """Minimum spacing between the starts of email processing operations (seconds)."""
+        return self._float('RATE_LIMIT_DELAY', 0.5)
+
+    @cached_property
+    def RPM_LIMIT(self) -> int:
+        """Maximum LLM requests per minute for async calls (0 disables the limit)."""
+        return self._int('RPM_LIMIT', 500)
+
+    @cached_property
+    def TPM_LIMIT(self) -> int:
+        """Maximum LLM tokens per minute for async calls (0 disables the limit)."""
+        return self._int('TPM_LIMIT', 200000)
+
+    @cached_property
+    def MAX_CONCURRENCY(self) -> int:
+        """Maximum number of emails (and in-flight LLM requests) processed concurrently."""
+        return self._int('MAX_CONCURRENCY', 8)
+
+    @cached_property
+    def BATCH_ROWS(self) -> int:
+        """Number of emails packed into one prompt for marshaled categorization."""
+        return self._int('BATCH_ROWS', 10)
+
+    @cached_property
+    def LLM_CACHE_ENABLED(self) -> bool:
+        """Whether to cache LLM responses (summaries and action items included) on disk. Opt-in."""
+        return self._bool('LLM_CACHE_ENABLED', False)
+
+    @cached_property
+    def LLM_CACHE_PATH(self) -> str:
+        """SQLite file used for the LLM response cache (per-user cache directory by default)."""
+        return self._get('LLM_CACHE_PATH', '~/.cache/email-organizer/llm_cache.sqlite')
+
+    @cached_property
+    def SEMANTIC_CACHE_ENABLED(self) -> bool:
+        """Whether near-duplicate emails reuse an earlier analysis (costs one embedding per email)."""
+        return self._bool('SEMANTIC_CACHE_ENABLED', False)
+
+    @cached_property
+    def SEMANTIC_CACHE_PATH(self) -> str:
+        """SQLite file used for the semantic (embedding) cache (per-user cache directory by default)."""
+        return self._get('SEMANTIC_CACHE_PATH', '~/.cache/email-organizer/semantic_cache.sqlite')
+
+    @cached_property
+    def SEMANTIC_CACHE_THRESHOLD(self) -> float:
+        """Minimum cosine similarity for a semantic cache hit."""
+        return self._float('SEMANTIC_CACHE_THRESHOLD', 0.93)
+
+    @cached_property
+    def GMAIL_CACHE_ENABLED(self) -> bool:
+        """Whether to cache fetched message content and subjects on disk. Opt-in."""
+        return self._bool('GMAIL_CACHE_ENABLED', False)
+
+    @cached_property
+    def GMAIL_CACHE_PATH(self) -> str:
+        """SQLite file used for the Gmail message cache (per-user cache directory by default)."""
+        return self._get('GMAIL_CACHE_PATH', '~/.cache/email-organizer/gmail_cache.sqlite')
+
+    @cached_property
+    def GMAIL_TOKEN_CACHE_PATH(self) -> str:
+        """File caching the refreshed OAuth access token between runs (empty to disable)."""
+        return self._get('GMAIL_TOKEN_CACHE_PATH', '~/.cache/email-organizer/token.cache')
+
+    @cached_property
+    def WATCH_INTERVAL(self) -> float:
+        """Seconds between inbox checks in --watch mode."""
+        return self._float('WATCH_INTERVAL', 60.0)
+
+    @cached_property
+    def HISTORY_STATE_PATH(self) -> str:
+        """File storing the last Gmail history ID seen in --watch mode."""
+        return self._get('HISTORY_STATE_PATH', '~/.cache/email-organizer/history.json')
 
     # -----------------------------------------------------------------------------
     # Email Category Configuration
     # -----------------------------------------------------------------------------
-    @property
-    def DEFAULT_CATEGORIES(self) -> List[str]:
+    @cached_property
+    def DEFAULT_CATEGORIES(self) -> Tuple[str, ...]:
         """Default email categories for classification."""
-        categories_str = os.getenv('DEFAULT_CATEGORIES', 
-                                   'Important,Work,Personal,Promotions,Social,Newsletters,Spam')
-        return [cat.strip() for cat in categories_str.split(',')]
+        return self._csv('DEFAULT_CATEGORIES', 'Important,Work,Personal,Promotions,Social,Newsletters,Spam')
 
-    @property
-    def EMAIL_CATEGORIES(self) -> List[str]:
+    @cached_property
+    def EMAIL_CATEGORIES(self) -> Tuple[str, ...]:
         """Email categories for AI classification (alias for DEFAULT_CATEGORIES)."""
         return self.DEFAULT_CATEGORIES
 
-    @property
-    def CATEGORIES_TO_KEEP(self) -> List[str]:
+    @cached_property
+    def CATEGORIES_TO_KEEP(self) -> Tuple[str, ...]:
         """Categories to keep and archive (others will be trashed)."""
-        categories_str = os.getenv('CATEGORIES_TO_KEEP', 'Notes,Github')
-        return [cat.strip() for cat in categories_str.split(',')]
+        return self._csv('CATEGORIES_TO_KEEP', 'Notes,Github')
 
-    @property
-    def CUSTOM_LABELS(self) -> List[str]:
+    @cached_property
+    def CATEGORIES_TO_KEEP_SET(self) -> FrozenSet[str]:
+        """CATEGORIES_TO_KEEP as a set, for O(1) membership checks."""
+        return frozenset(self.CATEGORIES_TO_KEEP)
+
+    @cached_property
+    def CATEGORIES_TO_KEEP_LOWER(self) -> FrozenSet[str]:
+        """Lowercased CATEGORIES_TO_KEEP, for case-insensitive membership checks."""
+        return frozenset(cat.lower() for cat in self.CATEGORIES_TO_KEEP)
+
+    @cached_property
+    def CATEGORY_RULES(self) -> Tuple[Rule, ...]:
+        """Sender/subject rules that categorize emails without an LLM call.
+
+        Semicolon-separated 'pattern=Category' entries; patterns are sender
+        globs by default, or subject regexes with a 'subject:' prefix.
+        """
+        return parse_rules(self._get('CATEGORY_RULES', ''))
+
+    @cached_property
+    def LABELS_TO_PRESERVE(self) -> Tuple[str, ...]:
+        """Labels to protect from deletion (defaults to CATEGORIES_TO_KEEP)."""
+        labels = self._csv('LABELS_TO_PRESERVE', '')
+        return labels or self.CATEGORIES_TO_KEEP
+
+    @cached_property
+    def LABELS_TO_PRESERVE_SET(self) -> FrozenSet[str]:
+        """LABELS_TO_PRESERVE as a set, for O(1) membership checks."""
+        if self.LABELS_TO_PRESERVE is self.CATEGORIES_TO_KEEP:
+            return self.CATEGORIES_TO_KEEP_SET
+        return frozenset(self.LABELS_TO_PRESERVE)
+
+    @cached_property
+    def CUSTOM_LABELS(self) -> Tuple[str, ...]:
         """Custom labels to apply to emails (optional)."""
-        labels_str = os.getenv('CUSTOM_LABELS', '')
-        return [label.strip() for label in labels_str.split(',') if label.strip()]
\ No newline at end of file
+        return self._csv('CUSTOM_LABELS', '')
+
+
+# Process-wide instance; import it with `from config import config`
+config = Config()
+
+
+def get_config() -> Config:
+    """Return the process-wide Config instance."""
+    return config
@@ -0,0 +1,91 @@
+"""Minimal .env file loader.
+
+Scans the file with plain bytes operations instead of regular expressions:
+- One read, one split into lines
+- Key validation through a bytes.translate lookup table
+- Supports comments, 'export ' prefixes, quoted values and inline comments
+
+Existing environment variables are never overridden. Multi-line values are
+not supported.
+"""
+
+import os
+from typing import Dict
+
+# Characters allowed in a variable name; translate() deletes them, so a valid
+# key translates to b''
+_KEY_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-'
+_EXPORT_PREFIX = b'export '
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+
+def parse_env(data: bytes) -> Dict[str, str]:
+    """Parse .env file contents into a {name: value} dict (later lines win)."""
+    values = {}
+    for line in data.split(b'\n'):
+        line = line.strip()
+        if not line or line[0] == 0x23:  # blank or '#'
+            continue
+        if line.startswith(_EXPORT_PREFIX):
+            line = line[len(_EXPORT_PREFIX):].lstrip()
+        eq = line.find(b'=')
+        if eq <= 0:
+            continue
+        key = line[:eq].rstrip()
+        if not key or key.translate(None, _KEY_CHARS):
+            continue
+        values[key.decode('utf-8')] = _parse_value(line[eq + 1:].lstrip())
+    return values
+
+
+def _parse_value(raw: bytes) -> str:
+    quote = raw[:1]
+    if quote == b"'":
+        end = raw.find(quote, 1)
+        if end > 0:
+            return raw[1:end].decode('utf-8')
+    elif quote == b'"':
+        end = raw.find(quote, 1)
+        while end > 0 and raw[end - 1] == 0x5C:  # skip escaped \"
+            end = raw.find(quote, end + 1)
+        if end > 0:
+            return _unescape(raw[1:end].decode('utf-8'))
+
+    comment = raw.find(b' #')
+    if comment >= 0:
+        raw = raw[:comment]
+    return raw.rstrip().decode('utf-8')
+
+
+def _unescape(value: str) -> str:
+    """Expand backslash escapes inside a double-quoted value."""
+    if '\\' not in value:
+        return value
+    parts = []
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char == '\\' and i + 1 < len(value):
+            nxt = value[i + 1]
+            parts.append(_ESCAPES.get(nxt, char + nxt))
+            i += 2
+        else:
+            parts.append(char)
+            i += 1
+    return ''.join(parts)
+
+
+def load_env_file(path: str = '.env') -> bool:
+    """Load variables from path into os.environ without overriding existing ones.
+
+    Returns:
+        True if the file was found and loaded
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return False
+    for key, value in parse_env(data).items():
+        os.environ.setdefault(key, value)
+    return True
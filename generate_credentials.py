@@ -8,68 +8,102 @@ set in your GitHub Codespaces secrets.
 
 import json
 import os
+import subprocess
+import sys
 import webbrowser
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Required scopes for the Email Organizer AI
-SCOPES = [
+SCOPES = (
     'https://www.googleapis.com/auth/gmail.readonly',
     'https://www.googleapis.com/auth/gmail.modify',
     'https://www.googleapis.com/auth/gmail.labels'
-]
+)
+_SCOPES_BANNER = '\n'.join(f"  • {scope}" for scope in SCOPES)
+_RULE = "=" * 70
+
+
+def _dumps_indented(obj):
+    """Pretty-print obj as JSON, using orjson's C encoder when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+
+def _write(*lines):
+    """Write a block of lines to stdout with a single write call."""
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 def open_url_in_codespaces(url):
     """Open URL in host browser from Codespaces."""
     try:
         # In Codespaces, $BROWSER should open in the host browser
         if os.environ.get('CODESPACES'):
-            os.system(f'"{os.environ.get("BROWSER", "xdg-open")}" {url}')
+            # No shell: the URL is passed as an argument, never parsed by sh
+            subprocess.Popen(
+                [os.environ.get('BROWSER', 'xdg-open'), url],
+                close_fds=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
         else:
             webbrowser.open(url)
-    except:
+    except Exception:
         pass
 
 def main():
-    print("\n" + "="*70)
-    print("Gmail OAuth Credentials Generator")
-    print("="*70)
-    print("\nThis will generate credentials with the following scopes:")
-    for scope in SCOPES:
-        print(f"  • {scope}")
-    print("\n" + "="*70)
+    _write(
+        "", _RULE,
+        "Gmail OAuth Credentials Generator",
+        _RULE,
+        "", "This will generate credentials with the following scopes:",
+        _SCOPES_BANNER,
+        "", _RULE
+    )
     
     # Check if credentials.json exists
-    if not os.path.exists('credentials.json'):
-        print("\n❌ ERROR: credentials.json not found!")
-        print("\nYou need to download OAuth 2.0 Client credentials first:")
-        print("\n📋 STEPS TO GET credentials.json:")
-        print("="*70)
-        print("1. Go to: https://console.cloud.google.com/apis/credentials")
-        print("2. Click 'Create Credentials' → 'OAuth client ID'")
-        print("3. Set Application type: 'Desktop app'")
-        print("4. Name it something like 'Email Organizer AI'")
-        print("5. Click 'Create'")
-        print("6. Download the JSON file")
-        print("7. Save it as 'credentials.json' in this directory")
-        print("\n8. Then run this script again")
-        print("="*70)
+    # isfile: a directory named credentials.json must not pass the check
+    if not os.path.isfile('credentials.json'):
+        _write(
+            "", "❌ ERROR: credentials.json not found!",
+            "", "You need to download OAuth 2.0 Client credentials first:",
+            "", "📋 STEPS TO GET credentials.json:",
+            _RULE,
+            "1. Go to: https://console.cloud.google.com/apis/credentials",
+            "2. Click 'Create Credentials' → 'OAuth client ID'",
+            "3. Set Application type: 'Desktop app'",
+            "4. Name it something like 'Email Organizer AI'",
+            "5. Click 'Create'",
+            "6. Download the JSON file",
+            "7. Save it as 'credentials.json' in this directory",
+            "", "8. Then run this script again",
+            _RULE
+        )
         return
     
-    print("\n✅ Found credentials.json")
-    print("\n🔐 Starting OAuth flow...")
-    print("\n" + "="*70)
-    print("CODESPACES USERS: A browser will open automatically")
-    print("Click 'Open' when prompted to open the OAuth page")
-    print("="*70)
-    print("\nPress Enter to start...")
+    _write(
+        "", "✅ Found credentials.json",
+        "", "🔐 Starting OAuth flow...",
+        "", _RULE,
+        "CODESPACES USERS: A browser will open automatically",
+        "Click 'Open' when prompted to open the OAuth page",
+        _RULE,
+        "", "Press Enter to start..."
+    )
     input()
     
+    # Imported here so the error/help path doesn't pay for the Google auth stack
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    
     try:
         # Run the OAuth flow
         flow = InstalledAppFlow.from_client_secrets_file(
             'credentials.json', 
-            SCOPES
+            list(SCOPES)
         )
         
         # Try to run local server - Codespaces will auto-forward the port
@@ -81,9 +115,11 @@ def main():
                 open_browser=True
             )
         except Exception as local_error:
-            print(f"\n⚠️  Local server failed: {local_error}")
-            print("\n📋 USING MANUAL METHOD INSTEAD")
-            print("="*70)
+            _write(
+                "", f"⚠️  Local server failed: {local_error}",
+                "", "📋 USING MANUAL METHOD INSTEAD",
+                _RULE
+            )
             
             # Fallback to manual method
             auth_url, state = flow.authorization_url(
@@ -91,24 +127,25 @@ def main():
                 access_type='offline'
             )
             
-            print("\n1. Open this URL in your browser:")
-            print(f"\n{auth_url}\n")
-            print("2. After authorization, you'll be redirected to a URL")
-            print("3. Copy the ENTIRE URL from your browser address bar")
-            print("   (Even if it says 'localhost refused to connect')")
-            print("   (The URL will contain 'code=' in it)")
-            print("4. Paste it below\n")
+            _write(
+                "", "1. Open this URL in your browser:",
+                "", auth_url, "",
+                "2. After authorization, you'll be redirected to a URL",
+                "3. Copy the ENTIRE URL from your browser address bar",
+                "   (Even if it says 'localhost refused to connect')",
+                "   (The URL will contain 'code=' in it)",
+                "4. Paste it below", ""
+            )
             
             try:
                 response_url = input('Paste the full redirect URL here: ').strip()
                 
                 # Parse the authorization response
-                from urllib.parse import urlparse, parse_qs
-                parsed = urlparse(response_url)
-                query_params = parse_qs(parsed.query)
+                from urllib.parse import urlparse, parse_qsl
+                query = urlparse(response_url).query
+                code = next((value for key, value in parse_qsl(query) if key == 'code'), None)
                 
-                if 'code' in query_params:
-                    code = query_params['code'][0]
+                if code is not None:
                     flow.fetch_token(code=code)
                     creds = flow.credentials
                 else:
@@ -118,44 +155,48 @@ def main():
                 print(f"\n❌ Failed to process authorization: {e}")
                 return 1
         
-        print("\n" + "="*70)
-        print("✅ AUTHENTICATION SUCCESSFUL!")
-        print("="*70)
+        _write("", _RULE, "✅ AUTHENTICATION SUCCESSFUL!", _RULE)
+        
+        # Serialize once; reused for token.json and the printed secret
+        creds_json = creds.to_json()
         
         # Save to token.json for local use
         with open('token.json', 'w') as token:
-            token.write(creds.to_json())
+            token.write(creds_json)
         print("\n✅ Saved credentials to token.json (for local testing)")
         
         # Generate the JSON format for GitHub secrets
-        creds_dict = json.loads(creds.to_json())
+        creds_dict = json.loads(creds_json)
         
-        print("\n" + "="*70)
-        print("📋 COPY THIS TO YOUR GITHUB CODESPACES SECRET")
-        print("="*70)
-        print("\n1. Go to: https://github.com/settings/codespaces")
-        print("   or: https://github.com/jianranli/email-organizer-ai/settings/secrets/codespaces")
-        print("\n2. Create or update secret: GMAIL_CREDENTIALS_JSON")
-        print("\n3. Copy and paste the JSON below as the value:")
-        print("\n" + "-"*70)
-        print(json.dumps(creds_dict, indent=2))
-        print("-"*70)
-        
-        print("\n" + "="*70)
-        print("✅ SETUP COMPLETE!")
-        print("="*70)
-        print("\nNext steps:")
-        print("  1. Copy the JSON above to GMAIL_CREDENTIALS_JSON secret")
-        print("  2. Restart your Codespace or reload environment variables")
-        print("  3. Run: python main.py -n 1")
-        print("\n")
+        _write(
+            "", _RULE,
+            "📋 COPY THIS TO YOUR GITHUB CODESPACES SECRET",
+            _RULE,
+            "", "1. Go to: https://github.com/settings/codespaces",
+            "   or: https://github.com/jianranli/email-organizer-ai/settings/secrets/codespaces",
+            "", "2. Create or update secret: GMAIL_CREDENTIALS_JSON",
+            "", "3. Copy and paste the JSON below as the value:",
+            "", "-" * 70,
+            _dumps_indented(creds_dict),
+            "-" * 70,
+            "", _RULE,
+            "✅ SETUP COMPLETE!",
+            _RULE,
+            "", "Next steps:",
+            "  1. Copy the JSON above to GMAIL_CREDENTIALS_JSON secret",
+            "  2. Restart your Codespace or reload environment variables",
+            "  3. Run: python main.py -n 1",
+            "", ""
+        )
         
     except Exception as e:
-        print(f"\n❌ ERROR: {e}")
-        print("\nTroubleshooting:")
-        print("  • Make sure you authorized all requested permissions")
-        print("  • Check that credentials.json is valid")
-        print("  • Try running the script again")
+        _write(
+            "", f"❌ ERROR: {e}",
+            "", "Troubleshooting:",
+            "  • Make sure you authorized all requested permissions",
+            "  • Check that credentials.json is valid",
+            "  • Try running the script again"
+        )
         return 1
     
     return 0
@@ -8,15 +8,40 @@ Provides a wrapper around the Gmail API for:
 - Trashing emails
 """
 
+import asyncio
 import os
 import base64
+import hashlib
+import html
 import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import httplib2
+import httpx
+from requests.adapters import HTTPAdapter
 import google.auth
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+from sqlite_cache import SQLiteCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
 
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -24,12 +49,230 @@ SCOPES = [
     'https://www.googleapis.com/auth/gmail.labels'
 ]
 
+# Gmail accepts at most this many subrequests per batch HTTP call
+BATCH_SIZE = 100
+
+# messages.batchModify accepts at most this many IDs per call
+BATCH_MODIFY_SIZE = 1000
+
+# Batches sent in parallel; each messages.get costs 5 quota units against a
+# 250 units/sec per-user limit, so this stays well under the ceiling
+FETCH_WORKERS = 10
+
+# Headers returned by fetch_emails in the default 'metadata' format
+METADATA_HEADERS = ('From', 'Subject', 'Date', 'List-Unsubscribe')
+
+# Transient API failures retried with exponential backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Gmail reports some quota errors as 403 with one of these reasons
+RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+MAX_RETRIES = 6
+
+# REST endpoint and in-flight request cap for the async fetch path
+GMAIL_API_BASE = 'https://gmail.googleapis.com/gmail/v1/users/me'
+FETCH_CONCURRENCY = 20
+FETCH_TIMEOUT = 30.0
+
+# Keep-alive pool for the shared REST session used by single-message lookups
+SESSION_POOL_CONNECTIONS = 20
+SESSION_POOL_MAXSIZE = 50
+# Category names that map to Gmail system labels instead of being created
+_SYSTEM_LABEL_MAP = {
+    'spam': 'SPAM',
+    'trash': 'TRASH',
+    'inbox': 'INBOX',
+    'sent': 'SENT',
+    'draft': 'DRAFT',
+    'drafts': 'DRAFT',
+    'important': 'IMPORTANT',
+    'starred': 'STARRED',
+    'unread': 'UNREAD',
+}
+
+# Gmail system label IDs that should NOT be deleted
+_SYSTEM_LABEL_IDS = frozenset({
+    'INBOX', 'SPAM', 'TRASH', 'UNREAD', 'STARRED', 'IMPORTANT',
+    'SENT', 'DRAFT', 'CHAT', 'CATEGORY_PERSONAL', 'CATEGORY_SOCIAL',
+    'CATEGORY_PROMOTIONS', 'CATEGORY_UPDATES', 'CATEGORY_FORUMS'
+})
+
+# orjson's C parser for API responses and credentials when it is installed
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# SIMD-accelerated base64 decoder when pybase64 is installed
+_urlsafe_b64decode = pybase64.urlsafe_b64decode if pybase64 is not None else base64.urlsafe_b64decode
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses discovery-client response bodies with orjson."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+            body = body['data']
+        return body
+
+
+# Quoted history the model doesn't need: everything from the reply header on
+# (Gmail wraps long "On ... wrote:" headers onto a second line)
+_REPLY_HEADER_RE = re.compile(
+    r'^(?:On [^\n]{1,200}(?:\n[^\n]{1,200})?wrote:|-{2,} ?Original Message ?-{2,})[ \t\r]*$',
+    re.M | re.I
+)
+# HTML-only bodies: invisible sections, then tags, then runs of blank lines
+_HTML_HIDDEN_RE = re.compile(r'<(style|script|head)\b.*?</\1\s*>', re.S | re.I)
+_HTML_BREAK_RE = re.compile(r'<(?:br|/p|/div|/tr|/li|/h\d)\b[^>]*>', re.I)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_BLANK_LINES_RE = re.compile(r'\n[ \t\xa0]*(?:\n[ \t\xa0]*)+')
+
+
+def _html_to_text(body):
+    """Reduce an HTML body to its visible text."""
+    body = _HTML_HIDDEN_RE.sub('', body)
+    body = _HTML_TAG_RE.sub('', _HTML_BREAK_RE.sub('\n', body))
+    return _BLANK_LINES_RE.sub('\n\n', html.unescape(body)).strip()
+
+
+def _strip_quoted_replies(body):
+    """Drop the quoted thread: a trailing run of '>' lines and the reply header before it.
+    
+    Quotes followed by more of the sender's own text are inline replies and
+    are kept, and so is a reply header with the sender's text below it.
+    """
+    lines = body.rstrip().split('\n')
+    end = len(lines)
+    while end and (not lines[end - 1].strip() or lines[end - 1].lstrip().startswith('>')):
+        end -= 1
+    # A message that is nothing but a quote keeps it
+    if not end:
+        return body.rstrip()
+    kept = '\n'.join(lines[:end]).rstrip()
+    # A header introduces the quote only when nothing of the sender's follows it
+    for match in _REPLY_HEADER_RE.finditer(kept):
+        if not kept[match.end():].strip():
+            return kept[:match.start()].rstrip()
+    return kept
+
+
+# Prefix of cached _format_message output; bump when the rendering changes so
+# earlier entries are not served
+MESSAGE_CACHE_PREFIX = 'message:v2:'
+
+# Cached access tokens are only reused with at least this many seconds left
+TOKEN_CACHE_MIN_TTL = 60
+
+# (credentials, service) per credentials JSON digest or token.json version, shared
+# across GmailClient instances
+_SERVICE_CACHE = {}
+
+
+def _refresh_token_digest(creds):
+    return hashlib.sha256(creds.refresh_token.encode('utf-8')).hexdigest()
+
+
+def _load_cached_token(creds, path):
+    """Put an access token saved by an earlier run onto creds if it is still fresh.
+    
+    Returns:
+        True if a cached token was applied
+    """
+    try:
+        with open(path, 'rb') as f:
+            cached = _json_loads(f.read())
+        if cached.get('refresh_token_sha') != _refresh_token_digest(creds):
+            return False
+        expiry = datetime.fromisoformat(cached['expiry'])
+        token = cached['access_token']
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return False
+    # google-auth compares naive UTC datetimes
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if (expiry - now).total_seconds() <= TOKEN_CACHE_MIN_TTL:
+        return False
+    creds.token = token
+    creds.expiry = expiry
+    return True
+
+
+def _save_cached_token(creds, path):
+    """Atomically write the current access token to path; failures are ignored."""
+    if not creds.token or not creds.expiry:
+        return
+    data = json.dumps({
+        'access_token': creds.token,
+        'expiry': creds.expiry.isoformat(),
+        'refresh_token_sha': _refresh_token_digest(creds),
+    })
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _is_retryable_status(status, content):
+    """Whether a response with this status code and body is worth retrying."""
+    return status in RETRY_STATUSES or (
+        status == 403 and any(reason in content for reason in RATE_LIMIT_REASONS)
+    )
+
+
+def _is_retryable(error):
+    return isinstance(error, HttpError) and _is_retryable_status(error.resp.status, error.content or b'')
+
+
+def _raise_for_status(response):
+    """Raise a failed requests/httpx response as the API client's HttpError.
+    
+    Session-based fetches then fail exactly like discovery-client calls, so
+    _is_retryable and the 404 handling treat both transports the same.
+    """
+    if response.status_code >= 400:
+        resp = httplib2.Response({**response.headers, 'status': response.status_code})
+        raise HttpError(resp, response.content, uri=str(response.url))
+
+
+def _retry_delay(headers, attempt):
+    """Seconds to wait before retry number attempt, honoring Retry-After."""
+    delay = 2 ** attempt
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            pass  # HTTP-date form; fall back to exponential backoff
+    return delay + random.random()
+
+
 class GmailClient:
+    __slots__ = ('config', 'creds', '_service', '_owner_thread', '_local', '_label_cache', '_label_lock',
+                 '_session', 'message_cache')
+
     def __init__(self, config=None):
         """Initialize Gmail client with config."""
         self.config = config
         self.creds = None
         self.service = None
+        self._label_cache = None  # {lowercase label name: label ID}
+        self._label_lock = threading.Lock()
+        self._session = None
+        
+        # Message content never changes in Gmail, so cached entries don't expire
+        if getattr(config, 'GMAIL_CACHE_ENABLED', False):
+            self.message_cache = SQLiteCache(config.GMAIL_CACHE_PATH)
+        else:
+            self.message_cache = None
+        
         self.authenticate()
 
     def authenticate(self):
@@ -46,8 +289,15 @@ class GmailClient:
         
         # Try to authenticate with JSON credentials
         if credentials_json:
+            # Reuse the client built for the same credentials while its token is valid
+            cache_key = hashlib.blake2b(credentials_json.encode('utf-8')).hexdigest()
+            cached = _SERVICE_CACHE.get(cache_key)
+            if cached and cached[0].valid:
+                self.creds, self.service = cached
+                return
+            
             try:
-                credentials_info = json.loads(credentials_json)
+                credentials_info = _json_loads(credentials_json)
                 cred_type = credentials_info.get('type', 'authorized_user')
                 
                 if cred_type == 'service_account':
@@ -74,7 +324,8 @@ class GmailClient:
                                 f"  - https://www.googleapis.com/auth/gmail.labels"
                             )
                 
-                self.service = build('gmail', 'v1', credentials=self.creds)
+                self.service = self._build_service()
+                _SERVICE_CACHE[cache_key] = (self.creds, self.service)
                 return
             except (json.JSONDecodeError, KeyError, ValueError) as e:
                 error_msg = str(e)
@@ -95,7 +346,17 @@ class GmailClient:
                 raise
         
         # Method 3: Try token.json (for local development with saved token)
+        cache_key = None
         if os.path.exists('token.json'):
+            # Reuse the client built from this version of the file while its token is valid
+            try:
+                cache_key = ('token.json', os.stat('token.json').st_mtime_ns)
+            except OSError:
+                pass
+            cached = _SERVICE_CACHE.get(cache_key)
+            if cached and cached[0].valid:
+                self.creds, self.service = cached
+                return
             self.creds = Credentials.from_authorized_user_file('token.json', SCOPES)
         
         # Method 4: Try credentials.json (for first-time OAuth flow)
@@ -112,119 +373,534 @@ class GmailClient:
                 "2. Provide credentials.json file"
             )
 
-        # Refresh expired credentials
-        if self.creds and self.creds.expired and self.creds.refresh_token:
-            self.creds.refresh(Request())
+        self._refresh_credentials()
 
-        self.service = build('gmail', 'v1', credentials=self.creds)
+        self.service = self._build_service()
+        if cache_key:
+            _SERVICE_CACHE[cache_key] = (self.creds, self.service)
 
-    def fetch_emails(self, query='', max_results=None):
+    def _refresh_credentials(self):
+        """Refresh expired credentials, reusing an access token cached by an earlier run.
+        
+        Short CLI runs otherwise pay an OAuth round trip on every start once
+        the token saved in token.json has expired.
+        """
+        creds = self.creds
+        if not (creds and creds.expired and creds.refresh_token):
+            return
+        
+        path = getattr(self.config, 'GMAIL_TOKEN_CACHE_PATH', None)
+        path = os.path.expanduser(path) if path else None
+        if path and _load_cached_token(creds, path) and not creds.expired:
+            return
+        
+        creds.refresh(Request())
+        if path:
+            _save_cached_token(creds, path)
+
+    @property
+    def service(self):
+        """Gmail API client for the calling thread.
+        
+        httplib2 is not thread-safe, so threads other than the one that set
+        the service get their own client built from the same credentials.
+        """
+        if self._service is None or threading.get_ident() == self._owner_thread:
+            return self._service
+        return self._thread_service()
+
+    @service.setter
+    def service(self, value):
+        self._service = value
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()  # drop clients built for the previous service
+
+    def fetch_emails(self, query='', max_results=None, fmt='metadata', metadata_headers=METADATA_HEADERS,
+                     newer_than=None, unread_only=False, labels=()):
         """Fetch emails matching the query with pagination support.
         
         Args:
             query (str): Gmail search query (e.g., 'in:inbox', 'is:unread')
             max_results (int, optional): Maximum number of emails to fetch. 
                                         If None, fetches all matching emails.
+            fmt (str): messages.get format ('minimal', 'metadata' or 'full').
+                       Defaults to headers and labels only; use hydrate_bodies
+                       for the messages whose body is actually needed.
+            metadata_headers: Headers to include when fmt is 'metadata'
+            newer_than (str, optional): Only emails newer than this, e.g. '7d'
+            unread_only (bool): Only unread emails
+            labels: Only emails carrying all of these label names
+        
+        These filters are added to the Gmail search query, so non-matching
+        emails are never listed or fetched.
         
         Returns:
             List of email message dictionaries
         """
+        return list(self.iter_emails(query, max_results, fmt, metadata_headers,
+                                     newer_than=newer_than, unread_only=unread_only, labels=labels))
+
+    def iter_emails(self, query='', max_results=None, fmt='metadata', metadata_headers=METADATA_HEADERS,
+                    newer_than=None, unread_only=False, labels=()):
+        """Yield emails matching the query page by page as they are fetched.
+        
+        Each listing page (up to 500 IDs) is hydrated before the next page is
+        requested, so consumers can start on the first messages right away.
+        Arguments are the same as fetch_emails.
+        """
+        get_kwargs = {'format': fmt}
+        if fmt == 'metadata':
+            get_kwargs['metadataHeaders'] = list(metadata_headers)
+        query = self._compose_query(query, newer_than, unread_only, labels)
+        
         try:
-            messages = []
-            page_token = None
-            
-            while True:
-                # Fetch a page of message IDs
-                if max_results and len(messages) >= max_results:
-                    break
-                
-                results = self.service.users().messages().list(
-                    userId='me', 
-                    q=query,
+            for page in self._iter_message_pages(query, max_results):
+                # Fetch message details, up to BATCH_SIZE per HTTP round trip
+                yield from self._batch_get_messages([msg['id'] for msg in page], **get_kwargs)
+        except Exception as e:
+            self._raise_scope_error(e)
+            raise
+
+    def iter_messages(self, message_ids, fmt='metadata', metadata_headers=METADATA_HEADERS):
+        """Yield message details for the given IDs (e.g. from list_history), like iter_emails."""
+        get_kwargs = {'format': fmt}
+        if fmt == 'metadata':
+            get_kwargs['metadataHeaders'] = list(metadata_headers)
+        ids = list(message_ids)
+        for start in range(0, len(ids), 500):
+            yield from self._batch_get_messages(ids[start:start + 500], **get_kwargs)
+
+    def get_history_id(self):
+        """Return the mailbox's current history ID (the starting point for list_history)."""
+        profile = self._exec(self.service.users().getProfile(userId='me', fields='historyId'))
+        return str(profile['historyId'])
+
+    def list_history(self, start_history_id, label_id='INBOX'):
+        """List messages added to a label since a history ID.
+
+        Uses the incremental users.history feed, which costs far less quota
+        than re-listing the label.
+
+        Args:
+            start_history_id: History ID from get_history_id or a previous call
+            label_id: Only report messages added with this label
+
+        Returns:
+            (message_ids, history_id) with IDs in the order they were added and
+            the history ID to pass next time, or None if start_history_id is
+            too old for Gmail to answer (a full scan is needed)
+        """
+        message_ids = {}  # insertion-ordered set
+        history_id = str(start_history_id)
+        page_token = None
+        while True:
+            try:
+                results = self._exec(self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    labelId=label_id,
+                    historyTypes='messageAdded',
                     pageToken=page_token,
-                    maxResults=min(500, max_results - len(messages)) if max_results else 500
-                ).execute()
-                
-                page_messages = results.get('messages', [])
-                if not page_messages:
-                    break
-                
-                messages.extend(page_messages)
-                
-                # Check if there are more pages
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
-            
-            # Fetch full message details for each email
-            email_data = []
-            for msg in messages:
-                msg_data = self.service.users().messages().get(userId='me', id=msg['id']).execute()
-                email_data.append(msg_data)
+                    maxResults=500,
+                    fields='history/messagesAdded/message/id,historyId,nextPageToken'
+                ))
+            except HttpError as e:
+                if e.resp.status == 404:
+                    return None
+                raise
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message_ids[added['message']['id']] = None
+            history_id = str(results.get('historyId', history_id))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return list(message_ids), history_id
 
-            return email_data
+    @staticmethod
+    def _compose_query(query, newer_than=None, unread_only=False, labels=()):
+        """Append fetch filters to a Gmail search query as search operators."""
+        terms = [query] if query else []
+        if unread_only:
+            terms.append('is:unread')
+        if newer_than:
+            terms.append(f'newer_than:{newer_than}')
+        # Gmail search spells spaces in label names as hyphens
+        terms.extend(f'label:{label.replace(" ", "-")}' for label in labels)
+        return ' '.join(terms)
+
+    def hydrate_bodies(self, message_ids):
+        """Fetch full message payloads for the given IDs, in order.
+        
+        Args:
+            message_ids: List of message IDs (e.g. from fetch_emails)
+        
+        Returns:
+            List of full message dictionaries
+        """
+        return self._batch_get_messages(list(message_ids), format='full')
+
+    async def fetch_emails_async(self, query='', max_results=None, concurrency=FETCH_CONCURRENCY):
+        """Async variant of fetch_emails that downloads message details concurrently.
+        
+        Message IDs are listed with the API client; the details are then
+        fetched over the Gmail REST endpoint with up to `concurrency`
+        requests in flight. 429/5xx responses are retried with the same
+        backoff as the API client calls.
+        
+        Returns:
+            List of email message dictionaries in listing order
+        """
+        try:
+            messages = self._list_messages(query, max_results)
+            if not messages:
+                return []
+            
+            # Make sure the bearer token is valid before fanning out; the
+            # refresh is a blocking HTTP call, so keep it off the event loop
+            if not self.creds.valid:
+                await asyncio.to_thread(self.creds.refresh, Request())
+            
+            semaphore = asyncio.Semaphore(concurrency)
+            async with self._open_async_session() as session:
+                return await asyncio.gather(*[
+                    self._afetch_message(session, semaphore, msg['id'])
+                    for msg in messages
+                ])
         except Exception as e:
-            error_msg = str(e)
-            if 'invalid_scope' in error_msg.lower():
-                raise ValueError(
-                    f"\\n{'='*70}\\n"
-                    f"GMAIL API SCOPE ERROR\\n"
-                    f"{'='*70}\\n"
-                    f"Your Gmail credentials don't have the required permissions.\\n\\n"
-                    f"The refresh token was created with insufficient scopes and needs to be\\n"
-                    f"regenerated with the proper permissions.\\n\\n"
-                    f"REQUIRED SCOPES:\\n"
-                    f"  • https://www.googleapis.com/auth/gmail.readonly\\n"
-                    f"  • https://www.googleapis.com/auth/gmail.modify\\n"
-                    f"  • https://www.googleapis.com/auth/gmail.labels\\n\\n"
-                    f"HOW TO FIX:\\n"
-                    f"1. Go to Google Cloud Console OAuth consent screen\\n"
-                    f"2. Revoke access for the current app (or delete old token)\\n"
-                    f"3. Re-run the OAuth flow with the required scopes\\n"
-                    f"4. Update GMAIL_CREDENTIALS_JSON with the new credentials\\n\\n"
-                    f"For local testing: Delete token.json and re-authenticate\\n"
-                    f"{'='*70}\\n"
-                ) from e
+            self._raise_scope_error(e)
             raise
 
+    def _open_async_session(self):
+        return httpx.AsyncClient(
+            base_url=GMAIL_API_BASE,
+            headers={'Authorization': f'Bearer {self.creds.token}'},
+            timeout=FETCH_TIMEOUT
+        )
+
+    @staticmethod
+    async def _afetch_message(session, semaphore, message_id, max_retries=MAX_RETRIES):
+        for attempt in range(max_retries + 1):
+            async with semaphore:
+                response = await session.get(f'/messages/{message_id}')
+            if not _is_retryable_status(response.status_code, response.content) or attempt == max_retries:
+                _raise_for_status(response)
+                return _json_loads(response.content)
+            # Back off without holding a concurrency slot
+            await asyncio.sleep(_retry_delay(response.headers, attempt))
+
+    def _list_messages(self, query, max_results):
+        """List message ID stubs matching query, following pagination."""
+        return [msg for page in self._iter_message_pages(query, max_results) for msg in page]
+
+    def _iter_message_pages(self, query, max_results):
+        """Yield pages of message ID stubs matching query."""
+        listed = 0
+        page_token = None
+        
+        while True:
+            # Fetch a page of message IDs
+            if max_results and listed >= max_results:
+                break
+            
+            results = self._exec(self.service.users().messages().list(
+                userId='me', 
+                q=query,
+                pageToken=page_token,
+                maxResults=min(500, max_results - listed) if max_results else 500,
+                fields='nextPageToken,messages/id'
+            ))
+            
+            page_messages = results.get('messages', [])
+            if not page_messages:
+                break
+            
+            listed += len(page_messages)
+            yield page_messages
+            
+            # Check if there are more pages
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    @staticmethod
+    def _raise_scope_error(e):
+        """Re-raise an invalid_scope API error as a ValueError with fix-up instructions."""
+        error_msg = str(e)
+        if 'invalid_scope' in error_msg.lower():
+            raise ValueError(
+                f"\\n{'='*70}\\n"
+                f"GMAIL API SCOPE ERROR\\n"
+                f"{'='*70}\\n"
+                f"Your Gmail credentials don't have the required permissions.\\n\\n"
+                f"The refresh token was created with insufficient scopes and needs to be\\n"
+                f"regenerated with the proper permissions.\\n\\n"
+                f"REQUIRED SCOPES:\\n"
+                f"  • https://www.googleapis.com/auth/gmail.readonly\\n"
+                f"  • https://www.googleapis.com/auth/gmail.modify\\n"
+                f"  • https://www.googleapis.com/auth/gmail.labels\\n\\n"
+                f"HOW TO FIX:\\n"
+                f"1. Go to Google Cloud Console OAuth consent screen\\n"
+                f"2. Revoke access for the current app (or delete old token)\\n"
+                f"3. Re-run the OAuth flow with the required scopes\\n"
+                f"4. Update GMAIL_CREDENTIALS_JSON with the new credentials\\n\\n"
+                f"For local testing: Delete token.json and re-authenticate\\n"
+                f"{'='*70}\\n"
+            ) from e
+
+    def _batch_get_messages(self, message_ids, **get_kwargs):
+        """Fetch many messages with Gmail batch requests, preserving input order.
+        
+        Batches of BATCH_SIZE are sent from up to FETCH_WORKERS threads, each
+        with its own service object since httplib2 is not thread-safe.
+        
+        Args:
+            message_ids: List of message IDs
+            **get_kwargs: Extra messages().get parameters (e.g. format='minimal')
+            
+        Returns:
+            List of message dictionaries in the same order as message_ids.
+            Messages deleted since they were listed (404) are left out.
+        
+        Raises:
+            The first other per-message error reported by a batch, if any
+        """
+        def fetch_chunk(chunk, service=None):
+            service = service or self._thread_service()
+            messages_api = service.users().messages()
+            return self._execute_batch(
+                service,
+                lambda i: messages_api.get(userId='me', id=chunk[i], **get_kwargs),
+                len(chunk),
+                return_exceptions=True
+            )
+        
+        chunks = [message_ids[i:i + BATCH_SIZE] for i in range(0, len(message_ids), BATCH_SIZE)]
+        if len(chunks) <= 1:
+            results = fetch_chunk(message_ids, self.service)
+        else:
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(chunks))) as executor:
+                results = [result for chunk in executor.map(fetch_chunk, chunks) for result in chunk]
+        
+        messages = []
+        for result in results:
+            if isinstance(result, HttpError) and result.resp.status == 404:
+                continue
+            if isinstance(result, Exception):
+                raise result
+            messages.append(result)
+        return messages
+
+    def _execute_batch(self, service, build_request, count, return_exceptions=False):
+        """Run up to BATCH_SIZE requests in a single batch HTTP call.
+        
+        Subrequests that fail with a retryable status are re-sent in a new
+        batch after a backoff delay.
+        
+        Args:
+            service: Gmail service to create the batch with
+            build_request: Callable returning the API request for index i
+            count: Number of requests
+            return_exceptions: If True, failed subrequests put their exception
+                               in the results instead of raising it
+        
+        Returns:
+            List of responses in index order
+        """
+        responses = {}
+        errors = {}
+        
+        def collect(request_id, response, exception):
+            if exception is not None:
+                errors[int(request_id)] = exception
+            else:
+                responses[int(request_id)] = response
+        
+        pending = range(count)
+        for attempt in range(MAX_RETRIES + 1):
+            if not pending:
+                break
+            errors.clear()
+            batch = service.new_batch_http_request(callback=collect)
+            for i in pending:
+                batch.add(build_request(i), request_id=str(i))
+            self._exec(batch)
+            
+            pending = []
+            for i, error in sorted(errors.items()):
+                if _is_retryable(error) and attempt < MAX_RETRIES:
+                    pending.append(i)
+                elif return_exceptions:
+                    responses[i] = error
+                else:
+                    raise error
+            if pending:
+                time.sleep(max(_retry_delay(errors[i].resp, attempt) for i in pending))
+        
+        return [responses[i] for i in range(count)]
+
+    @staticmethod
+    def _exec(request, max_retries=MAX_RETRIES):
+        """Execute an API request, retrying 429/5xx responses with exponential backoff."""
+        for attempt in range(max_retries + 1):
+            try:
+                return request.execute()
+            except HttpError as e:
+                if not _is_retryable(e) or attempt == max_retries:
+                    raise
+                time.sleep(_retry_delay(e.resp, attempt))
+
+    def _build_service(self):
+        """Build a Gmail API client from the discovery document bundled with the library.
+        
+        Avoids fetching the document over the network and the file cache
+        lookup on every construction.
+        """
+        return build(
+            'gmail', 'v1',
+            credentials=self.creds,
+            cache_discovery=False,
+            static_discovery=True,
+            model=_OrjsonModel() if orjson is not None else None
+        )
+
+    def _thread_service(self):
+        """Return a Gmail service owned by the current thread."""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._build_service()
+            self._local.service = service
+        return service
+
     def manage_labels(self, operation, label_id, label_object=None):
+        if operation in ('create', 'delete', 'update'):
+            self._label_cache = None
         if operation == 'create':
-            self.service.users().labels().create(userId='me', body=label_object).execute()
+            self._exec(self.service.users().labels().create(userId='me', body=label_object))
         elif operation == 'delete':
-            self.service.users().labels().delete(userId='me', id=label_id).execute()
+            self._exec(self.service.users().labels().delete(userId='me', id=label_id))
         elif operation == 'update':
-            self.service.users().labels().update(userId='me', id=label_id, body=label_object).execute()
+            self._exec(self.service.users().labels().update(userId='me', id=label_id, body=label_object))
         elif operation == 'get':
-            return self.service.users().labels().list(userId='me').execute()
+            return self._exec(self.service.users().labels().list(userId='me'))
 
-    def modify_message(self, msg_id, labels_to_add=[], labels_to_remove=[]):
-        self.service.users().messages().modify(
+    def modify_message(self, msg_id, labels_to_add=(), labels_to_remove=()):
+        self._exec(self.service.users().messages().modify(
             userId='me',
             id=msg_id,
-            body={'addLabelIds': labels_to_add, 'removeLabelIds': labels_to_remove}
-        ).execute()
+            body=self._label_changes(labels_to_add, labels_to_remove)
+        ))
+
+    @staticmethod
+    def _label_changes(labels_to_add, labels_to_remove):
+        """Build a modify request body, leaving out empty label lists."""
+        body = {}
+        if labels_to_add:
+            body['addLabelIds'] = list(labels_to_add)
+        if labels_to_remove:
+            body['removeLabelIds'] = list(labels_to_remove)
+        return body
 
     def get_message(self, email_id):
         """Get full message details by email ID."""
-        message = self.service.users().messages().get(
-            userId='me',
-            id=email_id,
-            format='full'
-        ).execute()
+        cache_key = f'{MESSAGE_CACHE_PREFIX}{email_id}'
+        if self.message_cache is not None:
+            cached = self.message_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        message = self._get_msg(email_id, fmt='full', fields='payload')
         
+        result = self._format_message(message)
+        if self.message_cache is not None:
+            self.message_cache.set(cache_key, result)
+        return result
+    
+    def get_message_snippet(self, email_id):
+        """Get an email's headers and snippet without downloading its body.
+        
+        Returns:
+            Text formatted by format_snippet
+        """
+        message = self._get_msg(
+            email_id,
+            fmt='metadata',
+            metadataHeaders=['From', 'To', 'Subject'],
+            fields='snippet,payload/headers'
+        )
+        return self.format_snippet(message)
+    
+    @classmethod
+    def format_snippet(cls, message):
+        """Render a metadata-format message as headers plus Gmail's snippet.
+        
+        Much smaller than the get_message text, yet usually enough to
+        categorize an email.
+        """
+        header_map = cls._header_map(message.get('payload', {}).get('headers', []))
+        lines = [f"{name}: {header_map[name.lower()]}" for name in ('From', 'To', 'Subject')
+                 if name.lower() in header_map]
+        # Snippets come HTML-escaped (e.g. &#39;)
+        lines.extend(('', html.unescape(message.get('snippet', ''))))
+        return '\n'.join(lines)
+    
+    def get_messages(self, email_ids):
+        """Get full message details for many emails with batch requests.
+        
+        Args:
+            email_ids: List of email IDs
+            
+        Returns:
+            Dict of {email_id: message text} formatted like get_message.
+            Emails deleted since they were listed are left out.
+        """
+        results = {}
+        missing = []
+        for email_id in email_ids:
+            cached = self.message_cache.get(f'{MESSAGE_CACHE_PREFIX}{email_id}') if self.message_cache is not None else None
+            if cached is not None:
+                results[email_id] = cached
+            else:
+                missing.append(email_id)
+        
+        for message in self._batch_get_messages(missing, format='full', fields='id,payload'):
+            result = self._format_message(message)
+            results[message['id']] = result
+            if self.message_cache is not None:
+                self.message_cache.set(f"{MESSAGE_CACHE_PREFIX}{message['id']}", result)
+        return results
+    
+    def _format_message(self, message):
+        """Render a full-format message as 'From/Subject' headers plus body text.
+        
+        HTML-only bodies are reduced to text and quoted reply chains are
+        dropped, so the LLM isn't billed for markup or earlier messages.
+        """
         # Extract the body content
         payload = message.get('payload', {})
         headers = payload.get('headers', [])
         
         # Get subject and sender
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '')
-        sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
+        header_map = self._header_map(headers)
+        subject = header_map.get('subject', '')
+        sender = header_map.get('from', '')
         
         # Extract body text
         body = self._get_message_body(payload)
+        if payload.get('mimeType') == 'text/html':
+            body = _html_to_text(body)
+        body = _strip_quoted_replies(body)
         
         return f"From: {sender}\nSubject: {subject}\n\n{body}"
     
+    @staticmethod
+    def get_header(message, name, default=''):
+        """Get a header value (case-insensitive name) from a fetched message dict."""
+        name = name.lower()
+        for header in message.get('payload', {}).get('headers', []):
+            if header['name'].lower() == name:
+                return header['value']
+        return default
+    
     def get_message_subject(self, email_id):
         """Get just the subject line of an email.
         
@@ -234,38 +910,63 @@ class GmailClient:
         Returns:
             Subject line string (empty string if no subject)
         """
-        message = self.service.users().messages().get(
-            userId='me',
-            id=email_id,
-            format='metadata',  # Only get metadata, faster than 'full'
-            metadataHeaders=['Subject']
-        ).execute()
+        cache_key = f'subject:{email_id}'
+        if self.message_cache is not None:
+            cached = self.message_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        message = self._get_msg(
+            email_id,
+            fmt='metadata',  # Only get metadata, faster than 'full'
+            metadataHeaders=['Subject'],
+            fields='payload/headers'
+        )
         
         headers = message.get('payload', {}).get('headers', [])
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '(No Subject)')
+        subject = self._header_map(headers).get('subject', '(No Subject)')
+        if self.message_cache is not None:
+            self.message_cache.set(cache_key, subject)
         return subject
     
-    def _get_message_body(self, payload):
-        """Extract message body from payload."""
-        body = ''
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body'].get('data', '')
-                    if data:
-                        body = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-                        break
-                elif 'parts' in part:
-                    body = self._get_message_body(part)
-                    if body:
-                        break
-        elif 'body' in payload:
-            data = payload['body'].get('data', '')
-            if data:
-                body = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+    @staticmethod
+    def _header_map(headers):
+        """Build a {lowercase name: value} map, keeping the first of repeated headers."""
+        return {h['name'].lower(): h['value'] for h in reversed(headers)}
+    
+    def _get_message_body(self, payload, decode=True):
+        """Extract message body from payload.
         
-        return body
+        Returns the first non-empty text/plain part in depth-first order, or
+        the body of a single-part message.
+        
+        Args:
+            payload: Message payload dictionary
+            decode: If False, return the part's raw base64url data without
+                    decoding it, for callers that only check presence or size
+        """
+        data = self._find_body_data(payload)
+        if not data or not decode:
+            return data
+        return _urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+    
+    @staticmethod
+    def _find_body_data(payload):
+        if 'parts' not in payload:
+            return payload.get('body', {}).get('data', '')
+        
+        # Walk nested multipart sections with an explicit stack, in part order
+        stack = list(reversed(payload['parts']))
+        while stack:
+            part = stack.pop()
+            if part['mimeType'] == 'text/plain':
+                data = part['body'].get('data', '')
+                if data:
+                    return data
+            elif 'parts' in part:
+                stack.extend(reversed(part['parts']))
+        
+        return ''
     
     def create_label_if_not_exists(self, label_name):
         """Create a label if it doesn't exist, return label ID.
@@ -273,60 +974,96 @@ class GmailClient:
         Handles Gmail system labels (SPAM, TRASH, INBOX, etc.) by mapping
         to their proper IDs instead of trying to create them.
         """
-        # Map common category names to Gmail system label IDs
-        SYSTEM_LABEL_MAP = {
-            'spam': 'SPAM',
-            'trash': 'TRASH',
-            'inbox': 'INBOX',
-            'sent': 'SENT',
-            'draft': 'DRAFT',
-            'drafts': 'DRAFT',
-            'important': 'IMPORTANT',
-            'starred': 'STARRED',
-            'unread': 'UNREAD',
-        }
-        
         # Check if this is a system label (case-insensitive)
         label_lower = label_name.lower()
-        if label_lower in SYSTEM_LABEL_MAP:
-            return SYSTEM_LABEL_MAP[label_lower]
-        
-        # Get all existing labels
-        labels = self.manage_labels('get', None)
-        existing_labels = labels.get('labels', [])
-        
-        # Check if label already exists (case-insensitive match)
-        for label in existing_labels:
-            if label['name'].lower() == label_lower:
-                return label['id']
-        
-        # Create new custom label
-        label_object = {
-            'name': label_name,
-            'labelListVisibility': 'labelShow',
-            'messageListVisibility': 'show'
-        }
-        created_label = self.service.users().labels().create(
-            userId='me',
-            body=label_object
-        ).execute()
+        if label_lower in _SYSTEM_LABEL_MAP:
+            return _SYSTEM_LABEL_MAP[label_lower]
         
-        return created_label['id']
+        # Serialized so concurrent callers don't create the same label twice
+        with self._label_lock:
+            # Check if label already exists (case-insensitive match)
+            labels = self._labels_by_name_lower()
+            if label_lower in labels:
+                return labels[label_lower]
+            
+            # Create new custom label
+            label_object = {
+                'name': label_name,
+                'labelListVisibility': 'labelShow',
+                'messageListVisibility': 'show'
+            }
+            created_label = self._exec(self.service.users().labels().create(
+                userId='me',
+                body=label_object
+            ))
+            
+            labels[label_lower] = created_label['id']
+            return created_label['id']
+
+    def _labels_by_name_lower(self):
+        """Return the cached {lowercase name: ID} map of existing labels.
+        
+        Fetched on first use and invalidated by manage_labels changes.
+        """
+        if self._label_cache is None:
+            labels = {}
+            for label in self.get_all_labels().get('labels', []):
+                labels.setdefault(label['name'].lower(), label['id'])
+            self._label_cache = labels
+        return self._label_cache
+    
+    def apply_label_bulk(self, ids, labels_to_add=(), labels_to_remove=()):
+        """Apply the same label change to many emails with messages.batchModify.
+        
+        Args:
+            ids: List of email IDs
+            labels_to_add: Label IDs to add
+            labels_to_remove: Label IDs to remove
+        """
+        for start in range(0, len(ids), BATCH_MODIFY_SIZE):
+            self._exec(self.service.users().messages().batchModify(
+                userId='me',
+                body={
+                    'ids': list(ids[start:start + BATCH_MODIFY_SIZE]),
+                    **self._label_changes(labels_to_add, labels_to_remove)
+                }
+            ))
     
     def apply_label(self, email_id, label_id):
-        """Apply a label to an email."""
-        self.modify_message(email_id, labels_to_add=[label_id])
+        """Apply a label to an email (or a list of emails)."""
+        if isinstance(email_id, (list, tuple)):
+            self.apply_label_bulk(email_id, labels_to_add=(label_id,))
+        else:
+            self.modify_message(email_id, labels_to_add=(label_id,))
     
     def archive_email(self, email_id):
-        """Archive an email by removing INBOX label."""
-        self.modify_message(email_id, labels_to_remove=['INBOX'])
+        """Archive an email (or a list of emails) by removing INBOX label."""
+        if isinstance(email_id, (list, tuple)):
+            self.apply_label_bulk(email_id, labels_to_remove=('INBOX',))
+        else:
+            self.modify_message(email_id, labels_to_remove=('INBOX',))
+    
+    def trash_email_bulk(self, ids):
+        """Move many emails to trash, up to BATCH_SIZE per batch HTTP call.
+        
+        messages.batchDelete is not used: it deletes permanently rather than
+        moving to trash.
+        """
+        messages_api = self.service.users().messages()
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            self._execute_batch(
+                self.service,
+                lambda i: messages_api.trash(userId='me', id=chunk[i]),
+                len(chunk)
+            )
     
     def trash_email(self, email_id):
         """Move an email to trash."""
-        self.service.users().messages().trash(
+        self._exec(self.service.users().messages().trash(
             userId='me',
             id=email_id
-        ).execute()
+        ))
     
     def get_message_labels(self, email_id):
         """Get the label IDs for a specific email.
@@ -337,13 +1074,35 @@ class GmailClient:
         Returns:
             List of label IDs applied to this email
         """
-        message = self.service.users().messages().get(
-            userId='me',
-            id=email_id,
-            format='minimal'  # Only need metadata
-        ).execute()
+        message = self._get_msg(email_id, fmt='minimal', fields='labelIds')  # Only need metadata
         return message.get('labelIds', [])
     
+    def _get_msg(self, message_id, fmt='metadata', **params):
+        """GET one message over the shared keep-alive session.
+        
+        Single-message lookups use this instead of the discovery client, whose
+        httplib2 transport keeps one connection per thread and re-applies
+        credentials on every execute(). Retries 429/5xx responses like _exec
+        does for API client requests.
+        """
+        url = f'{GMAIL_API_BASE}/messages/{message_id}'
+        params = {'format': fmt, **params}
+        for attempt in range(MAX_RETRIES + 1):
+            response = self._authorized_session().get(url, params=params, timeout=FETCH_TIMEOUT)
+            if not _is_retryable_status(response.status_code, response.content) or attempt == MAX_RETRIES:
+                _raise_for_status(response)
+                return _json_loads(response.content)
+            time.sleep(_retry_delay(response.headers, attempt))
+    
+    def _authorized_session(self):
+        """Return the pooled AuthorizedSession, creating it on first use."""
+        if self._session is None:
+            session = AuthorizedSession(self.creds)
+            adapter = HTTPAdapter(pool_connections=SESSION_POOL_CONNECTIONS, pool_maxsize=SESSION_POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
     def get_all_labels(self):
         """Get all labels in the Gmail account."""
         return self.manage_labels('get', None)
@@ -354,13 +1113,6 @@ class GmailClient:
         Returns:
             List of custom label dictionaries with 'id', 'name', and 'type' keys.
         """
-        # Gmail system label IDs that should NOT be deleted
-        SYSTEM_LABEL_IDS = {
-            'INBOX', 'SPAM', 'TRASH', 'UNREAD', 'STARRED', 'IMPORTANT',
-            'SENT', 'DRAFT', 'CHAT', 'CATEGORY_PERSONAL', 'CATEGORY_SOCIAL',
-            'CATEGORY_PROMOTIONS', 'CATEGORY_UPDATES', 'CATEGORY_FORUMS'
-        }
-        
         all_labels = self.get_all_labels()
         labels = all_labels.get('labels', [])
         
@@ -371,7 +1123,7 @@ class GmailClient:
             label_type = label.get('type', '')
             
             # Keep only user-created labels
-            if label_type == 'user' or (label_id not in SYSTEM_LABEL_IDS and not label_id.startswith('CATEGORY_')):
+            if label_type == 'user' or (label_id not in _SYSTEM_LABEL_IDS and not label_id.startswith('CATEGORY_')):
                 custom_labels.append({
                     'id': label_id,
                     'name': label.get('name', ''),
@@ -389,13 +1141,8 @@ class GmailClient:
         Raises:
             Exception: If trying to delete a system label
         """
-        # Safety check - don't delete system labels
-        SYSTEM_LABEL_IDS = {
-            'INBOX', 'SPAM', 'TRASH', 'UNREAD', 'STARRED', 'IMPORTANT',
-            'SENT', 'DRAFT', 'CHAT'
-        }
-        
-        if label_id in SYSTEM_LABEL_IDS or label_id.startswith('CATEGORY_'):
+        # Safety check - don't delete system labels (any CATEGORY_ ID included)
+        if label_id in _SYSTEM_LABEL_IDS or label_id.startswith('CATEGORY_'):
             raise ValueError(f"Cannot delete system label: {label_id}")
         
         self.manage_labels('delete', label_id)
@@ -419,6 +1166,7 @@ class GmailClient:
         deleted_count = 0
         skipped_count = 0
         errors = []
+        to_delete = []
         
         for label in custom_labels:
             label_name = label['name']
@@ -429,11 +1177,34 @@ class GmailClient:
                 skipped_count += 1
                 continue
             
+            # Same safety check as delete_custom_label, applied before batching
+            if label_id in _SYSTEM_LABEL_IDS or label_id.startswith('CATEGORY_'):
+                errors.append((label_name, f"Cannot delete system label: {label_id}"))
+                continue
+            
+            to_delete.append(label)
+        
+        # Delete up to BATCH_SIZE labels per batch HTTP call
+        labels_api = self.service.users().labels()
+        self._label_cache = None
+        for start in range(0, len(to_delete), BATCH_SIZE):
+            chunk = to_delete[start:start + BATCH_SIZE]
             try:
-                self.delete_custom_label(label_id)
-                deleted_count += 1
+                results = self._execute_batch(
+                    self.service,
+                    lambda i: labels_api.delete(userId='me', id=chunk[i]['id']),
+                    len(chunk),
+                    return_exceptions=True
+                )
             except Exception as e:
-                errors.append((label_name, str(e)))
+                errors.extend((label['name'], str(e)) for label in chunk)
+                continue
+            
+            for label, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    errors.append((label['name'], str(result)))
+                else:
+                    deleted_count += 1
         
         return deleted_count, skipped_count, errors
 
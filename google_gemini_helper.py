@@ -1,11 +1,18 @@
 """Google Gemini integration helper for email categorization and analysis."""
 
+import hashlib
+import json
 import os
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 import google.genai as genai
+from llm_parsing import parse_action_items, parse_confidence
+from sqlite_cache import SQLiteCache
+
+TRUNCATION_NOTICE = "\n\n[Email content truncated due to length...]"
 
 class GeminiEmailOrganizer:
     """AI-powered email organizer using Google Gemini."""
+
     def __init__(self, config=None, api_key=None):
         import logging
         # google.genai expects API key via environment variable GOOGLE_API_KEY
@@ -25,39 +32,163 @@ class GeminiEmailOrganizer:
         self.model_name = getattr(config, 'GEMINI_MODEL', 'gemini-2.0-flash') if config else 'gemini-2.0-flash'
         self.categories = getattr(config, 'EMAIL_CATEGORIES', ['Notes', 'Github']) if config else ['Notes', 'Github']
         self.max_email_length = getattr(config, 'MAX_EMAIL_CONTENT_LENGTH', 8000) if config else 8000
+        self.batch_rows = getattr(config, 'BATCH_ROWS', 10) if config else 10
+        
+        # Fixed prompt text around the email content, built once per category list
+        categories_str = ', '.join(self.categories)
+        self._categorize_prefix = f"Categorize this email into one of these categories: {categories_str}\n\nEmail: "
+        self._categorize_suffix = "\n\nRespond with just the category name."
+        self._marshaled_prefix = (
+            f"Categorize each of the following numbered emails into one of these categories: {categories_str}\n\n"
+        )
+        self._marshaled_suffix = "\n\nRespond with one entry per email, using its number as the id."
+        self._confidence_prefix = (
+            f"Rate the confidence (0-100%) that this email belongs to each category: {categories_str}\n\nEmail: "
+        )
+        self._confidence_suffix = "\n\nRespond in format: CategoryName: XX%"
+        self._digest_config = genai.types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema={
+                'type': 'OBJECT',
+                'properties': {
+                    'summary': {'type': 'STRING'},
+                    'action_items': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+                },
+                'required': ['summary', 'action_items'],
+            },
+        )
+        self._analysis_config = genai.types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema={
+                'type': 'OBJECT',
+                'properties': {
+                    'category': {'type': 'STRING', 'enum': list(self.categories)},
+                    'summary': {'type': 'STRING'},
+                    'action_items': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+                    'confidence': {
+                        'type': 'OBJECT',
+                        'properties': {category: {'type': 'NUMBER'} for category in self.categories},
+                    },
+                },
+                'required': ['category', 'summary', 'action_items', 'confidence'],
+            },
+        )
+        self._analysis_prefix = (
+            f"Analyze this email. Return its 'category' (one of: {categories_str}), a 2-3 sentence "
+            f"'summary', its 'action_items' (empty if none) and a 'confidence' between 0 and 1 "
+            f"for each category.\n\nEmail: "
+        )
+        self._last_truncation = (None, None, None)  # (source, max_length, result)
+        
+        # Exact-match response cache shared with the OpenAI provider's file
+        if getattr(config, 'LLM_CACHE_ENABLED', False):
+            self.cache = SQLiteCache(config.LLM_CACHE_PATH)
+        else:
+            self.cache = None
+        
+        # Schema-constrained reply for multi-email categorization
+        self._batch_config = genai.types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema={
+                'type': 'ARRAY',
+                'items': {
+                    'type': 'OBJECT',
+                    'properties': {
+                        'id': {'type': 'INTEGER'},
+                        'category': {'type': 'STRING', 'enum': list(self.categories)},
+                    },
+                    'required': ['id', 'category'],
+                },
+            },
+        )
 
-    def _truncate_email_content(self, email_content: str) -> str:
-        if len(email_content) <= self.max_email_length:
+    def _truncate_email_content(self, email_content: str, max_length: Optional[int] = None) -> str:
+        max_length = max_length or self.max_email_length
+        if len(email_content) <= max_length:
             return email_content
-        truncated = email_content[:self.max_email_length]
-        last_space = truncated.rfind(' ')
-        if last_space > self.max_email_length * 0.9:
-            truncated = truncated[:last_space]
-        return truncated + "\n\n[Email content truncated due to length...]"
+        # The per-operation methods truncate the same email one after another
+        source, length, truncated = self._last_truncation
+        if source is email_content and length == max_length:
+            return truncated
+        cut = email_content.rfind(' ', int(max_length * 0.9) + 1, max_length)
+        if cut < 0:
+            cut = max_length
+        truncated = email_content[:cut] + TRUNCATION_NOTICE
+        self._last_truncation = (email_content, max_length, truncated)
+        return truncated
+
+    def _generate(self, prompt: str, generate_config=None) -> str:
+        """Run one generate_content call and return the stripped reply text.
+        
+        Identical requests are served from the response cache when enabled,
+        so recurring newsletters and notifications skip the API on later runs.
+        """
+        key = None
+        if self.cache is not None:
+            schema = generate_config.response_schema if generate_config is not None else None
+            payload = json.dumps([self.model_name, prompt, schema], sort_keys=True,
+                                 ensure_ascii=False, default=str)
+            key = 'gemini:' + hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        extra = {'config': generate_config} if generate_config is not None else {}
+        response = self.client.models.generate_content(model=self.model_name, contents=prompt, **extra)
+        text = (getattr(response, 'text', None) or '').strip()
+        if key:
+            self.cache.set(key, text)
+        return text
 
     def categorize_email(self, email_content: str) -> Dict[str, str]:
-        email_content = self._truncate_email_content(email_content)
-        categories_str = ', '.join(self.categories)
-        prompt = (
-            f"Categorize this email into one of these categories: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
-            f"Respond with just the category name."
-        )
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        category = response.text.strip() if hasattr(response, 'text') else ''
+        prompt = self._categorize_prefix + self._truncate_email_content(email_content) + self._categorize_suffix
+        category = self._generate(prompt)
         return {'category': category, 'confidence': 'high'}
 
+    def categorize_emails_marshaled(self, emails: List[str],
+                                    batch_rows: Optional[int] = None) -> List[Dict[str, str]]:
+        """Categorize several emails per generate_content call.
+        
+        Emails whose category is missing from the JSON reply fall back to a
+        single categorize_email call.
+        
+        Args:
+            emails: List of email contents
+            batch_rows: Emails per prompt (defaults to BATCH_ROWS)
+            
+        Returns:
+            List of categorization dicts in input order
+        """
+        rows = max(1, batch_rows or self.batch_rows)
+        results = []
+        for start in range(0, len(emails), rows):
+            chunk = emails[start:start + rows]
+            categories = self._categorize_chunk(chunk) if len(chunk) > 1 else [None]
+            for email_content, category in zip(chunk, categories):
+                results.append({'category': category, 'confidence': 'high'} if category
+                               else self.categorize_email(email_content))
+        return results
+
+    def _categorize_chunk(self, chunk: List[str]) -> List[Optional[str]]:
+        """Categorize a chunk of emails in one JSON-mode call; None marks a missing row."""
+        per_email_length = self.max_email_length // len(chunk)
+        body = '\n\n'.join(
+            f"Email {i}:\n{self._truncate_email_content(email_content, per_email_length)}"
+            for i, email_content in enumerate(chunk, 1)
+        )
+        prompt = self._marshaled_prefix + body + self._marshaled_suffix
+        reply = self._generate(prompt, self._batch_config)
+        try:
+            rows = json.loads(reply)
+            by_id = {int(row['id']): str(row['category']).strip() for row in rows}
+        except (ValueError, KeyError, TypeError):
+            return [None] * len(chunk)
+        return [by_id.get(i) for i in range(1, len(chunk) + 1)]
+
     def summarize_email(self, email_content: str) -> str:
         email_content = self._truncate_email_content(email_content)
         prompt = f"Summarize this email in 2-3 sentences:\n\n{email_content}"
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        return response.text.strip() if hasattr(response, 'text') else ''
+        return self._generate(prompt)
 
     def extract_action_items(self, email_content: str) -> List[str]:
         email_content = self._truncate_email_content(email_content)
@@ -66,37 +197,59 @@ class GeminiEmailOrganizer:
             f"List them as bullet points. If there are no action items, respond with 'None'.\n\n"
             f"Email: {email_content}"
         )
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        result = response.text.strip() if hasattr(response, 'text') else ''
-        if result.lower() == 'none' or not result:
-            return []
-        action_items = [item.strip('- •*').strip() for item in result.split('\n') if item.strip()]
-        return action_items
+        return parse_action_items(self._generate(prompt))
 
-    def confidence_scoring(self, email_content: str) -> Dict[str, float]:
-        email_content = self._truncate_email_content(email_content)
-        categories_str = ', '.join(self.categories)
+    def summarize_with_action_items(self, email_content: str) -> Dict[str, Any]:
+        """Summarize an email and extract its action items in one JSON-mode call.
+        
+        Falls back to summarize_email and extract_action_items if the reply
+        can't be parsed.
+        """
+        truncated = self._truncate_email_content(email_content)
         prompt = (
-            f"Rate the confidence (0-100%) that this email belongs to each category: {categories_str}\n\n"
-            f"Email: {email_content}\n\n"
-            f"Respond in format: CategoryName: XX%"
+            f"Return 'summary' (2-3 sentences) and 'action_items' (list of tasks, "
+            f"empty if none) for this email.\n\n"
+            f"Email: {truncated}"
         )
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
-        result = response.text.strip() if hasattr(response, 'text') else ''
-        scores = {}
-        for line in result.split('\n'):
-            if ':' in line:
-                category, score = line.split(':', 1)
-                category = category.strip()
-                score = score.strip().rstrip('%')
-                try:
-                    scores[category] = float(score) / 100.0
-                except ValueError:
-                    pass
-        return scores
+        reply = self._generate(prompt, self._digest_config)
+        try:
+            data = json.loads(reply)
+            return {
+                'summary': str(data['summary']).strip(),
+                'action_items': [str(item).strip() for item in data['action_items'] if str(item).strip()]
+            }
+        except (ValueError, KeyError, TypeError):
+            return {
+                'summary': self.summarize_email(email_content),
+                'action_items': self.extract_action_items(email_content)
+            }
+
+    def analyze_email(self, email_content: str) -> Dict[str, Any]:
+        """Categorize, summarize, extract action items and score an email in one call.
+        
+        Falls back to the individual methods if the reply can't be parsed.
+        
+        Returns:
+            Dict with 'category', 'summary', 'action_items' and 'confidence' keys
+        """
+        prompt = self._analysis_prefix + self._truncate_email_content(email_content)
+        reply = self._generate(prompt, self._analysis_config)
+        try:
+            data = json.loads(reply)
+            return {
+                'category': str(data['category']).strip(),
+                'summary': str(data['summary']).strip(),
+                'action_items': [str(item).strip() for item in data['action_items'] if str(item).strip()],
+                'confidence': {str(k): float(v) for k, v in (data.get('confidence') or {}).items()}
+            }
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {
+                'category': self.categorize_email(email_content)['category'],
+                'summary': self.summarize_email(email_content),
+                'action_items': self.extract_action_items(email_content),
+                'confidence': self.confidence_scoring(email_content)
+            }
+
+    def confidence_scoring(self, email_content: str) -> Dict[str, float]:
+        prompt = self._confidence_prefix + self._truncate_email_content(email_content) + self._confidence_suffix
+        return parse_confidence(self._generate(prompt))
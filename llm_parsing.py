@@ -0,0 +1,31 @@
+"""Parsers for plain-text LLM replies, shared by every provider.
+
+- Action items: one per line, with optional '-', '•' or '*' bullets (or
+  **bold** markers) on either end
+- Confidence scores: 'CategoryName: 85%' lines
+
+Both tolerate CRLF line endings.
+"""
+
+import re
+from typing import Dict, List
+
+# Bullet characters and CR are stripped from both ends; lines made only of
+# bullet characters are skipped
+_BULLET_RE = re.compile(r'^[ \t\r•*-]*([^\s•*-](?:[^\n]*[^\s•*-])?)[ \t\r•*-]*$', re.M)
+_SCORE_RE = re.compile(r'^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(\d+(?:\.\d+)?)[ \t]*%?[ \t\r]*$', re.M)
+
+
+def parse_action_items(reply: str) -> List[str]:
+    """Return the action items listed in reply ([] for an empty or 'None' reply)."""
+    if not reply or reply.lower() == 'none':
+        return []
+    return [m.group(1) for m in _BULLET_RE.finditer(reply)]
+
+
+def parse_confidence(reply: str) -> Dict[str, float]:
+    """Return {category: score between 0 and 1} from 'Category: NN%' lines."""
+    return {
+        m.group(1): float(m.group(2)) / 100.0
+        for m in _SCORE_RE.finditer(reply)
+    }
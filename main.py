@@ -14,279 +14,547 @@ Usage:
     python main.py              # Process last 10 emails (default)
     python main.py -n 50        # Process last 50 emails
     python main.py -n 0         # Process all inbox emails
+    python main.py --watch      # Keep running, organizing new emails as they arrive
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
 import argparse
+import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 from gmail_client import GmailClient
 from ai_organizer import EmailOrganizer
-from config import Config
+from config import get_config
+from rules import RuleEngine
 
-logging.basicConfig(level=logging.INFO)
+
+
+def _configure_logging(level=logging.INFO):
+    """Route log records through a queue drained by one background thread.
+    
+    Worker threads only enqueue records, so they never wait on the stderr
+    handler's lock. A no-op if the root logger is already configured.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    listener.start()
+    # Flush queued records before the interpreter exits
+    atexit.register(listener.stop)
+
+
+_configure_logging()
 logger = logging.getLogger(__name__)
 
-def main(max_emails=None):
-    """Main entry point for the email organizer.
+# Retries per rate-limited email before it is left for the next run
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_MAX_BACKOFF = 60.0
+
+# Longest wait between --watch polls after repeated failures
+WATCH_MAX_BACKOFF = 900.0
+
+
+def _is_rate_limit_error(error):
+    error_msg = str(error)
+    return 'rate_limit_exceeded' in error_msg.lower() or '429' in error_msg
+
+
+class _Pacer:
+    """Spaces out task starts across worker threads by a fixed interval."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        """Block until the caller's start slot (no-op for a zero interval)."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _process_email(gmail_client, organizer, email_id, category, keep_categories, message=None,
+                   analysis=None):
+    """Prepare a categorized email for labeling and archiving, or for trash.
     
-    Args:
-        max_emails (int, optional): Maximum number of emails to organize. 
-                                    If None, organizes all inbox emails.
+    The full message is only needed for emails that are kept; it is
+    downloaded here unless the caller prefetched it, or skipped when a
+    cached analysis already has the summary. Label changes themselves are
+    applied in bulk by the caller.
+    
+    Returns:
+        Dict with 'status' ('kept' or 'trashed'), 'category' and, for kept
+        emails, the 'label_id' to apply plus its 'summary' and 'action_items'
     """
-    try:
-        config = Config()
-        gmail_client = GmailClient(config)
-        organizer = EmailOrganizer(config)
-        
-        logger.info("Starting email organization process...")
+    # Check if this category should be kept
+    if category in keep_categories:
+        # Only process summary and action items for emails we keep
+        if analysis is None or analysis.get('summary') is None:
+            if message is None:
+                message = gmail_client.get_message(email_id)
+            analysis = organizer.summarize_with_action_items(message)
         
-        # Authenticate with Gmail
-        service = gmail_client.authenticate()
-        logger.info("Successfully authenticated with Gmail")
+        # Create or get the label to apply
+        label_id = gmail_client.create_label_if_not_exists(category)
+        return {
+            'status': 'kept',
+            'category': category,
+            'label_id': label_id,
+            'summary': analysis['summary'],
+            'action_items': analysis['action_items']
+        }
+    
+    # Emails that don't match our keep categories go to trash
+    return {'status': 'trashed', 'category': category}
+
+def _organize(config, gmail_client, organizer, emails, max_emails=None, batch_mode=False):
+    """Categorize, label/archive or trash the given inbox emails and print a summary.
+    
+    Args:
+        emails: Iterable of metadata-format messages (labels and headers)
+        max_emails: Listing limit, only used in the log output
+        batch_mode: Categorize through the OpenAI Batch API
+    
+    Returns:
+        IDs of the emails that failed (rate limits or errors) and are still
+        in the inbox untouched
+    """
+    # Track processed count and categorization results
+    fetched_count = 0
+    rule_matched = set()  # Emails categorized by CATEGORY_RULES
+    rule_processed_count = 0
+    cached = {}  # {email ID: analysis} of emails served from the analysis caches
+    cached_processed_count = 0
+    processed_count = 0
+    skipped_already_labeled = 0
+    skipped_rate_limit = 0
+    category_counts = {}  # Track count per category
+    kept_count = 0
+    trashed_count = 0
+    
+    # Hoisted once: membership is checked for every label and email below
+    keep_categories = config.CATEGORIES_TO_KEEP_SET
+    keep_categories_lower = config.CATEGORIES_TO_KEEP_LOWER
+    rule_engine = RuleEngine(config.CATEGORY_RULES)
+    
+    # Get all existing category label IDs for filtering
+    all_labels = gmail_client.get_all_labels().get('labels', [])
+    category_label_ids = {}
+    for label in all_labels:
+        label_name = label.get('name', '')
+        if label_name.lower() in keep_categories_lower:
+            category_label_ids[label.get('id')] = label_name
+    category_label_id_set = frozenset(category_label_ids)
+    
+    logger.info(f"Will skip emails already labeled with: {', '.join(category_label_ids.values()) if category_label_ids else 'none'}")
+    logger.info("")
+    
+    # Work runs on a bounded thread pool. Starts are spaced RATE_LIMIT_DELAY
+    # apart, and rate-limited tasks are retried in their own worker with
+    # exponential backoff (3x the normal delay first)
+    pacer = _Pacer(config.RATE_LIMIT_DELAY)
+    retrying = Retrying(
+        retry=retry_if_exception(_is_rate_limit_error),
+        stop=stop_after_attempt(RATE_LIMIT_RETRIES + 1),
+        wait=wait_random_exponential(multiplier=config.RATE_LIMIT_DELAY * 3, max=RATE_LIMIT_MAX_BACKOFF),
+        before_sleep=lambda state: logger.warning(f"Rate limit hit on email(s) {state.args[0]}. Will retry."),
+        reraise=True
+    )
+    rate_limited_emails = []  # Emails that still hit rate limits after retries
+    failed_emails = []  # Every email left unprocessed, rate-limited or not
+    subjects = {}
+    to_label = {}  # {label ID: [email IDs]}
+    to_trash = []
+    snippets = {}  # Headers + snippet: categorizing needs no message bodies
+    messages = {}  # Prefetched bodies of kept emails
+    futures = {}  # {process future: email ID}
+    futures_lock = threading.Lock()
+    # Listing pauses once this many chunks wait for categorization, so it
+    # stays a bounded prefetch ahead of the workers (2 slots per worker)
+    workers = max(1, config.MAX_CONCURRENCY)
+    chunk_slots = threading.BoundedSemaphore(2 * workers)
+    
+    def lookup_cached(email_ids):
+        # Emails seen before (or, with the semantic cache, near-duplicates)
+        # reuse the stored analysis; returns the IDs that still need the LLM
+        misses = []
+        for email_id in email_ids:
+            analysis = organizer.cached_analysis(snippets[email_id])
+            if analysis is None:
+                misses.append(email_id)
+            else:
+                cached[email_id] = analysis
+        return misses
+    
+    def categorize(email_ids):
+        # One LLM request categorizes BATCH_ROWS emails
+        misses = lookup_cached(email_ids)
+        categorized = {}
+        if misses:
+            pacer.wait()
+            categorized = dict(zip(misses, organizer.categorize_emails_marshaled(
+                [snippets[email_id] for email_id in misses])))
+        return [categorized[email_id] if email_id in categorized else {'category': cached[email_id]['category']}
+                for email_id in email_ids]
+    
+    def categorize_and_prefetch(email_ids):
+        try:
+            categorizations = retrying(categorize, email_ids)
+        finally:
+            chunk_slots.release()
+        prefetch_and_process(email_ids, categorizations)
+    
+    def prefetch_and_process(email_ids, categorizations):
+        # Bodies of the chunk's kept emails come back in one batch request
+        kept = [email_id for email_id, categorization in zip(email_ids, categorizations)
+                if categorization['category'] in keep_categories
+                and cached.get(email_id, {}).get('summary') is None]
+        if kept:
+            try:
+                messages.update(gmail_client.get_messages(kept))
+            except Exception as e:
+                logger.warning(f"Prefetching {len(kept)} messages failed, fetching them one by one: {str(e)}")
+        # Summaries, labels and trashing start as soon as the chunk is categorized
+        for email_id, categorization in zip(email_ids, categorizations):
+            submit_process(email_id, categorization['category'])
+    
+    def submit_process(email_id, category):
+        future = executor.submit(retrying, process, email_id, category)
+        with futures_lock:
+            futures[future] = email_id
+    
+    def process(email_id, category):
+        pacer.wait()
+        result = _process_email(gmail_client, organizer, email_id, category, keep_categories,
+                                messages.get(email_id), cached.get(email_id))
+        if email_id in snippets and email_id not in cached:
+            organizer.remember_analysis(snippets[email_id], {
+                'category': result['category'],
+                'summary': result.get('summary'),
+                'action_items': result.get('action_items', []),
+                'confidence': {}
+            })
+        return result
+    
+    def record_failure(email_id, error):
+        failed_emails.append(email_id)
+        if _is_rate_limit_error(error):
+            rate_limited_emails.append(email_id)
+            logger.warning(f"Rate limit hit again on email {email_id}")
+        else:
+            logger.error(f"Error processing email {email_id}: {str(error)}")
+    
+    def submit_chunk(email_ids):
+        chunk_slots.acquire()
+        categorize_futures[executor.submit(categorize_and_prefetch, email_ids)] = email_ids
+    
+    def categorize_in_batch(email_ids):
+        # One Batch API job for every email not in the analysis caches;
+        # blocks until it finishes
+        misses = lookup_cached(email_ids)
+        hits = [(email_id, {'category': cached[email_id]['category']})
+                for email_id in email_ids if email_id in cached]
+        email_ids = misses
+        if not email_ids:
+            return hits
+        batch_id = organizer.batch_categorize([snippets[email_id] for email_id in email_ids])
+        logger.info(f"Submitted batch {batch_id} categorizing {len(email_ids)} emails, waiting for results...")
+        results = organizer.poll_batch(batch_id)
+        categorized = []
+        for index, email_id in enumerate(email_ids):
+            categorization = results.get(f'email-{index}')
+            if categorization is None:
+                failed_emails.append(email_id)
+                logger.error(f"Error processing email {email_id}: batch request failed")
+            else:
+                categorized.append((email_id, categorization))
+        return hits + categorized
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batch_rows = max(1, config.BATCH_ROWS)
+        categorize_futures = {}
+        pending = []
         
-        # Fetch inbox emails (both read and unread)
-        # Pass max_emails to avoid fetching more than needed
-        emails = gmail_client.fetch_emails(query='in:inbox', max_results=max_emails)
+        # Inbox emails (read and unread) stream in page by page with label
+        # IDs and headers, so each BATCH_ROWS chunk of unlabeled emails is
+        # categorized while the next listing page is still being fetched
+        for email in emails:
+            fetched_count += 1
+            if not category_label_id_set.isdisjoint(email.get('labelIds', ())):
+                # Skip this email - already processed
+                skipped_already_labeled += 1
+                continue
+            subjects[email['id']] = gmail_client.get_header(email, 'Subject', '(No Subject)')
+            # Rule-matched senders and subjects need no LLM call
+            category = rule_engine.match(gmail_client.get_header(email, 'From'), subjects[email['id']])
+            if category:
+                rule_matched.add(email['id'])
+                submit_process(email['id'], category)
+                continue
+            snippets[email['id']] = gmail_client.format_snippet(email)
+            pending.append(email['id'])
+            if len(pending) == batch_rows and not batch_mode:
+                submit_chunk(pending)
+                pending = []
+        if pending and batch_mode:
+            categorized = categorize_in_batch(pending)
+            for start in range(0, len(categorized), batch_rows):
+                email_ids, categorizations = zip(*categorized[start:start + batch_rows])
+                categorize_futures[executor.submit(prefetch_and_process, email_ids, categorizations)] = email_ids
+        elif pending:
+            submit_chunk(pending)
         
         if max_emails is not None and max_emails > 0:
-            logger.info(f"Fetched {len(emails)} inbox emails (limited to {max_emails})")
+            logger.info(f"Fetched {fetched_count} inbox emails (limited to {max_emails})")
         else:
-            logger.info(f"Fetched {len(emails)} inbox emails (all)")
+            logger.info(f"Fetched {fetched_count} inbox emails (all)")
         
-        # Track processed count and categorization results
-        processed_count = 0
-        skipped_already_labeled = 0
-        skipped_rate_limit = 0
-        category_counts = {}  # Track count per category
-        kept_count = 0
-        trashed_count = 0
-        rate_limited_emails = []  # Track emails that hit rate limits for retry
+        # Every process task is submitted by the time its chunk finishes
+        for future in as_completed(categorize_futures):
+            error = future.exception()
+            if error is not None:
+                for email_id in categorize_futures[future]:
+                    record_failure(email_id, error)
         
-        # Get all existing category label IDs for filtering
-        all_labels = gmail_client.get_all_labels().get('labels', [])
-        category_label_ids = {}
-        for label in all_labels:
-            label_name = label.get('name', '')
-            if label_name in config.CATEGORIES_TO_KEEP or label_name.lower() in [cat.lower() for cat in config.CATEGORIES_TO_KEEP]:
-                category_label_ids[label.get('id')] = label_name
-        
-        logger.info(f"Will skip emails already labeled with: {', '.join(category_label_ids.values()) if category_label_ids else 'none'}")
-        logger.info("")
-        
-        # Process each email
-        for idx, email in enumerate(emails):
+        # Counters and logging stay on this thread as results arrive
+        with futures_lock:
+            process_futures = dict(futures)
+        for future in as_completed(process_futures):
+            email_id = process_futures[future]
             try:
-                # Extract email content
-                email_id = email['id']
-                
-                # Check if email already has a category label
-                existing_labels = gmail_client.get_message_labels(email_id)
-                already_labeled = any(label_id in category_label_ids for label_id in existing_labels)
-                
-                if already_labeled:
-                    # Skip this email - already processed
-                    skipped_already_labeled += 1
-                    continue
-                
-                # Get subject for logging (faster metadata-only call)
-                subject = gmail_client.get_message_subject(email_id)
-                # Truncate long subjects for logging
-                subject_display = subject[:60] + '...' if len(subject) > 60 else subject
-                
-                # Get full message for AI processing
-                message = gmail_client.get_message(email_id)
-                
-                # Organize with AI
-                categorization = organizer.categorize_email(message)
-                category = categorization['category']
-                
-                # Track category counts
-                category_counts[category] = category_counts.get(category, 0) + 1
-                
-                # Log categorization with subject
-                logger.info(f"📧 Subject: \"{subject_display}\"")
-                logger.info(f"   Category: [{category}]")
-                
-                # Check if this category should be kept
-                if category in config.CATEGORIES_TO_KEEP:
-                    # Only process summary and action items for emails we keep
-                    summary = organizer.summarize_email(message)
-                    action_items = organizer.extract_action_items(message)
-                    
-                    # Create or get label
-                    label_id = gmail_client.create_label_if_not_exists(category)
-                    
-                    # Apply label and archive
-                    gmail_client.apply_label(email_id, label_id)
-                    gmail_client.archive_email(email_id)
-                    kept_count += 1
-                    
-                    logger.info(f"   ✓ Action: Labeled as '{category}' and archived ({processed_count + 1}/{len(emails)})")
-                else:
-                    # Delete emails that don't match our keep categories
-                    gmail_client.trash_email(email_id)
-                    trashed_count += 1
-                    logger.info(f"   ✗ Action: Moved to trash (unwanted category)")
-                
-                logger.info("")  # Blank line for readability
-                
-                processed_count += 1
-                
+                result = future.result()
             except Exception as e:
-                error_msg = str(e)
-                # Check if it's a rate limit error
-                if 'rate_limit_exceeded' in error_msg.lower() or '429' in error_msg:
-                    logger.warning(f"Rate limit hit on email {email_id}. Will retry later.")
-                    rate_limited_emails.append((email_id, email))
-                else:
-                    logger.error(f"Error processing email {email_id}: {error_msg}")
+                record_failure(email_id, e)
                 continue
             
-            # Add delay between emails to avoid rate limits (except after last email)
-            if idx < len(emails) - 1 and config.RATE_LIMIT_DELAY > 0:
-                logger.debug(f"Waiting {config.RATE_LIMIT_DELAY}s before next email...")
-                time.sleep(config.RATE_LIMIT_DELAY)
-        
-        # Retry rate-limited emails with exponential backoff
-        if rate_limited_emails:
-            logger.info(f"\n{'='*70}")
-            logger.info(f"RETRYING {len(rate_limited_emails)} RATE-LIMITED EMAILS")
-            logger.info(f"{'='*70}\n")
+            category = result['category']
+            subject = subjects[email_id]
+            # Truncate long subjects for logging
+            subject_display = subject[:60] + '...' if len(subject) > 60 else subject
             
-            retry_delay = config.RATE_LIMIT_DELAY * 3  # Start with 3x normal delay
-            max_retries = 3
+            # Track category counts
+            category_counts[category] = category_counts.get(category, 0) + 1
             
-            for retry_attempt in range(max_retries):
-                if not rate_limited_emails:
-                    break
-                
-                logger.info(f"Retry attempt {retry_attempt + 1}/{max_retries}...")
-                logger.info(f"Waiting {retry_delay}s before retrying {len(rate_limited_emails)} emails...")
-                time.sleep(retry_delay)
-                logger.info("")
-                
-                remaining_emails = []
-                
-                for email_idx, (email_id, email) in enumerate(rate_limited_emails):
-                    try:
-                        # Check if already labeled (might have been processed in another run)
-                        existing_labels = gmail_client.get_message_labels(email_id)
-                        already_labeled = any(label_id in category_label_ids for label_id in existing_labels)
-                        
-                        if already_labeled:
-                            skipped_already_labeled += 1
-                            continue
-                        
-                        # Get subject for logging
-                        subject = gmail_client.get_message_subject(email_id)
-                        subject_display = subject[:60] + '...' if len(subject) > 60 else subject
-                        
-                        # Get full message for AI processing
-                        message = gmail_client.get_message(email_id)
-                        
-                        # Organize with AI
-                        categorization = organizer.categorize_email(message)
-                        category = categorization['category']
-                        
-                        # Track category counts
-                        category_counts[category] = category_counts.get(category, 0) + 1
-                        
-                        # Log categorization with subject
-                        logger.info(f"📧 Subject: \"{subject_display}\"")
-                        logger.info(f"   Category: [{category}]")
-                        
-                        # Check if this category should be kept
-                        if category in config.CATEGORIES_TO_KEEP:
-                            # Only process summary and action items for emails we keep
-                            summary = organizer.summarize_email(message)
-                            action_items = organizer.extract_action_items(message)
-                            
-                            # Create or get label
-                            label_id = gmail_client.create_label_if_not_exists(category)
-                            
-                            # Apply label and archive
-                            gmail_client.apply_label(email_id, label_id)
-                            gmail_client.archive_email(email_id)
-                            kept_count += 1
-                            
-                            logger.info(f"   ✓ Action: Labeled as '{category}' and archived (retry success)")
-                        else:
-                            # Delete emails that don't match our keep categories
-                            gmail_client.trash_email(email_id)
-                            trashed_count += 1
-                            logger.info(f"   ✗ Action: Moved to trash (unwanted category)")
-                        
-                        logger.info("")  # Blank line for readability
-                        processed_count += 1
-                        
-                        # Add delay between retries (but not after the last email)
-                        if email_idx < len(rate_limited_emails) - 1:
-                            time.sleep(retry_delay)
-                        
-                    except Exception as e:
-                        error_msg = str(e)
-                        if 'rate_limit_exceeded' in error_msg.lower() or '429' in error_msg:
-                            logger.warning(f"Rate limit hit again on email {email_id}")
-                            remaining_emails.append((email_id, email))
-                        else:
-                            logger.error(f"Error processing email {email_id}: {error_msg}")
-                
-                # Update the list for next retry attempt
-                rate_limited_emails = remaining_emails
-                
-                if rate_limited_emails:
-                    # Exponential backoff - double the delay for next attempt
-                    retry_delay *= 2
-                    logger.info(f"{len(rate_limited_emails)} emails still rate-limited, will retry with {retry_delay}s delay...\n")
+            if result['status'] == 'kept':
+                to_label.setdefault(result['label_id'], []).append(email_id)
+                action = f"✓ Action: Label as '{category}' and archive ({processed_count + 1}/{fetched_count})"
+                action += f"\n   Summary: {result['summary']}"
+                for item in result['action_items']:
+                    action += f"\n   • {item}"
+            else:
+                to_trash.append(email_id)
+                action = "✗ Action: Move to trash (unwanted category)"
             
-            # After all retries, count remaining as skipped
-            skipped_rate_limit = len(rate_limited_emails)
-            if skipped_rate_limit > 0:
-                logger.warning(f"\n⚠ {skipped_rate_limit} emails could not be processed after {max_retries} retry attempts")
-                logger.warning(f"   These will be processed on the next run\n")
-        
-        # Print categorization results
-        print("\n" + "=" * 70)
-        print("CATEGORIZATION RESULTS")
-        print("=" * 70)
-        
-        if category_counts:
-            print("\nEmails by Category:")
-            print("-" * 70)
-            for category in sorted(category_counts.keys()):
-                count = category_counts[category]
-                action = "✓ KEPT" if category in config.CATEGORIES_TO_KEEP else "✗ TRASHED"
-                print(f"  {category:15} {count:3} emails  →  {action}")
+            # One record per email; the trailing newline leaves a blank line for readability
+            logger.info(f"📧 Subject: \"{subject_display}\"\n   Category: [{category}]\n   {action}\n")
             
-            print("-" * 70)
-            print(f"\nTotal Fetched:    {len(emails)} emails")
-            if skipped_already_labeled > 0:
-                print(f"  ⊜ Skipped:      {skipped_already_labeled} emails (already labeled)")
-            if skipped_rate_limit > 0:
-                print(f"  ⚠ Skipped:      {skipped_rate_limit} emails (rate limits - failed after retries)")
-            print(f"  ✓ Kept:         {kept_count} emails (labeled & archived)")
-            print(f"  ✗ Trashed:      {trashed_count} emails (moved to trash)")
-            print(f"Total Processed:  {processed_count} emails")
-        else:
-            print("\nNo emails were processed.")
-            if skipped_already_labeled > 0:
-                print(f"{skipped_already_labeled} emails skipped (already labeled)")
-            if skipped_rate_limit > 0:
-                print(f"{skipped_rate_limit} emails skipped (rate limits - failed after retries)")
-        
-        print("=" * 70 + "\n")
+            processed_count += 1
+            if email_id in rule_matched:
+                rule_processed_count += 1
+            elif email_id in cached:
+                cached_processed_count += 1
+    
+    # Emails sharing a label get one batchModify call (up to 1000 IDs) that
+    # also archives them; trashing is sent as batch requests
+    for label_id, ids in to_label.items():
+        try:
+            gmail_client.apply_label_bulk(ids, labels_to_add=[label_id], labels_to_remove=['INBOX'])
+            kept_count += len(ids)
+        except Exception as e:
+            failed_emails.extend(ids)
+            logger.error(f"Error labeling {len(ids)} emails: {str(e)}")
+    if to_trash:
+        try:
+            gmail_client.trash_email_bulk(to_trash)
+            trashed_count += len(to_trash)
+        except Exception as e:
+            failed_emails.extend(to_trash)
+            logger.error(f"Error trashing {len(to_trash)} emails: {str(e)}")
+    
+    skipped_rate_limit = len(rate_limited_emails)
+    if skipped_rate_limit > 0:
+        logger.warning(f"\n⚠ {skipped_rate_limit} emails could not be processed after {RATE_LIMIT_RETRIES} retry attempts")
+        logger.warning(f"   These will be processed on the next run\n")
+    
+    # Print categorization results
+    print("\n" + "=" * 70)
+    print("CATEGORIZATION RESULTS")
+    print("=" * 70)
+    
+    if category_counts:
+        print("\nEmails by Category:")
+        print("-" * 70)
+        for category in sorted(category_counts.keys()):
+            count = category_counts[category]
+            action = "✓ KEPT" if category in keep_categories else "✗ TRASHED"
+            print(f"  {category:15} {count:3} emails  →  {action}")
         
-        # Summary log message
-        summary_parts = []
+        print("-" * 70)
+        print(f"\nTotal Fetched:    {fetched_count} emails")
+        if skipped_already_labeled > 0:
+            print(f"  ⊜ Skipped:      {skipped_already_labeled} emails (already labeled)")
+        if skipped_rate_limit > 0:
+            print(f"  ⚠ Skipped:      {skipped_rate_limit} emails (rate limits - failed after retries)")
+        print(f"  ✓ Kept:         {kept_count} emails (labeled & archived)")
+        print(f"  ✗ Trashed:      {trashed_count} emails (moved to trash)")
+        print(f"Total Processed:  {processed_count} emails")
+        if rule_processed_count > 0:
+            print(f"  ⚡ By rule:      {rule_processed_count} emails (no LLM call)")
+        if cached_processed_count > 0:
+            print(f"  ♻ From cache:   {cached_processed_count} emails (no LLM call)")
+        if rule_processed_count > 0 or cached_processed_count > 0:
+            print(f"  🤖 By LLM:       {processed_count - rule_processed_count - cached_processed_count} emails")
+    else:
+        print("\nNo emails were processed.")
         if skipped_already_labeled > 0:
-            summary_parts.append(f"{skipped_already_labeled} already labeled")
+            print(f"{skipped_already_labeled} emails skipped (already labeled)")
         if skipped_rate_limit > 0:
-            summary_parts.append(f"{skipped_rate_limit} failed after retries")
+            print(f"{skipped_rate_limit} emails skipped (rate limits - failed after retries)")
+    
+    print("=" * 70 + "\n")
+    
+    # Summary log message
+    summary_parts = []
+    if skipped_already_labeled > 0:
+        summary_parts.append(f"{skipped_already_labeled} already labeled")
+    if skipped_rate_limit > 0:
+        summary_parts.append(f"{skipped_rate_limit} failed after retries")
+    
+    summary_msg = f"Email organization complete! Processed {processed_count} out of {fetched_count} emails."
+    if summary_parts:
+        summary_msg += f" (Skipped: {', '.join(summary_parts)})"
+    logger.info(summary_msg)
+    return failed_emails
+
+
+def _load_watch_state(path):
+    """Return (history ID, email IDs to retry) saved by a previous watch run."""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        return state['historyId'], list(state.get('retryIds', ()))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, []
+
+
+def _save_watch_state(path, history_id, retry_ids=()):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'historyId': history_id, 'retryIds': list(retry_ids)}, f)
+    os.replace(tmp_path, path)
+
+
+def _watch(config, gmail_client, organizer, batch_mode=False):
+    """Organize new inbox emails as they arrive, reusing the warm clients.
+    
+    Every WATCH_INTERVAL seconds, Gmail's history feed is asked which
+    messages reached the inbox since the last check, so nothing is re-listed.
+    The history ID is kept in HISTORY_STATE_PATH and a restart resumes from
+    it; without one (or once Gmail has expired it) the inbox is scanned once.
+    Emails that failed or hit rate limits are saved alongside it and tried
+    again on the next poll. A failed poll is logged and retried with
+    exponential backoff (up to WATCH_MAX_BACKOFF seconds) from the same
+    history ID. Runs until interrupted.
+    """
+    state_path = os.path.expanduser(config.HISTORY_STATE_PATH)
+    history_id, retry_ids = _load_watch_state(state_path)
+    failures = 0
+    while True:
+        try:
+            history_id, retry_ids = _poll_once(config, gmail_client, organizer, history_id,
+                                               retry_ids, batch_mode)
+            _save_watch_state(state_path, history_id, retry_ids)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            logger.error(f"Watch poll failed ({failures} in a row): {str(e)}")
+        delay = config.WATCH_INTERVAL * 2 ** min(failures, 10)
+        time.sleep(min(delay, max(WATCH_MAX_BACKOFF, config.WATCH_INTERVAL)))
+
+
+def _poll_once(config, gmail_client, organizer, history_id, retry_ids=(), batch_mode=False):
+    """Organize the emails added since history_id plus retry_ids.
+    
+    Returns:
+        (history ID to resume from, IDs of the emails that failed this time)
+    """
+    changes = gmail_client.list_history(history_id) if history_id else None
+    if changes is None:
+        # Taken before the scan, so emails arriving during it are seen next
+        # time; the scan itself covers any emails waiting for a retry
+        next_history_id = gmail_client.get_history_id()
+        failed = _organize(config, gmail_client, organizer,
+                           gmail_client.iter_emails(query='in:inbox'), batch_mode=batch_mode)
+        return next_history_id, failed
+    
+    message_ids, next_history_id = changes
+    # Earlier failures first; an ID listed twice is only fetched once
+    message_ids = list(dict.fromkeys([*retry_ids, *message_ids]))
+    if not message_ids:
+        return next_history_id, []
+    # Skip emails that already left the inbox again
+    emails = (email for email in gmail_client.iter_messages(message_ids)
+              if 'INBOX' in email.get('labelIds', ()))
+    return next_history_id, _organize(config, gmail_client, organizer, emails, batch_mode=batch_mode)
+
+
+def main(max_emails=None, batch_mode=False, watch=False):
+    """Main entry point for the email organizer.
+    
+    Args:
+        max_emails (int, optional): Maximum number of emails to organize. 
+                                    If None, organizes all inbox emails.
+        batch_mode (bool): Categorize through the OpenAI Batch API (half the
+                           cost, results within 24h) instead of live requests.
+        watch (bool): Keep running and organize new inbox emails as they
+                      arrive instead of exiting after one pass. Can't be
+                      combined with max_emails.
+    
+    Raises:
+        ValueError: If watch is combined with max_emails, or batch_mode is
+                    used with a provider other than OpenAI
+    """
+    if watch and max_emails:
+        raise ValueError("max_emails can't be combined with watch mode")
+    try:
+        config = get_config()
+        organizer = EmailOrganizer(config)
+        # Checked before Gmail auth so a bad flag fails before any work is done
+        if batch_mode and not organizer.supports_batch:
+            raise ValueError(f"--batch-mode needs LLM_PROVIDER=openai (got '{organizer.provider}')")
+        gmail_client = GmailClient(config)
         
-        summary_msg = f"Email organization complete! Processed {processed_count} out of {len(emails)} emails."
-        if summary_parts:
-            summary_msg += f" (Skipped: {', '.join(summary_parts)})"
-        logger.info(summary_msg)
+        logger.info("Starting email organization process...")
+        
+        # GmailClient authenticates on construction
+        logger.info("Successfully authenticated with Gmail")
+        
+        if watch:
+            _watch(config, gmail_client, organizer, batch_mode)
+        else:
+            emails = gmail_client.iter_emails(query='in:inbox', max_results=max_emails)
+            _organize(config, gmail_client, organizer, emails, max_emails, batch_mode)
         
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
@@ -306,6 +574,18 @@ if __name__ == "__main__":
         dest='max_emails',
         help='Shorthand for --max-emails'
     )
+    parser.add_argument(
+        '--batch-mode',
+        action='store_true',
+        help='Categorize with the OpenAI Batch API: 50%% cheaper, but results can take up to 24h'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and organize new inbox emails as they arrive (polls every WATCH_INTERVAL seconds)'
+    )
     
     args = parser.parse_args()
-    main(max_emails=args.max_emails)
\ No newline at end of file
+    if args.watch and args.max_emails:
+        parser.error('-n/--max-emails cannot be combined with --watch')
+    main(max_emails=args.max_emails, batch_mode=args.batch_mode, watch=args.watch)
\ No newline at end of file
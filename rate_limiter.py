@@ -0,0 +1,86 @@
+"""Sliding-window rate limiter for concurrent async API calls.
+
+Keeps fanned-out requests under a provider's quota rather than tripping
+429 responses and losing throughput to backoff:
+- Requests-per-minute limit
+- Tokens-per-minute limit (callers pass an estimate per request)
+
+A limit of 0 disables that dimension.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+class AsyncRateLimiter:
+    """Requests/tokens per minute limiter over a sliding time window."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window: float = 60.0):
+        """Create a limiter.
+
+        Args:
+            rpm: Maximum requests per window (0 for unlimited)
+            tpm: Maximum tokens per window (0 for unlimited)
+            window: Window length in seconds
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._events = deque()  # (monotonic timestamp, requests, tokens)
+        self._requests = 0
+        self._tokens = 0
+        self._lock = None
+        self._loop = None
+
+    async def acquire(self, tokens: int = 0, requests: int = 1) -> None:
+        """Wait until the request fits in the window, then record it.
+
+        Waiters are served in arrival order. A single request larger than
+        the token limit is clamped to it so it can't block forever.
+        """
+        if not self.rpm and not self.tpm:
+            return
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                wait = self._wait_time(tokens, requests, now)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._events.append((now, requests, tokens))
+            self._requests += requests
+            self._tokens += tokens
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio primitives are tied to a loop on Python < 3.10, so rebuild per loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._events and self._events[0][0] <= cutoff:
+            _, requests, tokens = self._events.popleft()
+            self._requests -= requests
+            self._tokens -= tokens
+
+    def _wait_time(self, tokens: int, requests: int, now: float) -> float:
+        """Seconds until enough old events expire for this request to fit (0 if it fits)."""
+        requests_over = self._requests + requests - self.rpm if self.rpm else 0
+        tokens_over = self._tokens + tokens - self.tpm if self.tpm else 0
+        if requests_over <= 0 and tokens_over <= 0:
+            return 0.0
+
+        for timestamp, old_requests, old_tokens in self._events:
+            requests_over -= old_requests
+            tokens_over -= old_tokens
+            if requests_over <= 0 and tokens_over <= 0:
+                return max(timestamp + self.window - now, 0.0)
+        return self.window
@@ -0,0 +1,84 @@
+"""Rule-based pre-classifier for well-known senders and subjects.
+
+Decides an email's category without an LLM call when a rule matches:
+- from rules: shell-style globs on the sender address ('*@github.com')
+- subject rules: regular expressions searched in the subject line
+
+Rules are tried in order and the first match wins.
+"""
+
+import fnmatch
+import re
+from email.utils import parseaddr
+from typing import Iterable, Optional, Tuple
+
+# (field, pattern, category)
+Rule = Tuple[str, str, str]
+
+_FIELDS = ('from', 'subject')
+
+
+def parse_rules(spec: str) -> Tuple[Rule, ...]:
+    """Parse 'field:pattern=Category' entries separated by semicolons.
+
+    The field prefix is optional and defaults to 'from', e.g.
+    '*@github.com=Github;subject:^\\[JIRA\\]=Work'.
+
+    Raises:
+        ValueError: If an entry has no '=Category' part
+    """
+    rules = []
+    for entry in spec.split(';'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        pattern, sep, category = entry.rpartition('=')
+        if not sep or not pattern.strip() or not category.strip():
+            raise ValueError(f"Invalid rule {entry!r}: expected 'pattern=Category'")
+        field, sep, rest = pattern.partition(':')
+        if sep and field.strip().lower() in _FIELDS:
+            field, pattern = field.strip().lower(), rest
+        else:
+            field = 'from'
+        rules.append((field, pattern.strip(), category.strip()))
+    return tuple(rules)
+
+
+class RuleEngine:
+    """Ordered sender/subject rules compiled to regular expressions once."""
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        """Compile the rules.
+
+        Args:
+            rules: (field, pattern, category) tuples; field is 'from' or 'subject'
+
+        Raises:
+            ValueError: For an unknown field or an invalid subject regex
+        """
+        self._rules = []
+        for field, pattern, category in rules:
+            if field == 'from':
+                regex = re.compile(fnmatch.translate(pattern.lower()))
+            elif field == 'subject':
+                try:
+                    regex = re.compile(pattern)
+                except re.error as e:
+                    raise ValueError(f"Invalid subject rule {pattern!r}: {e}") from e
+            else:
+                raise ValueError(f"Unknown rule field {field!r}: expected 'from' or 'subject'")
+            self._rules.append((field == 'from', regex, category))
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def match(self, from_header: str, subject: str) -> Optional[str]:
+        """Return the category of the first matching rule, or None."""
+        address = parseaddr(from_header)[1].lower()
+        for is_from, regex, category in self._rules:
+            if is_from:
+                if regex.match(address):
+                    return category
+            elif regex.search(subject):
+                return category
+        return None
@@ -0,0 +1,137 @@
+"""Similarity cache for LLM results on near-duplicate emails.
+
+Newsletters, receipts and CI notifications from one sender barely change
+between runs, so a result computed for one can be reused for the next:
+- Each email is embedded once (a single cheap embeddings request)
+- Lookups only compare against cached emails from the same sender domain
+- A hit needs a cosine similarity of at least the threshold
+
+Vectors are stored normalized as float32 blobs in SQLite; the candidates for
+a domain are loaded once and scanned in memory.
+"""
+
+import json
+import math
+import operator
+import re
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence
+from sqlite_cache import prepare_db_path
+
+# Domain of the first 'From:' header line in formatted email content
+_SENDER_DOMAIN_RE = re.compile(r'^From:[^\n@]*@([\w.-]+)', re.M | re.I)
+
+# Recently embedded emails kept so a get() followed by put() embeds once
+VECTOR_MEMO_SIZE = 256
+
+
+def sender_domain(email_content: str) -> str:
+    """Return the lowercased sender domain of formatted email content, or ''."""
+    match = _SENDER_DOMAIN_RE.search(email_content)
+    return match.group(1).lower() if match else ''
+
+
+class SemanticCache:
+    """Nearest-neighbor cache keyed by email embeddings, partitioned by sender domain."""
+
+    def __init__(self, path: str, embed: Callable[[str], Sequence[float]], threshold: float = 0.93):
+        """Open (or create) the cache database at path.
+
+        Args:
+            path: SQLite database file path (':memory:' for a throwaway cache);
+                  '~' is expanded and missing parent directories are created
+            embed: Function returning the embedding vector of an email
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.path = path = prepare_db_path(path)
+        self.embed = embed
+        self.threshold = threshold
+        self._domains = {}  # {domain: [(vector, value)]}, loaded lazily
+        self._vectors = OrderedDict()  # {email content: normalized vector}, LRU
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries (domain TEXT NOT NULL, vector BLOB NOT NULL, value TEXT NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_domain ON entries (domain)')
+        self._conn.commit()
+
+    def get_or_compute(self, email_content: str, compute: Callable[[], Any]) -> Any:
+        """Return the value cached for a similar email, or compute and store it.
+
+        Args:
+            email_content: Formatted email content (with a 'From:' line)
+            compute: Called on a miss; its result must be json-serializable
+        """
+        cached = self.get(email_content)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(email_content, value)
+        return value
+
+    def get(self, email_content: str) -> Optional[Any]:
+        """Return the value cached for an email similar to email_content, or None."""
+        return self._nearest(sender_domain(email_content), self._vector(email_content))
+
+    def put(self, email_content: str, value: Any) -> None:
+        """Store a json-serializable value for email_content."""
+        domain = sender_domain(email_content)
+        vector = self._vector(email_content)
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO entries (domain, vector, value) VALUES (?, ?, ?)',
+                (domain, vector.tobytes(), json.dumps(value))
+            )
+            self._conn.commit()
+            self._candidates(domain).append((vector, value))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _nearest(self, domain: str, vector: array) -> Optional[Any]:
+        """Value of the most similar cached email at or above the threshold."""
+        best_value, best_score = None, self.threshold
+        with self._lock:
+            candidates = list(self._candidates(domain))
+        for other, value in candidates:
+            score = sum(map(operator.mul, vector, other))
+            if score >= best_score:
+                best_value, best_score = value, score
+        return best_value
+
+    def _vector(self, email_content: str) -> array:
+        with self._lock:
+            vector = self._vectors.get(email_content)
+            if vector is not None:
+                self._vectors.move_to_end(email_content)
+                return vector
+        vector = self._normalize(self.embed(email_content))
+        with self._lock:
+            self._vectors[email_content] = vector
+            if len(self._vectors) > VECTOR_MEMO_SIZE:
+                self._vectors.popitem(last=False)
+        return vector
+
+    def _candidates(self, domain: str) -> list:
+        # Caller holds self._lock
+        if domain not in self._domains:
+            rows = self._conn.execute('SELECT vector, value FROM entries WHERE domain = ?', (domain,))
+            self._domains[domain] = [(self._from_bytes(blob), json.loads(value)) for blob, value in rows]
+        return self._domains[domain]
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> array:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return array('f', (x / norm for x in vector))
+
+    @staticmethod
+    def _from_bytes(blob: bytes) -> array:
+        vector = array('f')
+        vector.frombytes(blob)
+        return vector
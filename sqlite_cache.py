@@ -0,0 +1,82 @@
+"""Persistent key/value cache backed by SQLite.
+
+Used to memoize expensive network results (LLM completions) across runs:
+- In-process LRU layer for hot keys
+- SQLite table on disk for persistence between processes
+
+Values are stored as JSON text, so anything json-serializable can be cached.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def prepare_db_path(path: str) -> str:
+    """Expand '~' in a database path and create its missing parent directories.
+
+    ':memory:' is returned unchanged.
+    """
+    if path != ':memory:':
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+
+class SQLiteCache:
+    """Two-tier (memory LRU + SQLite) key/value cache."""
+
+    def __init__(self, path: str, memory_size: int = 1024):
+        """Open (or create) the cache database at path.
+
+        Args:
+            path: SQLite database file path (':memory:' for a throwaway cache);
+                  '~' is expanded and missing parent directories are created
+            memory_size: Number of entries kept in the in-process LRU
+        """
+        self.path = path = prepare_db_path(path)
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            row = self._conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key (overwrites any existing entry)."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)',
+                (key, json.dumps(value))
+            )
+            self._conn.commit()
+            self._remember(key, value)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
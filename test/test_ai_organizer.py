@@ -1,6 +1,35 @@
+import ast
+import os
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from ai_organizer import EmailOrganizer
+from rate_limiter import AsyncRateLimiter
+
+
+def make_stream_chunks(*deltas):
+    chunks = []
+    for delta in deltas:
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = delta
+        chunks.append(chunk)
+    return chunks
+
+
+def make_stream(*deltas):
+    """Mock a streamed chat completion yielding the given content deltas."""
+    stream = MagicMock()
+    stream.__iter__.return_value = iter(make_stream_chunks(*deltas))
+    return stream
+
+
+def make_async_stream(*deltas):
+    """Mock an async streamed chat completion yielding the given content deltas."""
+    stream = MagicMock()
+    stream.__aiter__.return_value = make_stream_chunks(*deltas)
+    stream.close = AsyncMock()
+    return stream
 
 
 class TestEmailOrganizerInitialization(unittest.TestCase):
@@ -24,6 +53,38 @@ class TestEmailOrganizerInitialization(unittest.TestCase):
         self.assertIsNotNone(email_organizer)
         self.assertEqual(email_organizer.llm.model, 'gpt-3.5-turbo')
 
+    @patch('ai_organizer.OpenAI')
+    def test_sync_client_uses_pooled_transport(self, mock_openai_class):
+        """Test the sync OpenAI client is built on the shared keep-alive httpx client."""
+        email_organizer = EmailOrganizer(config=self.mock_config)
+
+        self.assertIs(
+            mock_openai_class.call_args.kwargs['http_client'],
+            email_organizer.llm._sync_http
+        )
+
+    @patch('ai_organizer.OpenAI')
+    @patch('ai_organizer.get_config')
+    def test_default_config_is_shared(self, mock_get_config, mock_openai_class):
+        """Test organizers without an explicit config use the process-wide Config."""
+        mock_get_config.return_value = self.mock_config
+
+        first = EmailOrganizer()
+        second = EmailOrganizer()
+
+        self.assertIs(first.config, second.config)
+        self.assertIs(first.config, self.mock_config)
+
+    @patch('google_gemini_helper.GeminiEmailOrganizer')
+    def test_gemini_provider(self, mock_gemini_class):
+        """Test LLM_PROVIDER selects the Gemini organizer."""
+        self.mock_config.LLM_PROVIDER = 'gemini'
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+
+        mock_gemini_class.assert_called_once_with(config=self.mock_config)
+        self.assertIs(email_organizer.llm, mock_gemini_class.return_value)
+
 
 class TestEmailOrganizerCategorization(unittest.TestCase):
     def setUp(self):
@@ -39,15 +100,9 @@ class TestEmailOrganizerCategorization(unittest.TestCase):
     @patch('ai_organizer.OpenAI')
     def test_categorization(self, mock_openai_class):
         """Test email categorization."""
-        # Create mock response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = MagicMock()
-        mock_response.choices[0].message.content = 'Work'
-        
-        # Setup mock client
+        # Setup mock client with a streamed response
         mock_client = MagicMock()
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create.return_value = make_stream('Wo', 'rk')
         mock_openai_class.return_value = mock_client
         
         email_organizer = EmailOrganizer(config=self.mock_config)
@@ -56,6 +111,164 @@ class TestEmailOrganizerCategorization(unittest.TestCase):
         self.assertIn('category', categories)
         self.assertEqual(categories['category'], 'Work')
 
+    @patch('ai_organizer._get_encoding')
+    @patch('ai_organizer.OpenAI')
+    def test_categorization_constrained_output(self, mock_openai_class, mock_get_encoding):
+        """Test single-token categories are biased and limited to one output token."""
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text: {
+            'Work': [101], 'Personal': [202], 'Promotions': [303]
+        }[text]
+        mock_get_encoding.return_value = mock_encoding
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = make_stream('Work')
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        email_organizer.categorize_email('Test email content')
+
+        call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(call_kwargs['max_tokens'], 1)
+        self.assertEqual(call_kwargs['logit_bias'], {'101': 100, '202': 100, '303': 100})
+
+    @patch('ai_organizer._get_encoding')
+    @patch('ai_organizer.OpenAI')
+    def test_categorization_multi_token_category(self, mock_openai_class, mock_get_encoding):
+        """Test multi-token categories disable the bias and come back whole."""
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text: {
+            'Work': [101], 'Personal': [202, 203], 'Promotions': [303, 304, 305]
+        }[text]
+        mock_get_encoding.return_value = mock_encoding
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = make_stream('Pro', 'mo', 'tions.')
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        result = email_organizer.categorize_email('Test email content')
+
+        call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(call_kwargs['max_tokens'], 3)
+        self.assertNotIn('logit_bias', call_kwargs)
+        self.assertEqual(result, {'category': 'Promotions', 'confidence': 'high'})
+
+    @patch('ai_organizer.OpenAI')
+    def test_categorization_unknown_reply(self, mock_openai_class):
+        """Test replies are matched case-insensitively and unknown ones get low confidence."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = [make_stream('personal'), make_stream('Spam')]
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+
+        self.assertEqual(email_organizer.categorize_email('First')['category'], 'Personal')
+        self.assertEqual(email_organizer.categorize_email('Second'),
+                         {'category': 'Spam', 'confidence': 'low'})
+
+    @patch('ai_organizer.OpenAI')
+    def test_categorization_uses_classify_model(self, mock_openai_class):
+        """Test categorize and summarize calls are routed to their own models."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = 'Summary'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = [make_stream('Work'), mock_response]
+        mock_openai_class.return_value = mock_client
+        self.mock_config.OPENAI_CLASSIFY_MODEL = 'small-model'
+        self.mock_config.OPENAI_SUMMARY_MODEL = 'large-model'
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        email_organizer.categorize_email('Test email content')
+        email_organizer.summarize_email('Test email content')
+
+        models = [call.kwargs['model'] for call in mock_client.chat.completions.create.call_args_list]
+        self.assertEqual(models, ['small-model', 'large-model'])
+
+    @patch('ai_organizer.OpenAI')
+    def test_static_prompt_prefix(self, mock_openai_class):
+        """Test instructions are in the system message and the email body goes last."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = lambda **kwargs: make_stream('Work')
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        email_organizer.categorize_email('First email')
+        email_organizer.categorize_email('Second email')
+
+        first, second = [call.kwargs['messages'] for call in mock_client.chat.completions.create.call_args_list]
+        self.assertEqual(first[0], second[0])
+        self.assertIn('Work, Personal, Promotions', first[0]['content'])
+        self.assertEqual(first[1]['content'], 'Email:\nFirst email')
+
+    @patch('ai_organizer.OpenAI')
+    def test_categorization_stops_at_first_line(self, mock_openai_class):
+        """Test the category stream is closed as soon as the first line is complete."""
+        stream = make_stream('\n', 'Personal', '\nBecause', ' it mentions family')
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        result = email_organizer.categorize_email('Test email content')
+
+        self.assertEqual(result['category'], 'Personal')
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs['stream'])
+        stream.close.assert_called_once()
+
+    @patch('ai_organizer._get_encoding')
+    @patch('ai_organizer.OpenAI')
+    def test_truncation_by_tokens(self, mock_openai_class, mock_get_encoding):
+        """Test email content is cut at MAX_EMAIL_TOKENS tokens when a tokenizer exists."""
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text, **kwargs: text.split()
+        mock_encoding.decode.side_effect = ' '.join
+        mock_get_encoding.return_value = mock_encoding
+        self.mock_config.MAX_EMAIL_TOKENS = 3
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        llm = email_organizer.llm
+
+        self.assertEqual(llm._truncate_email_content('one two'), 'one two')
+        truncated = llm._truncate_email_content('one two three four five')
+        self.assertTrue(truncated.startswith('one two three\n\n[Email content truncated'))
+
+    @patch('ai_organizer._get_encoding')
+    @patch('ai_organizer.OpenAI')
+    def test_truncation_character_limit_with_tokenizer(self, mock_openai_class, mock_get_encoding):
+        """Test MAX_EMAIL_CONTENT_LENGTH still caps content when a tokenizer exists."""
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text, **kwargs: text.split()
+        mock_encoding.decode.side_effect = ' '.join
+        mock_get_encoding.return_value = mock_encoding
+        self.mock_config.MAX_EMAIL_TOKENS = 100
+        self.mock_config.MAX_EMAIL_CONTENT_LENGTH = 10
+
+        llm = EmailOrganizer(config=self.mock_config).llm
+        truncated = llm._truncate_email_content('one two three four five')
+
+        self.assertTrue(truncated.startswith('one two th\n\n[Email content truncated'))
+
+    @patch('ai_organizer._get_encoding')
+    @patch('ai_organizer.OpenAI')
+    def test_truncation_reused_for_same_email(self, mock_openai_class, mock_get_encoding):
+        """Test truncating the same email again doesn't re-encode it."""
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text, **kwargs: text.split()
+        mock_encoding.decode.side_effect = ' '.join
+        mock_get_encoding.return_value = mock_encoding
+        self.mock_config.MAX_EMAIL_TOKENS = 3
+        llm = EmailOrganizer(config=self.mock_config).llm
+        mock_encoding.encode.reset_mock()
+        email_content = 'one two three four five'
+
+        first = llm._truncate_email_content(email_content)
+        second = llm._truncate_email_content(email_content)
+
+        self.assertEqual(first, second)
+        mock_encoding.encode.assert_called_once()
+
 
 class TestEmailOrganizerSummarization(unittest.TestCase):
     def setUp(self):
@@ -120,6 +333,47 @@ class TestEmailOrganizerActionItems(unittest.TestCase):
         self.assertIsInstance(action_items, list)
         self.assertGreater(len(action_items), 0)
 
+    @patch('ai_organizer.OpenAI')
+    def test_action_items_strip_bullets(self, mock_openai_class):
+        """Test bullets on either end and CR are stripped and bullet-only lines dropped."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = '**Send report**\r\n-\r\n- Call Bob\r\n• *Book room* -'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        action_items = email_organizer.extract_action_items('Test email content')
+
+        self.assertEqual(action_items, ['Send report', 'Call Bob', 'Book room'])
+
+    @patch('ai_organizer.OpenAI')
+    def test_action_items_shared_across_emails(self, mock_openai_class):
+        """Test equal action items from different emails are the same string object."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = lambda **kwargs: MagicMock(
+            choices=[MagicMock(message=MagicMock(content='- Review PR ' + '#' * 30))]
+        )
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        first = email_organizer.extract_action_items('First email')
+        second = email_organizer.extract_action_items('Second email')
+
+        self.assertEqual(first, second)
+        self.assertIs(first[0], second[0])
+
+    @patch('ai_organizer.ACTION_ITEM_POOL_SIZE', 2)
+    @patch('ai_organizer.OpenAI')
+    def test_action_item_pool_is_bounded(self, mock_openai_class):
+        """Test the interning pool evicts the least recently seen item once full."""
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        email_organizer._intern_action_items(['a', 'b'])
+        email_organizer._intern_action_items(['a', 'c'])
+
+        self.assertEqual(list(email_organizer._action_item_pool), ['a', 'c'])
+
 
 class TestEmailOrganizerConfidenceScoring(unittest.TestCase):
     def setUp(self):
@@ -153,6 +407,21 @@ class TestEmailOrganizerConfidenceScoring(unittest.TestCase):
         self.assertIn('Work', confidence)
         self.assertGreaterEqual(confidence['Work'], 0)
 
+    @patch('ai_organizer.OpenAI')
+    def test_confidence_scoring_crlf_lines(self, mock_openai_class):
+        """Test scores are parsed from CRLF-terminated lines."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = 'Work: 80%\r\nPersonal: 20%\r\n'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        confidence = email_organizer.confidence_scoring('Test email content')
+
+        self.assertEqual(confidence, {'Work': 0.8, 'Personal': 0.2})
+
 
 class TestEmailOrganizerAPICallParameters(unittest.TestCase):
     def setUp(self):
@@ -179,5 +448,426 @@ class TestEmailOrganizerAPICallParameters(unittest.TestCase):
         self.assertIsNotNone(email_organizer.llm.categories)
 
 
+class TestEmailOrganizerProcessMany(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Set up test fixtures with mock config."""
+        self.mock_config = type('Config', (), {
+            'OPENAI_API_KEY': 'test-api-key',
+            'OPENAI_MODEL': 'gpt-3.5-turbo',
+            'OPENAI_MAX_TOKENS': 500,
+            'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions'],
+            'MAX_EMAIL_CONTENT_LENGTH': 8000,
+            'MAX_CONCURRENCY': 2
+        })()
+
+    @patch('ai_organizer.AsyncOpenAI')
+    @patch('ai_organizer.OpenAI')
+    async def test_process_many(self, mock_openai_class, mock_async_openai_class):
+        """Test concurrent processing returns results in input order."""
+        def make_response(content):
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = content
+            return response
+
+        async def fake_create(model, messages, max_tokens, **kwargs):
+            prompt = messages[-1]['content']
+            if 'Summarize' in messages[0]['content']:
+                return make_response('Summary')
+            return make_async_stream('Personal' if 'second' in prompt else 'Work')
+
+        mock_aclient = MagicMock()
+        mock_aclient.chat.completions.create = AsyncMock(side_effect=fake_create)
+        mock_async_openai_class.return_value = mock_aclient
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        results = await email_organizer.process_many(['first email', 'second email'])
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['categorize']['category'], 'Work')
+        self.assertEqual(results[1]['categorize']['category'], 'Personal')
+        self.assertEqual(results[1]['summarize'], 'Summary')
+        self.assertEqual(mock_aclient.chat.completions.create.await_count, 4)
+
+
+class TestAsyncRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_waits_for_window(self):
+        """Test requests beyond the per-window limits wait for old ones to expire."""
+        limiter = AsyncRateLimiter(rpm=2, tpm=100, window=0.2)
+
+        start = time.monotonic()
+        await limiter.acquire(10)
+        await limiter.acquire(10)
+        self.assertLess(time.monotonic() - start, 0.1)
+
+        await limiter.acquire(10)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    async def test_token_limit(self):
+        """Test the token budget is enforced independently of the request count."""
+        limiter = AsyncRateLimiter(rpm=0, tpm=100, window=0.2)
+
+        start = time.monotonic()
+        await limiter.acquire(90)
+        await limiter.acquire(20)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+class TestEmailOrganizerBatchAPI(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures with mock config."""
+        self.mock_config = type('Config', (), {
+            'OPENAI_API_KEY': 'test-api-key',
+            'OPENAI_MODEL': 'gpt-3.5-turbo',
+            'OPENAI_MAX_TOKENS': 500,
+            'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions'],
+            'MAX_EMAIL_CONTENT_LENGTH': 8000
+        })()
+
+    @patch('ai_organizer.time.sleep')
+    @patch('ai_organizer.OpenAI')
+    def test_batch_categorize_and_poll(self, mock_openai_class, mock_sleep):
+        """Test submitting a batch job and parsing its output file."""
+        mock_client = MagicMock()
+        mock_client.files.create.return_value = MagicMock(id='file-1')
+        mock_client.batches.create.return_value = MagicMock(id='batch-1')
+        mock_client.batches.retrieve.side_effect = [
+            MagicMock(status='in_progress'),
+            MagicMock(status='completed', output_file_id='file-out'),
+        ]
+        mock_client.files.content.return_value = MagicMock(text=(
+            '{"custom_id": "email-0", "response": {"status_code": 200, '
+            '"body": {"choices": [{"message": {"content": "Work"}}]}}, "error": null}\n'
+            '{"custom_id": "email-1", "response": {"status_code": 500, "body": {}}, "error": null}\n'
+        ))
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        batch_id = email_organizer.batch_categorize(['first email', 'second email'])
+        results = email_organizer.poll_batch(batch_id)
+
+        self.assertEqual(batch_id, 'batch-1')
+        uploaded = mock_client.files.create.call_args.kwargs['file'][1].decode('utf-8')
+        self.assertEqual(len(uploaded.splitlines()), 2)
+        self.assertEqual(results, {'email-0': {'category': 'Work', 'confidence': 'high'}})
+        mock_sleep.assert_called_once()
+
+
+class TestEmailOrganizerMarshaledCategorization(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures with mock config."""
+        self.mock_config = type('Config', (), {
+            'OPENAI_API_KEY': 'test-api-key',
+            'OPENAI_MODEL': 'gpt-3.5-turbo',
+            'OPENAI_MAX_TOKENS': 500,
+            'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions'],
+            'MAX_EMAIL_CONTENT_LENGTH': 8000
+        })()
+
+    @patch('ai_organizer.OpenAI')
+    def test_marshaled_with_fallback(self, mock_openai_class):
+        """Test several emails share one call and missing rows fall back to single calls."""
+        def make_response(content):
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = content
+            return response
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = [
+            make_response('{"results": [{"id": 1, "category": "Work"}, {"id": 3, "category": "Promotions"}]}'),
+            make_stream('Personal'),
+        ]
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        results = email_organizer.categorize_emails_marshaled(['one', 'two', 'three'])
+
+        self.assertEqual([r['category'] for r in results], ['Work', 'Personal', 'Promotions'])
+        first_call = mock_client.chat.completions.create.call_args_list[0].kwargs
+        self.assertEqual(first_call['response_format'], {'type': 'json_object'})
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    @patch('ai_organizer.OpenAI')
+    def test_marshaled_groups_by_length(self, mock_openai_class):
+        """Test similar-length emails share a prompt and results keep input order."""
+        def make_response(content):
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = content
+            return response
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = [
+            make_response('{"results": [{"id": 1, "category": "Personal"}, {"id": 2, "category": "Promotions"}]}'),
+            make_response('{"results": [{"id": 1, "category": "Work"}, {"id": 2, "category": "Work"}]}'),
+        ]
+        mock_openai_class.return_value = mock_client
+
+        emails = ['a much longer work email', 'hi', 'sale', 'another long work email']
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        results = email_organizer.categorize_emails_marshaled(emails, batch_rows=2)
+
+        self.assertEqual([r['category'] for r in results], ['Work', 'Personal', 'Promotions', 'Work'])
+        first_prompt = mock_client.chat.completions.create.call_args_list[0].kwargs['messages'][-1]['content']
+        self.assertIn('hi', first_prompt)
+        self.assertIn('sale', first_prompt)
+
+
+    @patch('google_gemini_helper.genai.Client')
+    def test_gemini_marshaled_with_fallback(self, mock_client_class):
+        """Test Gemini packs emails into one schema-constrained call with single-call fallback."""
+        from google_gemini_helper import GeminiEmailOrganizer
+        mock_client = mock_client_class.return_value
+        mock_client.models.generate_content.side_effect = [
+            MagicMock(text='[{"id": 1, "category": "Work"}, {"id": 3, "category": "Promotions"}]'),
+            MagicMock(text='Personal'),
+        ]
+        config = type('Config', (), {'GOOGLE_API_KEY': 'test-key', 'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions']})()
+
+        with patch.dict(os.environ):
+            organizer = GeminiEmailOrganizer(config=config)
+            results = organizer.categorize_emails_marshaled(['one', 'two', 'three'])
+
+        self.assertEqual([r['category'] for r in results], ['Work', 'Personal', 'Promotions'])
+        first_config = mock_client.models.generate_content.call_args_list[0].kwargs['config']
+        self.assertEqual(first_config.response_mime_type, 'application/json')
+        self.assertEqual(mock_client.models.generate_content.call_count, 2)
+
+    @patch('google_gemini_helper.genai.Client')
+    def test_gemini_analyze_email_single_call(self, mock_client_class):
+        """Test Gemini fused analysis returns all fields from one schema-constrained call."""
+        from google_gemini_helper import GeminiEmailOrganizer
+        mock_client = mock_client_class.return_value
+        mock_client.models.generate_content.return_value = MagicMock(text=(
+            '{"category": "Work", "summary": "Meeting tomorrow.", '
+            '"action_items": ["Prepare slides"], "confidence": {"Work": 0.9, "Personal": 0.1}}'
+        ))
+        config = type('Config', (), {
+            'LLM_PROVIDER': 'gemini',
+            'GOOGLE_API_KEY': 'test-key',
+            'EMAIL_CATEGORIES': ['Work', 'Personal']
+        })()
+
+        with patch.dict(os.environ):
+            email_organizer = EmailOrganizer(config=config)
+            analysis = email_organizer.analyze_email('Team meeting tomorrow, please prepare slides.')
+
+        self.assertEqual(analysis['category'], 'Work')
+        self.assertEqual(analysis['action_items'], ['Prepare slides'])
+        self.assertAlmostEqual(analysis['confidence']['Work'], 0.9)
+        mock_client.models.generate_content.assert_called_once()
+
+    @patch('google_gemini_helper.genai.Client')
+    def test_gemini_parses_bullets_and_crlf_scores(self, mock_client_class):
+        """Test Gemini uses the shared action-item and confidence parsers."""
+        mock_client = mock_client_class.return_value
+        mock_client.models.generate_content.side_effect = [
+            MagicMock(text='**Send report**\r\n-\r\n- Call Bob'),
+            MagicMock(text='Work: 80%\r\nPersonal: 20%'),
+        ]
+        config = type('Config', (), {
+            'LLM_PROVIDER': 'gemini',
+            'GOOGLE_API_KEY': 'test-key',
+            'EMAIL_CATEGORIES': ['Work', 'Personal']
+        })()
+
+        with patch.dict(os.environ):
+            email_organizer = EmailOrganizer(config=config)
+            action_items = email_organizer.extract_action_items('Please send the report and call Bob.')
+            confidence = email_organizer.confidence_scoring('Please send the report and call Bob.')
+
+        self.assertEqual(action_items, ['Send report', 'Call Bob'])
+        self.assertEqual(confidence, {'Work': 0.8, 'Personal': 0.2})
+
+    @patch('google_gemini_helper.genai.Client')
+    def test_gemini_identical_requests_hit_cache(self, mock_client_class):
+        """Test Gemini serves repeated identical requests from the response cache."""
+        from google_gemini_helper import GeminiEmailOrganizer
+        mock_client = mock_client_class.return_value
+        mock_client.models.generate_content.return_value = MagicMock(text='Work\n')
+        config = type('Config', (), {
+            'GOOGLE_API_KEY': 'test-key',
+            'EMAIL_CATEGORIES': ['Work', 'Personal'],
+            'LLM_CACHE_ENABLED': True,
+            'LLM_CACHE_PATH': ':memory:'
+        })()
+
+        with patch.dict(os.environ):
+            organizer = GeminiEmailOrganizer(config=config)
+            first = organizer.categorize_email('Weekly newsletter')
+            second = organizer.categorize_email('Weekly newsletter')
+            organizer.categorize_email('Different email')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['category'], 'Work')
+        self.assertEqual(mock_client.models.generate_content.call_count, 2)
+
+
+class TestEmailOrganizerResponseCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures with mock config."""
+        self.mock_config = type('Config', (), {
+            'OPENAI_API_KEY': 'test-api-key',
+            'OPENAI_MODEL': 'gpt-3.5-turbo',
+            'OPENAI_MAX_TOKENS': 500,
+            'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions'],
+            'MAX_EMAIL_CONTENT_LENGTH': 8000,
+            'LLM_CACHE_ENABLED': True,
+            'LLM_CACHE_PATH': ':memory:'
+        })()
+
+    @patch('ai_organizer.OpenAI')
+    def test_identical_requests_hit_cache(self, mock_openai_class):
+        """Test repeated identical requests only call the API once."""
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = lambda **kwargs: make_stream('Work')
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        first = email_organizer.categorize_email('Test email content')
+        second = email_organizer.categorize_email('Test email content')
+        email_organizer.categorize_email('Different email content')
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    @patch('ai_organizer.OpenAI')
+    def test_analysis_ignores_unsubscribe_tokens(self, mock_openai_class):
+        """Test emails differing only in their unsubscribe link share one analysis."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = (
+            '{"category": "Promotions", "summary": "Deals.", "action_items": [], "confidence": {}}'
+        )
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        first = email_organizer.analyze_email('Sale! https://shop.com/unsubscribe?u=1')
+        second = email_organizer.analyze_email('Sale! https://shop.com/unsubscribe?u=2')
+
+        self.assertEqual(first, second)
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('ai_organizer.OpenAI')
+    def test_remembered_analysis_served_from_cache(self, mock_openai_class):
+        """Test an analysis stored by the organize pipeline is found again for the same email."""
+        analysis = {'category': 'Work', 'summary': 'S', 'action_items': [], 'confidence': {}}
+        email_organizer = EmailOrganizer(config=self.mock_config)
+
+        self.assertIsNone(email_organizer.cached_analysis('From: a@x.com\n\nReport'))
+        email_organizer.remember_analysis('From: a@x.com\n\nReport', analysis)
+
+        self.assertEqual(email_organizer.cached_analysis('From: a@x.com\n\nReport'), analysis)
+        self.assertEqual(email_organizer.analyze_email('From: a@x.com\n\nReport'), analysis)
+        mock_openai_class.return_value.chat.completions.create.assert_not_called()
+
+
+class TestEmailOrganizerAnalyze(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures with mock config."""
+        self.mock_config = type('Config', (), {
+            'OPENAI_API_KEY': 'test-api-key',
+            'OPENAI_MODEL': 'gpt-3.5-turbo',
+            'OPENAI_MAX_TOKENS': 500,
+            'EMAIL_CATEGORIES': ['Work', 'Personal', 'Promotions'],
+            'MAX_EMAIL_CONTENT_LENGTH': 8000
+        })()
+
+    @patch('ai_organizer.OpenAI')
+    def test_analyze_email_single_call(self, mock_openai_class):
+        """Test fused analysis returns all fields from one API call."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = (
+            '{"category": "Work", "summary": "Meeting tomorrow.", '
+            '"action_items": ["Prepare slides"], "confidence": {"Work": 0.9, "Personal": 0.1}}'
+        )
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        analysis = email_organizer.analyze_email('Team meeting tomorrow, please prepare slides.')
+
+        self.assertEqual(analysis['category'], 'Work')
+        self.assertEqual(analysis['summary'], 'Meeting tomorrow.')
+        self.assertEqual(analysis['action_items'], ['Prepare slides'])
+        self.assertAlmostEqual(analysis['confidence']['Work'], 0.9)
+        mock_client.chat.completions.create.assert_called_once()
+
+
+    @patch('ai_organizer.OpenAI')
+    def test_summarize_with_action_items_single_call(self, mock_openai_class):
+        """Test summary and action items come back from one JSON-mode call."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = '{"summary": "Meeting tomorrow.", "action_items": ["Prepare slides"]}'
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=self.mock_config)
+        result = email_organizer.summarize_with_action_items('Team meeting tomorrow, please prepare slides.')
+
+        self.assertEqual(result, {'summary': 'Meeting tomorrow.', 'action_items': ['Prepare slides']})
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(
+            mock_client.chat.completions.create.call_args.kwargs['response_format'],
+            {'type': 'json_object'}
+        )
+
+    @patch('ai_organizer.OpenAI')
+    def test_semantic_cache_reuses_near_duplicate(self, mock_openai_class):
+        """Test a near-duplicate email from the same domain skips the second analysis call."""
+        mock_config = type('Config', (), {
+            **vars(type(self.mock_config)),
+            'SEMANTIC_CACHE_ENABLED': True,
+            'SEMANTIC_CACHE_PATH': ':memory:',
+            'SEMANTIC_CACHE_THRESHOLD': 0.93
+        })()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = (
+            '{"category": "Promotions", "summary": "Weekly deals.", '
+            '"action_items": [], "confidence": {"Promotions": 0.95}}'
+        )
+        vectors = iter([[1.0, 0.0, 0.1], [1.0, 0.0, 0.12], [1.0, 0.0, 0.12]])
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.embeddings.create.side_effect = lambda **kwargs: MagicMock(data=[MagicMock(embedding=next(vectors))])
+        mock_openai_class.return_value = mock_client
+
+        email_organizer = EmailOrganizer(config=mock_config)
+        first = email_organizer.analyze_email('From: deals@shop.com\nSubject: Deals week 1\n\nSale!')
+        second = email_organizer.analyze_email('From: deals@shop.com\nSubject: Deals week 2\n\nSale!')
+        email_organizer.analyze_email('From: news@other.com\nSubject: Deals week 2\n\nSale!')
+
+        self.assertEqual(second, first)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+
+class TestOrganizerModuleStructure(unittest.TestCase):
+    def test_no_duplicate_methods(self):
+        """Test no class in ai_organizer defines the same method twice."""
+        path = os.path.join(os.path.dirname(__file__), '..', 'ai_organizer.py')
+        with open(path) as f:
+            tree = ast.parse(f.read())
+
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                names = [
+                    item.name for item in node.body
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ]
+                duplicates = {name for name in names if names.count(name) > 1}
+                self.assertEqual(duplicates, set(), f"{node.name} redefines {duplicates}")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
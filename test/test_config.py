@@ -0,0 +1,226 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from config import Config, config, get_config
+from env_loader import parse_env
+from rules import RuleEngine, parse_rules
+from semantic_cache import SemanticCache
+from sqlite_cache import SQLiteCache
+
+
+class TestConfigCaching(unittest.TestCase):
+    @patch.dict(os.environ, {'OPENAI_MODEL': 'model-a', 'DEFAULT_CATEGORIES': 'Work, Personal'})
+    def test_values_cached_until_reload(self):
+        """Test values are parsed once per instance and re-read after reload()."""
+        config = Config()
+        self.assertEqual(config.OPENAI_MODEL, 'model-a')
+        self.assertEqual(config.EMAIL_CATEGORIES, ('Work', 'Personal'))
+
+        os.environ['OPENAI_MODEL'] = 'model-b'
+        self.assertEqual(config.OPENAI_MODEL, 'model-a')
+
+        config.reload()
+        self.assertEqual(config.OPENAI_MODEL, 'model-b')
+
+
+    def test_email_categories_alias(self):
+        """Test EMAIL_CATEGORIES is the cached DEFAULT_CATEGORIES object, not a copy."""
+        config = Config()
+        self.assertIs(config.EMAIL_CATEGORIES, config.DEFAULT_CATEGORIES)
+
+    def test_shared_instance(self):
+        """Test the module-level config is the one instance handed out everywhere."""
+        self.assertIs(get_config(), config)
+
+
+class TestConfigParsing(unittest.TestCase):
+    @patch.dict(os.environ, {
+        'OPENAI_MAX_TOKENS': '250',
+        'RATE_LIMIT_DELAY': '1.5',
+        'LLM_CACHE_ENABLED': ' Yes ',
+        'CATEGORIES_TO_KEEP': 'Notes, ,Github,',
+    })
+    def test_typed_values(self):
+        """Test ints, floats, booleans and CSV lists are coerced from strings."""
+        config = Config()
+        self.assertEqual(config.OPENAI_MAX_TOKENS, 250)
+        self.assertEqual(config.RATE_LIMIT_DELAY, 1.5)
+        self.assertTrue(config.LLM_CACHE_ENABLED)
+        self.assertEqual(config.GMAIL_CACHE_PATH, '~/.cache/email-organizer/gmail_cache.sqlite')
+        self.assertEqual(config.CATEGORIES_TO_KEEP, ('Notes', 'Github'))
+        self.assertIn('Github', config.CATEGORIES_TO_KEEP_SET)
+        self.assertIn('github', config.CATEGORIES_TO_KEEP_LOWER)
+
+    @patch.dict(os.environ, {'CATEGORY_RULES': r'*@github.com=Github; subject:^\[JIRA\]=Work ;'})
+    def test_category_rules(self):
+        """Test CATEGORY_RULES parses into ordered rules the RuleEngine can match."""
+        config = Config()
+        self.assertEqual(config.CATEGORY_RULES, (
+            ('from', '*@github.com', 'Github'),
+            ('subject', r'^\[JIRA\]', 'Work'),
+        ))
+        
+        engine = RuleEngine(config.CATEGORY_RULES)
+        self.assertEqual(engine.match('GitHub <Notifications@GitHub.com>', 'New PR'), 'Github')
+        self.assertEqual(engine.match('jira@example.com', '[JIRA] Ticket assigned'), 'Work')
+        self.assertIsNone(engine.match('friend@example.com', 'Lunch?'))
+
+    def test_boolean_spellings(self):
+        """Test every truthy spelling enables a flag and anything else disables it."""
+        for value, expected in [('true', True), ('1', True), ('YES', True), ('on', True),
+                                ('false', False), ('0', False), ('off', False), ('', False)]:
+            with patch.dict(os.environ, {'LLM_CACHE_ENABLED': value}):
+                self.assertIs(Config().LLM_CACHE_ENABLED, expected, value)
+
+    @patch.dict(os.environ, {'CATEGORIES_TO_KEEP': 'Notes,Github'})
+    def test_labels_to_preserve_fallback(self):
+        """Test LABELS_TO_PRESERVE reuses the parsed CATEGORIES_TO_KEEP when unset."""
+        os.environ.pop('LABELS_TO_PRESERVE', None)
+        config = Config()
+        self.assertIs(config.LABELS_TO_PRESERVE, config.CATEGORIES_TO_KEEP)
+        self.assertIs(config.LABELS_TO_PRESERVE_SET, config.CATEGORIES_TO_KEEP_SET)
+
+        os.environ['LABELS_TO_PRESERVE'] = 'important, starred'
+        config.reload()
+        self.assertEqual(config.LABELS_TO_PRESERVE, ('important', 'starred'))
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_defaults(self):
+        """Test unset variables fall back to their typed defaults."""
+        config = Config()
+        self.assertEqual(config.OPENAI_MAX_TOKENS, 500)
+        self.assertFalse(config.LLM_CACHE_ENABLED)
+        self.assertFalse(config.GMAIL_CACHE_ENABLED)
+        self.assertEqual(config.LLM_CACHE_PATH, '~/.cache/email-organizer/llm_cache.sqlite')
+        self.assertEqual(config.SEMANTIC_CACHE_PATH, '~/.cache/email-organizer/semantic_cache.sqlite')
+        self.assertEqual(config.CUSTOM_LABELS, ())
+
+
+class TestConfigLoadEnv(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(Config, '_env_loaded', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('config.load_env_file')
+    def test_load_env_once(self, mock_load_env_file):
+        """Test the .env file is parsed only on the first load_env() call."""
+        Config.load_env()
+        Config.load_env()
+        mock_load_env_file.assert_called_once()
+
+    @patch('config.load_env_file')
+    def test_load_env_lazy(self, mock_load_env_file):
+        """Test .env is loaded on the first setting read, not on construction."""
+        config = Config()
+        mock_load_env_file.assert_not_called()
+
+        config.OPENAI_MODEL
+        mock_load_env_file.assert_called_once()
+
+    @patch.dict(os.environ, {'SKIP_DOTENV': '1'})
+    @patch('config.load_env_file')
+    def test_skip_dotenv(self, mock_load_env_file):
+        """Test SKIP_DOTENV bypasses .env loading."""
+        Config().OPENAI_MODEL
+        mock_load_env_file.assert_not_called()
+
+
+class TestEnvLoader(unittest.TestCase):
+    def test_parse_env(self):
+        """Test comments, export prefixes, quoting and inline comments."""
+        data = (
+            b'# comment\n'
+            b'\n'
+            b'OPENAI_MODEL=gpt-4o-mini  # inline comment\n'
+            b'export LLM_PROVIDER=gemini\n'
+            b"CATEGORIES_TO_KEEP='Notes, Github # kept'\n"
+            b'GREETING="Hello \\"World\\"\\n"\r\n'
+            b'EMPTY=\n'
+            b'not a valid line\n'
+            b'BAD KEY=value\n'
+        )
+        self.assertEqual(parse_env(data), {
+            'OPENAI_MODEL': 'gpt-4o-mini',
+            'LLM_PROVIDER': 'gemini',
+            'CATEGORIES_TO_KEEP': 'Notes, Github # kept',
+            'GREETING': 'Hello "World"\n',
+            'EMPTY': '',
+        })
+
+
+class TestRules(unittest.TestCase):
+    def test_parse_rules_prefixes(self):
+        """Test field prefixes are case-insensitive and anything else is a 'from' pattern."""
+        self.assertEqual(parse_rules('FROM:*@x.com=A; Subject: ^Re: =B; news:*@y.com=C'), (
+            ('from', '*@x.com', 'A'),
+            ('subject', '^Re:', 'B'),
+            ('from', 'news:*@y.com', 'C'),
+        ))
+
+    def test_parse_rules_errors(self):
+        """Test entries without a pattern or category are rejected."""
+        for spec in ('*@x.com', '=Work', '*@x.com=', 'ok@x.com=A;broken'):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_rules(spec)
+
+    def test_rule_engine_errors(self):
+        """Test unknown fields and invalid subject regexes are rejected up front."""
+        with self.assertRaises(ValueError):
+            RuleEngine([('to', '*@x.com', 'Work')])
+        with self.assertRaises(ValueError):
+            RuleEngine([('subject', '[unclosed', 'Work')])
+
+    def test_rule_engine_match(self):
+        """Test sender globs match the bare address case-insensitively and the first rule wins."""
+        engine = RuleEngine(parse_rules('*@github.com=Github;subject:invoice=Finance;subject:.*=Other'))
+        self.assertEqual(engine.match('GitHub <Noreply@GitHub.com>', 'invoice'), 'Github')
+        self.assertEqual(engine.match('bob@example.com', 'Your invoice'), 'Finance')
+        self.assertEqual(engine.match('bob@example.com', 'Hello'), 'Other')
+        self.assertIsNone(RuleEngine().match('bob@example.com', 'Hello'))
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'nested', 'cache.sqlite')
+
+    def test_persists_across_instances(self):
+        """Test values survive reopening and missing parent directories are created."""
+        cache = SQLiteCache(self.path)
+        cache.set('key', {'category': 'Work', 'items': ['a']})
+        cache.close()
+
+        reopened = SQLiteCache(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get('key'), {'category': 'Work', 'items': ['a']})
+        self.assertIsNone(reopened.get('missing'))
+
+    def test_memory_layer_is_bounded(self):
+        """Test the LRU evicts the least recently used key but SQLite keeps it."""
+        cache = SQLiteCache(self.path, memory_size=2)
+        self.addCleanup(cache.close)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(list(cache._memory), ['a', 'c'])
+        self.assertEqual(cache.get('b'), 2)
+
+    def test_home_relative_paths(self):
+        """Test both caches expand '~' and create the directories under it."""
+        home = os.path.dirname(os.path.dirname(self.path))
+        with patch.dict(os.environ, {'HOME': home}):
+            cache = SQLiteCache('~/.cache/app/cache.sqlite')
+            semantic = SemanticCache('~/.cache/app/semantic.sqlite', embed=lambda text: [1.0])
+        cache.close()
+        semantic.close()
+
+        self.assertEqual(sorted(os.listdir(os.path.join(home, '.cache', 'app'))), ['cache.sqlite', 'semantic.sqlite'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,44 @@
 import unittest
-from unittest.mock import patch, MagicMock, mock_open
-from gmail_client import GmailClient
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, AsyncMock, MagicMock, mock_open
+import base64
+import httplib2
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+import httpx
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+from gmail_client import GmailClient, MESSAGE_CACHE_PREFIX
+
+
+class FakeBatch:
+    """Stand-in for BatchHttpRequest that executes its requests in order."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                response = request.execute()
+            except HttpError as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+def make_http_error(status, retry_after=None, content=b'error'):
+    headers = {'status': status}
+    if retry_after is not None:
+        headers['retry-after'] = retry_after
+    return HttpError(httplib2.Response(headers), content)
+
 
 class TestGmailClientAuthentication(unittest.TestCase):
     """Test Gmail authentication flows."""
@@ -62,6 +100,101 @@ class TestGmailClientAuthentication(unittest.TestCase):
         
         mock_creds.refresh.assert_called_once()
 
+    @patch.dict('gmail_client._SERVICE_CACHE', clear=True)
+    @patch('gmail_client.Credentials.from_authorized_user_info')
+    @patch('gmail_client.build')
+    def test_json_credentials_reuse_service(self, mock_build, mock_creds_from_info):
+        """Test clients with the same credentials JSON share one service while the token is valid."""
+        mock_creds = MagicMock(valid=True, scopes=None)
+        mock_creds_from_info.return_value = mock_creds
+        config = type('Config', (), {'GMAIL_CREDENTIALS_JSON': '{"type": "authorized_user"}'})()
+        
+        first = GmailClient(config)
+        second = GmailClient(config)
+        
+        self.assertIs(first.service, second.service)
+        mock_build.assert_called_once()
+        mock_creds_from_info.assert_called_once()
+        
+        mock_creds.valid = False
+        GmailClient(config)
+        self.assertEqual(mock_build.call_count, 2)
+
+    @patch('os.path.exists')
+    @patch('gmail_client.Credentials.from_authorized_user_file')
+    @patch('gmail_client.build')
+    def test_service_per_thread(self, mock_build, mock_creds_from_file, mock_exists):
+        """Test other threads get their own service since httplib2 isn't thread-safe."""
+        mock_exists.return_value = True
+        mock_creds_from_file.return_value = MagicMock(expired=False)
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        client = GmailClient()
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_service = executor.submit(lambda: client.service).result()
+        
+        self.assertIsNotNone(worker_service)
+        self.assertIsNot(worker_service, client.service)
+        self.assertEqual(mock_build.call_count, 2)
+
+
+    @patch('os.path.exists')
+    @patch('gmail_client.Credentials.from_authorized_user_file')
+    @patch('gmail_client.build')
+    @patch('gmail_client.Request')
+    def test_refreshed_token_cached_between_runs(self, mock_request, mock_build, mock_creds_from_file, mock_exists):
+        """Test a refreshed access token is saved and reused instead of refreshing again."""
+        mock_exists.return_value = True
+        expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+        
+        def make_creds():
+            creds = MagicMock(expired=True, refresh_token='refresh', token=None, expiry=None)
+            def refresh(request):
+                creds.token, creds.expiry, creds.expired = 'access', expiry, False
+            creds.refresh.side_effect = refresh
+            return creds
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('Config', (), {
+                'GMAIL_CREDENTIALS_JSON': None,
+                'GMAIL_TOKEN_CACHE_PATH': os.path.join(tmp, 'cache', 'token.cache')
+            })()
+            first_creds = make_creds()
+            mock_creds_from_file.return_value = first_creds
+            GmailClient(config)
+            first_creds.refresh.assert_called_once()
+            
+            second_creds = Credentials(None, refresh_token='refresh', expiry=expiry - timedelta(days=1))
+            second_creds.refresh = MagicMock()
+            mock_creds_from_file.return_value = second_creds
+            GmailClient(config)
+        
+        second_creds.refresh.assert_not_called()
+        self.assertEqual(second_creds.token, 'access')
+        self.assertEqual(second_creds.expiry, expiry)
+
+
+    @patch.dict('gmail_client._SERVICE_CACHE', clear=True)
+    @patch('os.stat')
+    @patch('os.path.exists')
+    @patch('gmail_client.Credentials.from_authorized_user_file')
+    @patch('gmail_client.build')
+    def test_token_file_reuses_service(self, mock_build, mock_creds_from_file, mock_exists, mock_stat):
+        """Test token.json is read once per file version while the token stays valid."""
+        mock_exists.return_value = True
+        mock_stat.return_value = MagicMock(st_mtime_ns=1)
+        mock_creds_from_file.return_value = MagicMock(expired=False, valid=True)
+        
+        client = GmailClient()
+        client.authenticate()
+        
+        mock_creds_from_file.assert_called_once()
+        mock_build.assert_called_once()
+        
+        mock_stat.return_value = MagicMock(st_mtime_ns=2)
+        client.authenticate()
+        self.assertEqual(mock_creds_from_file.call_count, 2)
+
 
 class TestGmailClientFetchEmails(unittest.TestCase):
     """Test email fetching functionality."""
@@ -73,6 +206,8 @@ class TestGmailClientFetchEmails(unittest.TestCase):
              patch('gmail_client.build'):
             self.client = GmailClient()
             self.client.service = MagicMock()
+            self.client.service.new_batch_http_request.side_effect = \
+                lambda callback: FakeBatch(callback)
 
     def test_fetch_emails_with_query(self):
         """Test fetching emails with a specific query."""
@@ -124,6 +259,198 @@ class TestGmailClientFetchEmails(unittest.TestCase):
         
         self.assertEqual(len(result), 1)
 
+    def test_fetch_emails_skips_deleted_messages(self):
+        """Test a message deleted after listing doesn't fail the whole fetch."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+        
+        def make_get_call(userId, id, **kwargs):
+            call = MagicMock()
+            if id == '2':
+                call.execute.side_effect = make_http_error(404)
+            else:
+                call.execute.return_value = {'id': id}
+            return call
+        self.client.service.users().messages().get = MagicMock(side_effect=make_get_call)
+        
+        result = self.client.fetch_emails()
+        
+        self.assertEqual([msg['id'] for msg in result], ['1', '3'])
+
+    def test_fetch_emails_raises_other_errors(self):
+        """Test per-message errors other than 404 are still raised."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': '1'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+        mock_get = MagicMock()
+        mock_get.return_value.execute.side_effect = make_http_error(403)
+        self.client.service.users().messages().get = mock_get
+        
+        with self.assertRaises(HttpError):
+            self.client.fetch_emails()
+
+    def test_fetch_emails_metadata_format(self):
+        """Test messages are fetched as metadata by default and in full on request."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': '1'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+        mock_get = MagicMock()
+        mock_get.return_value.execute.return_value = {'id': '1'}
+        self.client.service.users().messages().get = mock_get
+        
+        self.client.fetch_emails()
+        mock_get.assert_called_with(
+            userId='me', id='1', format='metadata',
+            metadataHeaders=['From', 'Subject', 'Date', 'List-Unsubscribe']
+        )
+        
+        self.client.hydrate_bodies(['1'])
+        mock_get.assert_called_with(userId='me', id='1', format='full')
+
+    def test_fetch_emails_batches_requests(self):
+        """Test message details are fetched in batches of 100, in input order."""
+        mock_messages = [{'id': str(i)} for i in range(150)]
+        
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': mock_messages}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+        
+        def make_get_call(userId, id, **kwargs):
+            call = MagicMock()
+            call.execute.return_value = {'id': id}
+            return call
+        self.client.service.users().messages().get = MagicMock(side_effect=make_get_call)
+        
+        # Worker threads build their own service; hand them the same mock
+        with patch('gmail_client.build', return_value=self.client.service) as mock_build:
+            result = self.client.fetch_emails()
+        
+        self.assertEqual([msg['id'] for msg in result], [str(i) for i in range(150)])
+        self.assertEqual(self.client.service.new_batch_http_request.call_count, 2)
+        for call in mock_build.call_args_list:
+            self.assertIs(call.kwargs['credentials'], self.client.creds)
+
+    def test_fetch_emails_filters_in_query(self):
+        """Test fetch filters are pushed into the Gmail search query."""
+        mock_list = MagicMock()
+        mock_list.return_value.execute.return_value = {}
+        self.client.service.users().messages().list = mock_list
+        
+        self.client.fetch_emails('in:inbox', newer_than='7d', unread_only=True, labels=['Travel Plans'])
+        
+        self.assertEqual(
+            mock_list.call_args.kwargs['q'],
+            'in:inbox is:unread newer_than:7d label:Travel-Plans'
+        )
+
+    def test_iter_emails_hydrates_page_by_page(self):
+        """Test each listing page is hydrated before the next page is listed."""
+        pages = [
+            {'messages': [{'id': '1'}, {'id': '2'}], 'nextPageToken': 'page2'},
+            {'messages': [{'id': '3'}]},
+        ]
+        mock_list = MagicMock()
+        mock_list.return_value.execute.side_effect = pages
+        self.client.service.users().messages().list = mock_list
+        mock_get = MagicMock()
+        mock_get.side_effect = lambda userId, id, **kwargs: MagicMock(execute=MagicMock(return_value={'id': id}))
+        self.client.service.users().messages().get = mock_get
+        
+        emails = self.client.iter_emails()
+        
+        self.assertEqual(next(emails), {'id': '1'})
+        self.assertEqual(mock_list.call_count, 1)
+        self.assertEqual([email['id'] for email in emails], ['2', '3'])
+        self.assertEqual(mock_list.call_args.kwargs['pageToken'], 'page2')
+
+    def test_list_history_collects_added_messages(self):
+        """Test history pages are followed and an expired history ID returns None."""
+        pages = [
+            {'history': [{'messagesAdded': [{'message': {'id': '1'}}, {'message': {'id': '2'}}]}],
+             'historyId': '110', 'nextPageToken': 'page2'},
+            {'history': [{'messagesAdded': [{'message': {'id': '2'}}, {'message': {'id': '3'}}]}],
+             'historyId': '120'},
+        ]
+        mock_list = MagicMock()
+        mock_list.return_value.execute.side_effect = pages
+        self.client.service.users().history().list = mock_list
+
+        self.assertEqual(self.client.list_history('100'), (['1', '2', '3'], '120'))
+        self.assertEqual(mock_list.call_args_list[0].kwargs['startHistoryId'], '100')
+        self.assertEqual(mock_list.call_args_list[0].kwargs['labelId'], 'INBOX')
+
+        mock_list.return_value.execute.side_effect = make_http_error(404)
+        self.assertIsNone(self.client.list_history('1'))
+
+
+class TestGmailClientFetchEmailsAsync(unittest.IsolatedAsyncioTestCase):
+    """Test concurrent email fetching over the REST endpoint."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch('os.path.exists'), \
+             patch('gmail_client.Credentials.from_authorized_user_file'), \
+             patch('gmail_client.build'):
+            self.client = GmailClient()
+            self.client.service = MagicMock()
+            self.client.creds = MagicMock(valid=True, token='test-token')
+
+    async def test_fetch_emails_async(self):
+        """Test message details are fetched concurrently and returned in listing order."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': 'a'}, {'id': 'b'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+
+        seen_auth = []
+
+        def handler(request):
+            seen_auth.append(request.headers['Authorization'])
+            return httpx.Response(200, json={'id': request.url.path.rsplit('/', 1)[-1]})
+
+        session = httpx.AsyncClient(base_url='https://gmail.test/users/me',
+                                    headers={'Authorization': 'Bearer test-token'},
+                                    transport=httpx.MockTransport(handler))
+        with patch.object(GmailClient, '_open_async_session', return_value=session):
+            result = await self.client.fetch_emails_async()
+
+        self.assertEqual(result, [{'id': 'a'}, {'id': 'b'}])
+        self.assertEqual(seen_auth, ['Bearer test-token', 'Bearer test-token'])
+
+    @patch('gmail_client.asyncio.sleep', new_callable=AsyncMock)
+    async def test_fetch_emails_async_retries_rate_limits(self, mock_sleep):
+        """Test 429 and 502 responses are retried with backoff and the token is refreshed off the loop."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': 'a'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+        self.client.creds.valid = False
+        responses = iter([httpx.Response(429, headers={'Retry-After': '2'}), httpx.Response(502),
+                          httpx.Response(200, json={'id': 'a'})])
+
+        session = httpx.AsyncClient(base_url='https://gmail.test/users/me',
+                                    transport=httpx.MockTransport(lambda request: next(responses)))
+        with patch.object(GmailClient, '_open_async_session', return_value=session), \
+             patch('gmail_client.asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread:
+            result = await self.client.fetch_emails_async()
+
+        self.assertEqual(result, [{'id': 'a'}])
+        self.assertEqual(mock_sleep.await_count, 2)
+        self.assertGreaterEqual(mock_sleep.await_args_list[0].args[0], 2)
+        self.assertIs(mock_to_thread.await_args.args[0], self.client.creds.refresh)
+
+    async def test_fetch_emails_async_raises_http_error(self):
+        """Test a failed async fetch raises the API client's HttpError."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'messages': [{'id': 'a'}]}
+        self.client.service.users().messages().list = MagicMock(return_value=mock_list_call)
+
+        session = httpx.AsyncClient(base_url='https://gmail.test/users/me',
+                                    transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+        with patch.object(GmailClient, '_open_async_session', return_value=session):
+            with self.assertRaises(HttpError) as ctx:
+                await self.client.fetch_emails_async()
+        self.assertEqual(ctx.exception.resp.status, 404)
+
 
 class TestGmailClientLabels(unittest.TestCase):
     """Test label management functionality."""
@@ -180,6 +507,65 @@ class TestGmailClientLabels(unittest.TestCase):
         
         self.assertEqual(result, mock_labels)
 
+    def test_get_custom_labels_skips_system_labels(self):
+        """Test system and CATEGORY_ labels (even unlisted ones) are not custom labels."""
+        mock_list_call = MagicMock()
+        mock_list_call.execute.return_value = {'labels': [
+            {'id': 'INBOX', 'name': 'INBOX', 'type': 'system'},
+            {'id': 'CATEGORY_RESERVATIONS', 'name': 'CATEGORY_RESERVATIONS', 'type': 'system'},
+            {'id': 'Label_1', 'name': 'Work', 'type': 'user'},
+        ]}
+        self.client.service.users().labels().list = MagicMock(return_value=mock_list_call)
+
+        result = self.client.get_custom_labels()
+
+        self.assertEqual([label['id'] for label in result], ['Label_1'])
+
+    @patch('gmail_client.time.sleep')
+    def test_delete_all_custom_labels_batches_deletes(self, mock_sleep):
+        """Test custom labels are deleted in batches, with per-label errors reported."""
+        self.client.service.new_batch_http_request.side_effect = \
+            lambda callback: FakeBatch(callback)
+        labels = [{'id': f'Label_{i}', 'name': f'Label {i}', 'type': 'user'} for i in range(150)]
+        labels.append({'id': 'Label_keep', 'name': 'Notes', 'type': 'user'})
+        labels_api = self.client.service.users().labels()
+        labels_api.list.return_value.execute.return_value = {'labels': labels}
+        
+        def make_delete_call(userId, id):
+            call = MagicMock()
+            if id == 'Label_7':
+                call.execute.side_effect = make_http_error(404)
+            return call
+        labels_api.delete.side_effect = make_delete_call
+        
+        deleted, skipped, errors = self.client.delete_all_custom_labels(exclude_labels=['notes'])
+        
+        self.assertEqual((deleted, skipped), (149, 1))
+        self.assertEqual([name for name, _ in errors], ['Label 7'])
+        self.assertEqual(labels_api.delete.call_count, 150)
+        self.assertEqual(self.client.service.new_batch_http_request.call_count, 2)
+
+    def test_create_label_if_not_exists_caches_labels(self):
+        """Test the label list is fetched once across lookups and creations."""
+        labels_api = self.client.service.users().labels()
+        labels_api.list.return_value.execute.return_value = {
+            'labels': [{'id': 'Label_1', 'name': 'Work'}]
+        }
+        labels_api.create.return_value.execute.return_value = {'id': 'Label_2'}
+        
+        self.assertEqual(self.client.create_label_if_not_exists('work'), 'Label_1')
+        self.assertEqual(self.client.create_label_if_not_exists('Travel'), 'Label_2')
+        self.assertEqual(self.client.create_label_if_not_exists('travel'), 'Label_2')
+        self.assertEqual(self.client.create_label_if_not_exists('Spam'), 'SPAM')
+        
+        labels_api.list.assert_called_once_with(userId='me')
+        labels_api.create.assert_called_once()
+        
+        # Label changes through manage_labels invalidate the cache
+        self.client.manage_labels('delete', 'Label_2')
+        self.client.create_label_if_not_exists('work')
+        self.assertEqual(labels_api.list.call_count, 2)
+
 
 class TestGmailClientModifyMessage(unittest.TestCase):
     """Test message modification functionality."""
@@ -202,7 +588,7 @@ class TestGmailClientModifyMessage(unittest.TestCase):
         self.client.service.users().messages().modify.assert_called_once_with(
             userId='me',
             id=msg_id,
-            body={'addLabelIds': labels_to_add, 'removeLabelIds': []}
+            body={'addLabelIds': labels_to_add}
         )
 
     def test_modify_message_remove_labels(self):
@@ -215,7 +601,7 @@ class TestGmailClientModifyMessage(unittest.TestCase):
         self.client.service.users().messages().modify.assert_called_once_with(
             userId='me',
             id=msg_id,
-            body={'addLabelIds': [], 'removeLabelIds': labels_to_remove}
+            body={'removeLabelIds': labels_to_remove}
         )
 
     def test_modify_message_add_and_remove_labels(self):
@@ -232,6 +618,297 @@ class TestGmailClientModifyMessage(unittest.TestCase):
             body={'addLabelIds': labels_to_add, 'removeLabelIds': labels_to_remove}
         )
 
+    def test_apply_label_bulk_chunks_ids(self):
+        """Test bulk label changes are sent 1000 IDs per batchModify call."""
+        ids = [f'msg_{i}' for i in range(1500)]
+        
+        self.client.apply_label(ids, 'LABEL_1')
+        
+        batch_modify = self.client.service.users().messages().batchModify
+        self.assertEqual(batch_modify.call_count, 2)
+        first, second = [call.kwargs['body'] for call in batch_modify.call_args_list]
+        self.assertEqual(first['ids'], ids[:1000])
+        self.assertEqual(second['ids'], ids[1000:])
+        self.assertEqual(first['addLabelIds'], ['LABEL_1'])
+        self.assertNotIn('removeLabelIds', first)
+        self.client.service.users().messages().modify.assert_not_called()
+
+    def test_trash_email_bulk(self):
+        """Test bulk trashing batches the per-message trash calls."""
+        self.client.service.new_batch_http_request.side_effect = \
+            lambda callback: FakeBatch(callback)
+        ids = [f'msg_{i}' for i in range(150)]
+        
+        self.client.trash_email_bulk(ids)
+        
+        trash = self.client.service.users().messages().trash
+        self.assertEqual([call.kwargs['id'] for call in trash.call_args_list], ids)
+        self.assertEqual(self.client.service.new_batch_http_request.call_count, 2)
+
+    def test_get_message_body_nested_parts(self):
+        """Test the first text/plain part is found inside nested multiparts."""
+        def part(mime_type, text=None, parts=None):
+            node = {'mimeType': mime_type, 'body': {}}
+            if text is not None:
+                node['body']['data'] = base64.urlsafe_b64encode(text.encode()).decode()
+            if parts is not None:
+                node['parts'] = parts
+            return node
+        
+        payload = part('multipart/mixed', parts=[
+            part('multipart/alternative', parts=[
+                part('text/html', '<p>html</p>'),
+                part('multipart/related', parts=[part('text/plain', 'first')]),
+            ]),
+            part('text/plain', 'second'),
+        ])
+        
+        self.assertEqual(self.client._get_message_body(payload), 'first')
+        self.assertEqual(
+            self.client._get_message_body(payload, decode=False),
+            base64.urlsafe_b64encode(b'first').decode()
+        )
+        self.assertEqual(self.client._get_message_body(part('text/html', '<p>only</p>')), '<p>only</p>')
+        self.assertEqual(self.client._get_message_body(part('multipart/mixed', parts=[])), '')
+
+    def test_format_message_drops_quotes_and_markup(self):
+        """Test quoted reply chains and HTML markup are left out of the message text."""
+        def message(mime_type, text):
+            return {'payload': {
+                'mimeType': mime_type,
+                'headers': [{'name': 'From', 'value': 'a@example.com'}, {'name': 'Subject', 'value': 'Re: Plan'}],
+                'body': {'data': base64.urlsafe_b64encode(text.encode()).decode()}
+            }}
+
+        reply = 'Sounds good.\n> inline quote\nSee you then.\n\nOn Mon, Jan 1, 2024 at 9:00 AM Bob <b@example.com> wrote:\n> Meet at 10?'
+        self.assertEqual(
+            self.client._format_message(message('text/plain', reply)),
+            'From: a@example.com\nSubject: Re: Plan\n\nSounds good.\n> inline quote\nSee you then.'
+        )
+        wrapped = 'Works for me.\n\nOn Mon, Jan 1, 2024 at 9:00 AM Bob Smith <\nbob@example.com> wrote:\n\n> Meet at 10?'
+        self.assertTrue(self.client._format_message(message('text/plain', wrapped)).endswith('\n\nWorks for me.'))
+        inline = 'Here is the diff:\n> added line\nthoughts?\n\n> earlier message\n>\n> more of it\n'
+        self.assertTrue(
+            self.client._format_message(message('text/plain', inline)).endswith('\n\nHere is the diff:\n> added line\nthoughts?')
+        )
+        answered = ('On Mon, Jan 1, 2024 at 9:00 AM Bob <b@example.com> wrote:\n> Meet at 10?\nYes, 10 works.\n'
+                    '> Which room?\nB2.\n\n> Thanks, Bob\n')
+        self.assertTrue(self.client._format_message(message('text/plain', answered)).endswith(
+            '\n\nOn Mon, Jan 1, 2024 at 9:00 AM Bob <b@example.com> wrote:\n> Meet at 10?\nYes, 10 works.\n'
+            '> Which room?\nB2.'
+        ))
+        page = '<html><head><style>p {}</style></head><body><p>Hi &amp; welcome</p><div>Bye</div></body></html>'
+        self.assertEqual(
+            self.client._format_message(message('text/html', page)),
+            'From: a@example.com\nSubject: Re: Plan\n\nHi & welcome\nBye'
+        )
+
+    def test_get_message_headers(self):
+        """Test subject and sender are read from the headers, first occurrence wins."""
+        message = {
+            'payload': {
+                'headers': [
+                    {'name': 'From', 'value': 'sender@example.com'},
+                    {'name': 'subject', 'value': 'Hello'},
+                    {'name': 'Subject', 'value': 'Duplicate'},
+                ],
+                'body': {}
+            }
+        }
+        self.client.service.users().messages().get.return_value.execute.return_value = message
+        self.client._session = MagicMock()
+        self.client._session.get.return_value = MagicMock(status_code=200, content=json.dumps(message).encode())
+        
+        self.assertEqual(self.client.get_message('msg_123'), 'From: sender@example.com\nSubject: Hello\n\n')
+        self.assertEqual(self.client.get_message_subject('msg_123'), 'Hello')
+
+    def test_get_message_snippet(self):
+        """Test snippets are fetched in metadata format and rendered with headers."""
+        message = {
+            'snippet': 'Don&#39;t forget the meeting',
+            'payload': {'headers': [
+                {'name': 'Subject', 'value': 'Reminder'},
+                {'name': 'From', 'value': 'boss@example.com'},
+            ]}
+        }
+        self.client._session = MagicMock()
+        self.client._session.get.return_value = MagicMock(status_code=200, content=json.dumps(message).encode())
+        
+        result = self.client.get_message_snippet('msg_123')
+        
+        self.assertEqual(result, "From: boss@example.com\nSubject: Reminder\n\nDon't forget the meeting")
+        self.assertEqual(self.client._session.get.call_args.kwargs['params']['format'], 'metadata')
+
+    @patch('gmail_client.time.sleep')
+    def test_get_message_labels_uses_session(self, mock_sleep):
+        """Test label lookups go through the shared session and retry on 429."""
+        throttled = MagicMock(status_code=429, headers={'retry-after': '1'})
+        ok = MagicMock(status_code=200, content=b'{"labelIds": ["INBOX"]}')
+        self.client._session = MagicMock()
+        self.client._session.get.side_effect = [throttled, ok]
+        
+        self.assertEqual(self.client.get_message_labels('msg_123'), ['INBOX'])
+        
+        url = self.client._session.get.call_args[0][0]
+        self.assertTrue(url.endswith('/messages/msg_123'))
+        self.assertEqual(
+            self.client._session.get.call_args.kwargs['params'],
+            {'format': 'minimal', 'fields': 'labelIds'}
+        )
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.client.service.users().messages().get.assert_not_called()
+
+    def test_session_errors_raise_http_error(self):
+        """Test session lookups fail with the same HttpError as API client calls."""
+        self.client._session = MagicMock()
+        self.client._session.get.return_value = MagicMock(
+            status_code=404, headers={'content-type': 'application/json'}, content=b'not found', url='https://x/m'
+        )
+
+        with self.assertRaises(HttpError) as ctx:
+            self.client.get_message_labels('gone')
+        self.assertEqual(ctx.exception.resp.status, 404)
+
+
+class TestGmailClientMessageCache(unittest.TestCase):
+    """Test the on-disk message content cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        config = type('Config', (), {
+            'GMAIL_CREDENTIALS_JSON': None,
+            'GMAIL_CACHE_ENABLED': True,
+            'GMAIL_CACHE_PATH': ':memory:'
+        })()
+        with patch('os.path.exists'), \
+             patch('gmail_client.Credentials.from_authorized_user_file'), \
+             patch('gmail_client.build'):
+            self.client = GmailClient(config)
+            self.client.service = MagicMock()
+
+    def test_get_message_cached(self):
+        """Test repeated get_message calls for one ID hit the API once."""
+        message = {'payload': {'headers': [{'name': 'Subject', 'value': 'Hi'}], 'body': {}}}
+        self.client._session = MagicMock()
+        self.client._session.get.return_value = MagicMock(status_code=200, content=json.dumps(message).encode())
+        
+        first = self.client.get_message('msg_1')
+        second = self.client.get_message('msg_1')
+        
+        self.assertEqual(first, second)
+        self.client._session.get.assert_called_once()
+
+    def test_get_messages_batches_uncached(self):
+        """Test get_messages batch-fetches only the emails missing from the cache."""
+        self.client.service.new_batch_http_request.side_effect = \
+            lambda callback: FakeBatch(callback)
+        self.client.message_cache.set(MESSAGE_CACHE_PREFIX + 'msg_1', 'cached text')
+        get = self.client.service.users().messages().get
+        get.return_value.execute.return_value = {
+            'id': 'msg_2',
+            'payload': {'headers': [{'name': 'From', 'value': 'a@example.com'}], 'body': {}}
+        }
+        
+        result = self.client.get_messages(['msg_1', 'msg_2'])
+        
+        self.assertEqual(result, {'msg_1': 'cached text', 'msg_2': 'From: a@example.com\nSubject: \n\n'})
+        get.assert_called_once_with(userId='me', id='msg_2', format='full', fields='id,payload')
+        self.assertEqual(self.client.get_message('msg_2'), result['msg_2'])
+        get.return_value.execute.assert_called_once()
+
+    def test_get_header(self):
+        """Test header lookup on a fetched message is case-insensitive."""
+        message = {'payload': {'headers': [{'name': 'subject', 'value': 'Hi'}]}}
+        self.assertEqual(GmailClient.get_header(message, 'Subject'), 'Hi')
+        self.assertEqual(GmailClient.get_header(message, 'From', '(Unknown)'), '(Unknown)')
+
+    def test_get_message_subject_cached(self):
+        """Test subjects are served from the cache after the first lookup."""
+        self.client._session = MagicMock()
+        self.client._session.get.return_value = MagicMock(
+            status_code=200,
+            content=b'{"payload": {"headers": [{"name": "Subject", "value": "Hi"}]}}'
+        )
+        
+        self.assertEqual(self.client.get_message_subject('msg_1'), 'Hi')
+        self.assertEqual(self.client.get_message_subject('msg_1'), 'Hi')
+        self.client._session.get.assert_called_once()
+
+
+@patch('gmail_client.time.sleep')
+class TestGmailClientRetry(unittest.TestCase):
+    """Test backoff retries on transient API errors."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch('os.path.exists'), \
+             patch('gmail_client.Credentials.from_authorized_user_file'), \
+             patch('gmail_client.build'):
+            self.client = GmailClient()
+            self.client.service = MagicMock()
+            self.client.service.new_batch_http_request.side_effect = \
+                lambda callback: FakeBatch(callback)
+
+    def test_exec_retries_rate_limit(self, mock_sleep):
+        """Test a 429 is retried, honoring Retry-After."""
+        request = MagicMock()
+        request.execute.side_effect = [make_http_error(429, retry_after='3'), {'id': '1'}]
+        
+        self.assertEqual(self.client._exec(request), {'id': '1'})
+        self.assertEqual(request.execute.call_count, 2)
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 3)
+
+    def test_exec_retries_gateway_and_quota_errors(self, mock_sleep):
+        """Test 502/504 and rate-limit 403s are retried."""
+        request = MagicMock()
+        request.execute.side_effect = [
+            make_http_error(502),
+            make_http_error(504),
+            make_http_error(403, content=b'{"error": {"errors": [{"reason": "userRateLimitExceeded"}]}}'),
+            {'id': '1'}
+        ]
+
+        self.assertEqual(self.client._exec(request), {'id': '1'})
+        self.assertEqual(request.execute.call_count, 4)
+
+    def test_exec_raises_non_retryable_error(self, mock_sleep):
+        """Test errors other than 429/5xx are raised immediately."""
+        request = MagicMock()
+        for error in (make_http_error(404), make_http_error(403, content=b'insufficientPermissions')):
+            request.execute.side_effect = error
+            with self.assertRaises(HttpError):
+                self.client._exec(request)
+        mock_sleep.assert_not_called()
+
+    def test_exec_gives_up_after_max_retries(self, mock_sleep):
+        """Test the last error is raised once retries are exhausted."""
+        request = MagicMock()
+        request.execute.side_effect = make_http_error(503)
+        
+        with self.assertRaises(HttpError):
+            self.client._exec(request, max_retries=2)
+        self.assertEqual(request.execute.call_count, 3)
+
+    def test_batch_retries_failed_subrequests(self, mock_sleep):
+        """Test only the rate-limited messages of a batch are re-sent."""
+        calls = []
+        
+        def make_get_call(userId, id):
+            calls.append(id)
+            call = MagicMock()
+            if id == '2' and calls.count('2') == 1:
+                call.execute.side_effect = make_http_error(429)
+            else:
+                call.execute.return_value = {'id': id}
+            return call
+        self.client.service.users().messages().get = MagicMock(side_effect=make_get_call)
+        
+        result = self.client._batch_get_messages(['1', '2', '3'])
+        
+        self.assertEqual(result, [{'id': '1'}, {'id': '2'}, {'id': '3'}])
+        self.assertEqual(calls, ['1', '2', '3', '2'])
+        self.assertEqual(self.client.service.new_batch_http_request.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
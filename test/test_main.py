@@ -0,0 +1,259 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import main
+
+
+def make_config(**overrides):
+    """Mock config with the attributes main reads."""
+    values = {
+        'CATEGORIES_TO_KEEP_SET': frozenset({'Work'}),
+        'CATEGORIES_TO_KEEP_LOWER': frozenset({'work'}),
+        'CATEGORY_RULES': (),
+        'RATE_LIMIT_DELAY': 0,
+        'MAX_CONCURRENCY': 2,
+        'BATCH_ROWS': 2,
+        'WATCH_INTERVAL': 10,
+        'HISTORY_STATE_PATH': '',
+    }
+    values.update(overrides)
+    return type('Config', (), values)()
+
+
+def make_gmail_client(emails=()):
+    """Mock GmailClient whose inbox listing yields the given metadata messages."""
+    gmail_client = MagicMock()
+    gmail_client.get_all_labels.return_value = {'labels': []}
+    gmail_client.iter_emails.return_value = list(emails)
+    gmail_client.get_header.side_effect = lambda email, name, default='': email.get(name, default)
+    gmail_client.format_snippet.side_effect = lambda email: email['Subject']
+    gmail_client.get_messages.side_effect = lambda ids: {email_id: f'body {email_id}' for email_id in ids}
+    gmail_client.get_message.side_effect = lambda email_id: f'fetched {email_id}'
+    gmail_client.create_label_if_not_exists.return_value = 'Label_Work'
+    return gmail_client
+
+
+def make_email(email_id, subject, sender='bob@example.com', label_ids=('INBOX',)):
+    return {'id': email_id, 'labelIds': list(label_ids), 'Subject': subject, 'From': sender}
+
+
+class _CountingSemaphore(threading.BoundedSemaphore):
+    """BoundedSemaphore that counts acquires and releases."""
+    def __init__(self, value=1):
+        super().__init__(value)
+        self.acquired = self.released = 0
+
+    def acquire(self, *args, **kwargs):
+        self.acquired += 1
+        return super().acquire(*args, **kwargs)
+
+    def release(self, *args, **kwargs):
+        self.released += 1
+        return super().release(*args, **kwargs)
+
+
+class TestOrganize(unittest.TestCase):
+    def setUp(self):
+        self.config = make_config(CATEGORY_RULES=(('from', '*@github.com', 'Work'),))
+        self.events = []
+        self.organizer = MagicMock()
+        self.organizer.cached_analysis.return_value = None
+        self.organizer.categorize_emails_marshaled.side_effect = lambda snippets: [
+            {'category': 'Work' if 'report' in snippet else 'Promotions'} for snippet in snippets
+        ]
+        self.organizer.summarize_with_action_items.side_effect = lambda message: (
+            self.events.append(('summarize', message)) or {'summary': 'S', 'action_items': ['Reply']}
+        )
+
+    def organize(self, emails, labels=()):
+        """Run _organize on emails and return the mock GmailClient."""
+        gmail_client = make_gmail_client(emails)
+        gmail_client.get_all_labels.return_value = {'labels': list(labels)}
+        gmail_client.apply_label_bulk.side_effect = lambda ids, **kw: self.events.append(('label', sorted(ids)))
+        gmail_client.trash_email_bulk.side_effect = lambda ids: self.events.append(('trash', sorted(ids)))
+        main._organize(self.config, gmail_client, self.organizer, emails)
+        return gmail_client
+
+    def test_bulk_changes_after_processing(self):
+        """Test labels and trash are applied in bulk only after every email is processed."""
+        emails = [
+            make_email('m1', 'Weekly report'),
+            make_email('m2', 'Sale!'),
+            make_email('m3', 'PR merged', sender='noreply@github.com'),
+            make_email('m4', 'Old report', label_ids=('INBOX', 'Label_Work')),
+        ]
+        gmail_client = self.organize(emails, labels=[{'id': 'Label_Work', 'name': 'Work'}])
+
+        # m4 is already labeled; m3 matches a rule and skips the LLM
+        self.assertEqual(self.organizer.categorize_emails_marshaled.call_count, 1)
+        self.assertEqual(sorted(self.events[:2]), [('summarize', 'body m1'), ('summarize', 'fetched m3')])
+        self.assertEqual(self.events[2:], [('label', ['m1', 'm3']), ('trash', ['m2'])])
+        gmail_client.apply_label_bulk.assert_called_once()
+        self.assertEqual(gmail_client.apply_label_bulk.call_args.kwargs,
+                         {'labels_to_add': ['Label_Work'], 'labels_to_remove': ['INBOX']})
+
+    def test_failed_bulk_label_still_trashes(self):
+        """Test a failed bulk label call is logged and trashing still runs."""
+        emails = [make_email('m1', 'Weekly report'), make_email('m2', 'Sale!')]
+        gmail_client = make_gmail_client(emails)
+        gmail_client.apply_label_bulk.side_effect = OSError('quota')
+
+        with self.assertLogs('main', level='ERROR'):
+            main._organize(self.config, gmail_client, self.organizer, emails)
+        gmail_client.trash_email_bulk.assert_called_once_with(['m2'])
+
+    def test_returns_failed_emails(self):
+        """Test emails that failed processing or bulk updates are returned for a retry."""
+        emails = [make_email('m1', 'Weekly report'), make_email('m2', 'Sale!'), make_email('m3', 'Other report')]
+        def summarize(message):
+            if message == 'body m3':
+                raise RuntimeError('bad response')
+            return {'summary': 'S', 'action_items': []}
+
+        self.organizer.summarize_with_action_items.side_effect = summarize
+        gmail_client = make_gmail_client(emails)
+        gmail_client.trash_email_bulk.side_effect = OSError('quota')
+
+        with self.assertLogs('main', level='ERROR'):
+            failed = main._organize(self.config, gmail_client, self.organizer, emails)
+
+        self.assertEqual(sorted(failed), ['m2', 'm3'])
+        gmail_client.apply_label_bulk.assert_called_once_with(['m1'], labels_to_add=['Label_Work'],
+                                                              labels_to_remove=['INBOX'])
+
+    def test_duplicate_email_skips_llm(self):
+        """Test an email with a stored analysis is neither categorized nor summarized again."""
+        store = {}
+        self.organizer.cached_analysis.side_effect = store.get
+        self.organizer.remember_analysis.side_effect = store.__setitem__
+        self.config = make_config(BATCH_ROWS=1)
+
+        self.organize([make_email('m1', 'Weekly report')])
+        self.assertEqual(store, {'Weekly report': {
+            'category': 'Work', 'summary': 'S', 'action_items': ['Reply'], 'confidence': {}
+        }})
+        self.organizer.reset_mock()
+        self.events.clear()
+        gmail_client = self.organize([make_email('m2', 'Weekly report'), make_email('m3', 'Sale!')])
+
+        self.organizer.categorize_emails_marshaled.assert_called_once_with(['Sale!'])
+        self.organizer.summarize_with_action_items.assert_not_called()
+        gmail_client.get_messages.assert_not_called()
+        self.assertEqual(self.events, [('label', ['m2']), ('trash', ['m3'])])
+
+    def test_chunk_slots_released(self):
+        """Test every prefetch slot is released, including when categorizing a chunk fails."""
+        emails = [make_email(f'm{i}', f'report {i}') for i in range(7)]
+        calls = []
+
+        def categorize(snippets):
+            calls.append(snippets)
+            if len(calls) == 2:
+                raise RuntimeError('bad response')
+            return [{'category': 'Work'} for _ in snippets]
+
+        self.organizer.categorize_emails_marshaled.side_effect = categorize
+        slots = []
+        with patch('main.threading.BoundedSemaphore',
+                   side_effect=lambda value: slots.append(_CountingSemaphore(value)) or slots[-1]):
+            with self.assertLogs('main', level='ERROR'):
+                gmail_client = self.organize(emails)
+
+        # 7 emails in chunks of BATCH_ROWS=2: 4 chunks, one of which failed
+        self.assertEqual(len(calls), 4)
+        self.assertEqual((slots[0].acquired, slots[0].released), (4, 4))
+        self.assertEqual(sum(len(c.args[0]) for c in gmail_client.apply_label_bulk.call_args_list), 5)
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = make_config(HISTORY_STATE_PATH=os.path.join(tmp.name, 'state', 'history.json'))
+        self.gmail_client = make_gmail_client()
+        self.organizer = MagicMock()
+
+    def run_polls(self, count):
+        """Run the watch loop until it has slept count times; return the sleep delays."""
+        delays = []
+
+        def sleep(delay):
+            delays.append(delay)
+            if len(delays) == count:
+                raise KeyboardInterrupt
+
+        with patch('main.time.sleep', side_effect=sleep), self.assertRaises(KeyboardInterrupt):
+            main._watch(self.config, self.gmail_client, self.organizer)
+        return delays
+
+    @patch('main._organize')
+    def test_resumes_from_saved_history_id(self, mock_organize):
+        """Test the first poll scans the inbox and later polls only fetch history changes."""
+        mock_organize.return_value = []
+        self.gmail_client.get_history_id.return_value = '100'
+        self.gmail_client.list_history.return_value = (['m1'], '105')
+        self.gmail_client.iter_messages.return_value = [
+            {'id': 'm1', 'labelIds': ['INBOX']}, {'id': 'm2', 'labelIds': []}
+        ]
+
+        self.run_polls(2)
+
+        self.gmail_client.iter_emails.assert_called_once_with(query='in:inbox')
+        self.gmail_client.list_history.assert_called_once_with('100')
+        self.assertEqual([email['id'] for email in mock_organize.call_args_list[1].args[3]], ['m1'])
+        self.assertEqual(main._load_watch_state(self.config.HISTORY_STATE_PATH), ('105', []))
+
+    @patch('main._organize')
+    def test_failed_poll_backs_off_and_retries(self, mock_organize):
+        """Test a transient error is logged, backed off and retried from the same history ID."""
+        mock_organize.return_value = []
+        main._save_watch_state(self.config.HISTORY_STATE_PATH, '100')
+        self.gmail_client.list_history.side_effect = [OSError('connection reset'), OSError('again'), ([], '101')]
+
+        with self.assertLogs('main', level='ERROR'):
+            delays = self.run_polls(3)
+
+        self.assertEqual(delays, [20, 40, 10])
+        self.assertEqual([c.args[0] for c in self.gmail_client.list_history.call_args_list], ['100'] * 3)
+        self.assertEqual(main._load_watch_state(self.config.HISTORY_STATE_PATH), ('101', []))
+
+    @patch('main._organize')
+    def test_failed_emails_retried_next_poll(self, mock_organize):
+        """Test emails _organize couldn't finish are saved and fetched again with the next changes."""
+        main._save_watch_state(self.config.HISTORY_STATE_PATH, '100')
+        self.gmail_client.list_history.side_effect = [(['m1', 'm2'], '101'), (['m3', 'm1'], '102')]
+        self.gmail_client.iter_messages.side_effect = lambda ids: [{'id': i, 'labelIds': ['INBOX']} for i in ids]
+        mock_organize.side_effect = [['m1'], []]
+        saved = []
+
+        with patch('main._save_watch_state', side_effect=lambda *args: saved.append(args[1:])):
+            self.run_polls(2)
+
+        self.assertEqual([c.args[0] for c in self.gmail_client.iter_messages.call_args_list],
+                         [['m1', 'm2'], ['m1', 'm3']])
+        self.assertEqual(saved, [('101', ['m1']), ('102', [])])
+
+    def test_max_emails_rejected(self):
+        """Test watch mode refuses a max_emails limit."""
+        with self.assertRaises(ValueError):
+            main.main(max_emails=5, watch=True)
+
+
+class TestMain(unittest.TestCase):
+    @patch('main.GmailClient')
+    @patch('main.EmailOrganizer')
+    @patch('main.get_config')
+    def test_batch_mode_rejected_for_gemini(self, mock_get_config, mock_organizer, mock_gmail_client):
+        """Test batch mode fails before Gmail auth when the provider has no batch API."""
+        mock_organizer.return_value.supports_batch = False
+        mock_organizer.return_value.provider = 'gemini'
+
+        with self.assertRaisesRegex(ValueError, 'LLM_PROVIDER=openai'):
+            main.main(batch_mode=True)
+        mock_gmail_client.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()